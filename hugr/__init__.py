@@ -14,15 +14,51 @@ A mock robot and tutorials for py_trees on ROS2.
 # Imports
 ##############################################################################
 
-from . import behaviours
-from . import mock
-
-from . import one_data_gathering
-from . import two_battery_check
-from . import five_action_clients
-from . import six_context_switching
-from . import seven_docking_cancelling_failing
-from . import eight_dynamic_application_loading
+import importlib
+import typing
+
+# Submodules are imported on first access (PEP 562), so that each
+# executable only pays for what it uses, e.g. the mocks need never
+# import the tutorials, nor the tutorials import launch_ros.
+__all__ = [
+    'battery',
+    'behaviours',
+    'blackboard',
+    'compiler',
+    'composites',
+    'critical_path',
+    'decorators',
+    'display',
+    'import_times',
+    'logging',
+    'metrics',
+    'mock',
+    'recorder',
+    'replay',
+    'snapshots',
+    'subscribers',
+    'tracing',
+    'trees',
+    'watchdog',
+    'one_data_gathering',
+    'two_battery_check',
+    'five_action_clients',
+    'six_context_switching',
+    'seven_docking_cancelling_failing',
+    'eight_dynamic_application_loading',
+]
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in __all__:
+        module = importlib.import_module("." + name, __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__() -> typing.List[str]:
+    return sorted(set(globals()) | set(__all__))
 
 ##############################################################################
 # Version
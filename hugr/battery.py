@@ -0,0 +1,149 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Battery behaviours for the tutorials.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees_ros
+import rclpy.qos
+import sensor_msgs.msg as sensor_msgs
+
+##############################################################################
+# Behaviours
+##############################################################################
+
+
+class ToBlackboard(py_trees_ros.subscribers.Handler):
+    """
+    An alternative to :class:`py_trees_ros.battery.ToBlackboard` for trees
+    that only care about the battery crossing its low threshold.
+
+    * **Downsampling**: messages arriving within the period of the last
+      accepted message are discarded
+    * **Change-only writes**: the battery state is only written when the
+      percentage has moved by at least the resolution (or the power supply
+      status has changed), the warning only when it flips
+    * **Hysteresis**: the warning is raised below the threshold and only
+      cleared once the percentage has recovered above the threshold plus the
+      hysteresis band, so it doesn't chatter at the boundary
+
+    Blackboard writes, and with them activity stream noise, then drop to
+    near zero between threshold crossings.
+
+    Blackboard Variables:
+        * battery (:class:`sensor_msgs.msg.BatteryState`)[w]: the raw battery message
+        * battery_low_warning (:obj:`bool`)[w]: False if battery is ok, True if critically low
+
+    Args:
+        name: name of the behaviour
+        topic_name: name of the battery state topic
+        qos_profile: qos profile for the subscriber
+        threshold: percentage below which the low warning is raised
+        hysteresis: percentage above the threshold at which the low warning is cleared
+        period: minimum time (s) between accepted messages (zero to accept all)
+        resolution: minimum change in percentage that is written to the blackboard
+
+    Raises:
+        ValueError: if any of hysteresis, period or resolution are negative
+    """
+    def __init__(self,
+                 name: str,
+                 topic_name: str,
+                 qos_profile: rclpy.qos.QoSProfile,
+                 threshold: float=30.0,
+                 hysteresis: float=5.0,
+                 period: float=1.0,
+                 resolution: float=1.0
+                 ):
+        for argument, value in [('hysteresis', hysteresis), ('period', period), ('resolution', resolution)]:
+            if value < 0.0:
+                raise ValueError("{} must not be negative [{}]".format(argument, value))
+        super().__init__(
+            name=name,
+            topic_name=topic_name,
+            topic_type=sensor_msgs.BatteryState,
+            qos_profile=qos_profile,
+            clearing_policy=py_trees.common.ClearingPolicy.ON_SUCCESS
+        )
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.period = period
+        self.resolution = resolution
+        self.last_accepted = None
+        self.discarded = 0
+        self.blackboard = self.attach_blackboard_client(name=self.name)
+        self.blackboard.register_key(key="battery", access=py_trees.common.Access.WRITE)
+        self.blackboard.register_key(key="battery_low_warning", access=py_trees.common.Access.WRITE)
+        self.battery = sensor_msgs.BatteryState()
+        self.battery.percentage = 0.0
+        self.battery.power_supply_status = sensor_msgs.BatteryState.POWER_SUPPLY_STATUS_UNKNOWN
+        self.battery_low_warning = False
+        self.blackboard.battery = self.battery
+        self.blackboard.battery_low_warning = self.battery_low_warning
+        self.received = False
+
+    def _callback(self, msg: sensor_msgs.BatteryState):
+        """
+        Keep the message, unless it arrived within the period of the last.
+
+        Args:
+            msg: the incoming battery state
+        """
+        now = self.node.get_clock().now().nanoseconds / 1e9
+        with self.data_guard:
+            if self.last_accepted is not None and now - self.last_accepted < self.period:
+                self.discarded += 1
+                return
+            self.last_accepted = now
+            self.msg = msg
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Write any significant changes to the blackboard.
+
+        Returns:
+            :data:`~py_trees.common.Status.RUNNING` until the first message is received, :data:`~py_trees.common.Status.SUCCESS` thereafter
+        """
+        self.logger.debug("%s.update()" % self.__class__.__name__)
+        with self.data_guard:
+            msg = self.msg
+            self.msg = None
+        if msg is None:
+            if not self.received:
+                self.feedback_message = "no message received yet"
+                return py_trees.common.Status.RUNNING
+            return py_trees.common.Status.SUCCESS
+        self.received = True
+        if self._significant(msg):
+            self.battery = msg
+            self.blackboard.battery = msg
+        warning = self._warning(msg.percentage)
+        if warning != self.battery_low_warning:
+            self.battery_low_warning = warning
+            self.blackboard.battery_low_warning = warning
+            if warning:
+                self.node.get_logger().warning("{}: battery level is low!".format(self.name))
+        self.feedback_message = "Battery level is low" if self.battery_low_warning else "Battery level is ok"
+        return py_trees.common.Status.SUCCESS
+
+    def _significant(self, msg: sensor_msgs.BatteryState) -> bool:
+        return (
+            abs(msg.percentage - self.battery.percentage) >= self.resolution or
+            msg.power_supply_status != self.battery.power_supply_status
+        )
+
+    def _warning(self, percentage: float) -> bool:
+        if self.battery_low_warning:
+            return percentage <= self.threshold + self.hysteresis
+        return percentage < self.threshold
@@ -20,12 +20,189 @@ import rcl_interfaces.msg as rcl_msgs
 import rcl_interfaces.srv as rcl_srvs
 import rclpy
 import std_msgs.msg as std_msgs
+import time
+import typing
+
+from . import blackboard
+from . import tracing
 
 ##############################################################################
 # Behaviours
 ##############################################################################
 
 
+class ActionClient(py_trees_ros.actions.ActionClient):
+    """
+    An action client that decimates incoming feedback. Rather than formatting
+    every feedback message as it arrives (on the tree node's executor), it
+    stores only the latest message and formats it once per tick
+    in :meth:`update`. Intermediate messages received between ticks are
+    simply overwritten.
+
+    Each goal's lifecycle (sent, accepted or rejected, feedback and result)
+    is traced as an async span, if tracing is enabled (refer to :mod:`hugr.tracing`).
+
+    Otherwise, identical to :class:`py_trees_ros.actions.ActionClient`.
+
+    Args:
+        name: name of the behaviour
+        action_type: spec type for the action (e.g. 'py_trees_ros_interfaces.action.Dock')
+        action_name: where you can find the action topics & services (e.g. 'dock')
+        action_goal: pre-configured action goal (e.g. 'py_trees_ros_interfaces.action.Dock.Goal(dock=True)')
+        generate_feedback_message: formatter for the latest feedback message, called at most once per tick
+        wait_for_server_timeout_sec: use negative values for a blocking but periodic check (default: -3.0)
+    """
+    def __init__(
+            self,
+            name: str,
+            action_type: typing.Any,
+            action_name: str,
+            action_goal: typing.Any,
+            generate_feedback_message: typing.Callable[[typing.Any], str]=None,
+            wait_for_server_timeout_sec: float=-3.0
+    ):
+        super().__init__(
+            name=name,
+            action_type=action_type,
+            action_name=action_name,
+            action_goal=action_goal,
+            generate_feedback_message=generate_feedback_message,
+            wait_for_server_timeout_sec=wait_for_server_timeout_sec
+        )
+        self.latest_feedback = None
+        self.feedback_received = 0
+        self.trace_spans = {}  # send goal / get result future, goal id -> trace span id
+
+    def initialise(self):
+        """
+        Discard any feedback lingering from a previous goal and send the goal.
+        """
+        self.latest_feedback = None
+        self.feedback_received = 0
+        super().initialise()
+
+    def feedback_callback(self, msg: typing.Any):
+        """
+        Keep only the latest feedback message, it is formatted on the next tick.
+
+        Args:
+            msg: incoming feedback message (e.g. py_trees_ros_interfaces.action.Dock_FeedbackMessage)
+        """
+        # a single reference assignment, no lock required
+        self.latest_feedback = msg
+        self.feedback_received += 1
+        self._trace(self.trace_spans.get(bytes(msg.goal_id.uuid), None), 'n', "feedback", feedback=self.feedback_received)
+
+    def send_goal_request(self):
+        """
+        Send the goal, opening its trace span.
+        """
+        span_id = None
+        if tracing.tracer().enabled:
+            span_id = tracing.tracer().next_id()
+            self._trace(span_id, 'b', self.action_name, behaviour=self.name)
+        super().send_goal_request()
+        if span_id is not None and self.send_goal_future is not None:
+            self.trace_spans[self.send_goal_future] = span_id
+
+    def goal_response_callback(self, future: typing.Any):
+        """
+        Mark the goal accepted (or rejected) on its trace span.
+
+        Args:
+            future: incoming goal handle future
+        """
+        super().goal_response_callback(future)
+        span_id = self.trace_spans.pop(future, None)
+        goal_handle = future.result()
+        if goal_handle is None or not goal_handle.accepted:
+            self._trace(span_id, 'n', "rejected")
+            self._trace(span_id, 'e', self.action_name, outcome="rejected")
+        elif future is not self.send_goal_future:
+            # the goal was resent before this response arrived, its result won't be requested
+            self._trace(span_id, 'n', "accepted")
+            self._trace(span_id, 'e', self.action_name, outcome="superseded")
+        else:
+            self._trace(span_id, 'n', "accepted")
+            if span_id is not None:
+                self.trace_spans[bytes(goal_handle.goal_id.uuid)] = span_id
+                self.trace_spans[self.get_result_future] = span_id
+
+    def get_result_callback(self, future: typing.Any):
+        """
+        Close the goal's trace span with its result status. Spans are tracked
+        per goal, so a late result for an earlier goal closes its own span.
+
+        Args:
+            future: incoming result future
+        """
+        super().get_result_callback(future)
+        span_id = self.trace_spans.pop(future, None)
+        if span_id is None:
+            return
+        self.trace_spans = {key: value for key, value in self.trace_spans.items() if value != span_id}
+        self._trace(span_id, 'e', self.action_name, outcome=self.status_strings.get(future.result().status, "unknown"))
+
+    def _trace(self, span_id: typing.Optional[int], phase: str, name: str, **args: typing.Any):
+        if span_id is not None:
+            tracing.tracer().async_event(phase, name, "action", span_id, args=args)
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Format the latest feedback message (if any arrived since the last tick)
+        before deferring to the underlying action client's update.
+
+        Returns:
+            :class:`py_trees.common.Status`: status of the underlying action client
+        """
+        msg, self.latest_feedback = self.latest_feedback, None
+        if msg is not None and self.generate_feedback_message is not None:
+            self.feedback_message = "feedback: {}".format(self.generate_feedback_message(msg))
+        return super().update()
+
+
+class CheckBlackboardVariableValue(py_trees.behaviours.CheckBlackboardVariableValue):
+    """
+    A :class:`py_trees.behaviours.CheckBlackboardVariableValue` that only
+    re-checks when its blackboard variable has changed, otherwise the last
+    result (and feedback message) is reused. Results are not cached while
+    the variable holds a mutable value, e.g. nested checks
+    such as ``battery.percentage`` (refer to :mod:`hugr.blackboard`).
+
+    Args:
+        check: a comparison expression to check against
+        name: name of the behaviour
+    """
+    def __init__(
+            self,
+            check: py_trees.common.ComparisonExpression,
+            name: typing.Union[str, py_trees.common.Name]=py_trees.common.Name.AUTO_GENERATED
+    ):
+        super().__init__(check=check, name=name)
+        blackboard.install()
+        self.evaluations = 0
+        self.watch = blackboard.Watch(
+            keys=[self.blackboard.remappings[key] for key in self.blackboard.read]
+        )
+        self.cached_status = None
+        self.cached_feedback_message = ""
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Check for existence, or the appropriate match on the expected value,
+        if the variable has changed since the last check.
+
+        Returns:
+             :class:`~py_trees.common.Status`: :data:`~py_trees.common.Status.FAILURE` if not matched, :data:`~py_trees.common.Status.SUCCESS` otherwise.
+        """
+        if self.watch.changed():
+            self.evaluations += 1
+            self.cached_status = super().update()
+            self.cached_feedback_message = self.feedback_message
+        self.feedback_message = self.cached_feedback_message
+        return self.cached_status
+
+
 class FlashLedStrip(py_trees.behaviour.Behaviour):
     """
     This behaviour simply shoots a command off to the LEDStrip to flash
@@ -54,6 +231,7 @@ class FlashLedStrip(py_trees.behaviour.Behaviour):
         super(FlashLedStrip, self).__init__(name=name)
         self.topic_name = topic_name
         self.colour = colour
+        self.publisher = None
 
     def setup(self, **kwargs):
         """
@@ -106,9 +284,135 @@ class FlashLedStrip(py_trees.behaviour.Behaviour):
                 "{}->{}".format(self.status, new_status) if self.status != new_status else "{}".format(new_status)
             )
         )
-        self.publisher.publish(std_msgs.String(data=""))
+        if self.publisher is not None:
+            self.publisher.publish(std_msgs.String(data=""))
         self.feedback_message = "cleared"
 
+    def shutdown(self):
+        """
+        Release the publisher, behaviours in dynamically inserted
+        subtrees would otherwise leave it behind on the tree's node.
+        """
+        if self.publisher is not None:
+            self.node.destroy_publisher(self.publisher)
+            self.publisher = None
+
+
+class PrefetchScanContext(py_trees.behaviour.Behaviour):
+    """
+    Fetches the context that a :class:`ScanContext` will switch, ahead of
+    time (e.g. while the robot is still moving to the scan). This is read only,
+    so there is nothing to roll back if the job is cancelled or fails before
+    the switch is committed.
+
+    It succeeds once the context is fetched, or if fetching failed (the
+    switch then fetches the context itself), so that it never fails the job.
+
+    Args:
+        name: name of the behaviour
+        max_age: prefetched contexts older than this (s, on the node's clock) are not used
+    """
+    def __init__(self, name: str="Prefetch Context", max_age: float=30.0):
+        super().__init__(name=name)
+        self.max_age = max_age
+        self.client = None
+        self.future = None
+        self.context = None
+        self.stamp = None
+
+    def setup(self, **kwargs):
+        """
+        Setup the parameter service client.
+
+        Args:
+            **kwargs (:obj:`dict`): look for the 'node' object being passed down from the tree
+
+        Raises:
+            :class:`KeyError`: if a ros2 node isn't passed under the key 'node' in kwargs
+        """
+        self.logger.debug("{}.setup()".format(self.qualified_name))
+        try:
+            self.node = kwargs['node']
+        except KeyError as e:
+            error_message = "didn't find 'node' in setup's kwargs [{}]".format(self.qualified_name)
+            raise KeyError(error_message) from e  # 'direct cause' traceability
+        self.client = self.node.create_client(rcl_srvs.GetParameters, '/safety_sensors/get_parameters')
+        if not self.client.wait_for_service(timeout_sec=3.0):
+            raise RuntimeError("client timed out waiting for server [get_safety_sensors]")
+
+    def initialise(self):
+        """
+        Discard any previously fetched context and request it anew.
+        """
+        self.logger.debug("{}.initialise()".format(self.qualified_name))
+        self.context = None
+        self.stamp = None
+        request = rcl_srvs.GetParameters.Request()  # noqa
+        request.names.append("enabled")
+        self.future = self.client.call_async(request)
+        self.feedback_message = "fetching the safety sensors context"
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Wait for the response.
+
+        Returns:
+            :data:`~py_trees.common.Status.RUNNING` until it arrives, :data:`~py_trees.common.Status.SUCCESS` thereafter
+        """
+        self.logger.debug("{}.update()".format(self.qualified_name))
+        if not self.future.done():
+            return py_trees.common.Status.RUNNING
+        response = self.future.result()
+        if (
+            response is None or len(response.values) != 1 or
+            response.values[0].type != rcl_msgs.ParameterType.PARAMETER_BOOL  # noqa
+        ):
+            self.feedback_message = "failed to prefetch the safety sensors context, it will be fetched on switching"
+            return py_trees.common.Status.SUCCESS
+        self.context = response.values[0].bool_value
+        self.stamp = self.now()
+        self.feedback_message = "prefetched the safety sensors context [enabled: {}]".format(self.context)
+        return py_trees.common.Status.SUCCESS
+
+    def terminate(self, new_status: py_trees.common.Status):
+        """
+        Drop a request still in flight, e.g. when the motion it overlaps finished first.
+
+        Args:
+            new_status: the behaviour is transitioning to this new status
+        """
+        if new_status == py_trees.common.Status.INVALID and self.future is not None and not self.future.done():
+            self.future.cancel()
+            self.feedback_message = "prefetch abandoned"
+
+    def take(self) -> typing.Optional[bool]:
+        """
+        Take the prefetched context, if there is a fresh one. It can only be taken once.
+
+        Returns:
+            the context, or None if there is no fresh context
+        """
+        context, stamp = self.context, self.stamp
+        self.context = None
+        self.stamp = None
+        if context is None or self.now() - stamp > self.max_age:
+            return None
+        return context
+
+    def now(self) -> float:
+        """
+        Current time (s) according to the node's clock (wall or simulated).
+        """
+        return self.node.get_clock().now().nanoseconds * 1e-9
+
+    def shutdown(self):
+        """
+        Release the parameter service client.
+        """
+        if self.client is not None:
+            self.node.destroy_client(self.client)
+            self.client = None
+
 
 class ScanContext(py_trees.behaviour.Behaviour):
     """
@@ -118,13 +422,20 @@ class ScanContext(py_trees.behaviour.Behaviour):
     that for the the duration of the context before returning it to
     it's original value in :meth:`terminate()`.
 
+    With a :class:`PrefetchScanContext`, the context fetched ahead of time
+    is used (if fresh) and the switch is committed immediately, saving
+    a service round trip.
+
     Args:
         name (:obj:`str`): name of the behaviour
+        prefetch: take the context from here, if it has one
     """
-    def __init__(self, name):
+    def __init__(self, name, prefetch: PrefetchScanContext=None):
         super().__init__(name=name)
 
+        self.prefetch = prefetch
         self.cached_context = None
+        self.parameter_clients = {}
 
     def setup(self, **kwargs):
         """
@@ -180,9 +491,13 @@ class ScanContext(py_trees.behaviour.Behaviour):
 
         """
         self.logger.debug("%s.initialise()" % self.__class__.__name__)
-        self.cached_context = None
-        # kickstart get/set parameter chain
-        self._send_get_parameter_request()
+        self.cached_context = self.prefetch.take() if self.prefetch is not None else None
+        if self.cached_context is not None:
+            # commit the pre-armed switch
+            self._send_set_parameter_request(value=True)
+        else:
+            # kickstart get/set parameter chain
+            self._send_get_parameter_request()
 
     def update(self) -> py_trees.common.Status:
         """
@@ -223,6 +538,14 @@ class ScanContext(py_trees.behaviour.Behaviour):
             self._send_set_parameter_request(value=self.cached_context)
             # don't worry about the response, no chance to catch it anyway
 
+    def shutdown(self):
+        """
+        Release the parameter service clients.
+        """
+        for client in self.parameter_clients.values():
+            self.node.destroy_client(client)
+        self.parameter_clients = {}
+
     def _send_get_parameter_request(self):
         request = rcl_srvs.GetParameters.Request()  # noqa
         request.names.append("enabled")
@@ -257,7 +580,7 @@ class ScanContext(py_trees.behaviour.Behaviour):
         self.set_parameter_future = self.parameter_clients['set_safety_sensors'].call_async(request)
 
     def _process_set_parameter_response(self) -> bool:
-        if not self.get_parameter_future.done():
+        if not self.set_parameter_future.done():
             return False
         if self.set_parameter_future.result() is not None:
             self.feedback_message = "reconfigured the safety sensors context"
@@ -266,3 +589,62 @@ class ScanContext(py_trees.behaviour.Behaviour):
             self.node.get_logger().error(self.feedback_message)
             # self.node.get_logger().info('service call failed %r' % (future.exception(),))
         return True
+
+
+class Timer(py_trees.timers.Timer):
+    """
+    A :class:`py_trees.timers.Timer` that keeps time with the ros2 node's
+    clock, so that it respects simulated time (``use_sim_time``). If it is
+    not provided a node in :meth:`setup`, it falls back to wall time.
+
+    Args:
+        name: name of the behaviour
+        duration: length of time to run (in seconds)
+    """
+    def __init__(self, name: str="Timer", duration: float=5.0):
+        super().__init__(name=name, duration=duration)
+        self.clock = None
+
+    def setup(self, **kwargs):
+        """
+        Look for the ros2 node and use its clock.
+
+        Args:
+            **kwargs (:obj:`dict`): look for the 'node' object being passed down from the tree
+        """
+        self.logger.debug("{}.setup()".format(self.qualified_name))
+        node = kwargs.get('node', None)
+        self.clock = node.get_clock() if node is not None else None
+
+    def now(self) -> float:
+        """
+        Current time (s), from the node's clock if available.
+        """
+        if self.clock is None:
+            return time.time()
+        return self.clock.now().nanoseconds * 1e-9
+
+    def initialise(self):
+        """
+        Store the expected finishing time.
+        """
+        self.logger.debug("{}.initialise()".format(self.qualified_name))
+        if self.finish_time is None:
+            self.finish_time = self.now() + self.duration
+        self.feedback_message = "configured to fire in '{0}' seconds".format(self.duration)
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Check the current time against the expected finishing time.
+
+        Returns:
+            :data:`~py_trees.common.Status.SUCCESS` if the timer ran out,
+            :data:`~py_trees.common.Status.RUNNING` otherwise
+        """
+        self.logger.debug("{}.update()".format(self.qualified_name))
+        if self.now() > self.finish_time:
+            self.feedback_message = "timer ran out [{0}]".format(self.duration)
+            return py_trees.common.Status.SUCCESS
+        else:
+            self.feedback_message = "still running"
+            return py_trees.common.Status.RUNNING
@@ -0,0 +1,265 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Change tracking for the blackboard.
+
+Every write to the blackboard, whatever the client, ends up as an item
+assignment (or deletion) on :attr:`py_trees.blackboard.Blackboard.storage`.
+Replacing that dictionary with a :class:`VersionedStorage` gives each key a
+version that changes whenever the key is written, so behaviours can
+cheaply tell whether anything they depend on has changed since they
+last looked.
+
+Nested writes (e.g. ``battery.percentage``) and in-place mutation of
+stored objects bypass the storage altogether, so only immutable values
+can be relied upon (refer to :func:`is_immutable`).
+
+Writes can also be grouped into a :func:`batch`, so that they land on the
+blackboard together.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import contextlib
+import enum
+import itertools
+import threading
+import typing
+
+import py_trees
+
+##############################################################################
+# Storage
+##############################################################################
+
+
+class VersionedStorage(dict):
+    """
+    Dictionary that stamps each key with a new version whenever it is
+    set or deleted. Versions are drawn from a single, ever increasing
+    counter, so a key's version never repeats, not even after it has been
+    deleted and set again.
+
+    While a batch is open, writes (and deletions) from the thread that
+    opened it are held back and then committed all at once when it closes.
+    Each thread has its own batch, so trees ticking on different threads
+    (the storage is shared by every blackboard in the process) can batch
+    at the same time.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counter = itertools.count(1)
+        self.versions = {key: next(self._counter) for key in self}
+        self._pending = {}  # thread id -> writes held back by that thread's batch
+        self._lock = threading.Lock()  # serialises commits
+
+    def _touch(self, key: str):
+        self.versions[key] = next(self._counter)
+
+    def version(self, key: str) -> int:
+        """
+        Version of the key (zero if it was never written).
+
+        Args:
+            key: absolute name of the key
+        """
+        return self.versions.get(key, 0)
+
+    def _batch(self) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        return self._pending.get(threading.get_ident(), None)
+
+    def __setitem__(self, key, value):
+        pending = self._batch()
+        if pending is not None:
+            pending[key] = value
+            return
+        super().__setitem__(key, value)
+        self._touch(key)
+
+    def __delitem__(self, key):
+        pending = self._batch()
+        if pending is not None:
+            if key not in self and pending.get(key, _deleted) is _deleted:
+                raise KeyError(key)
+            pending[key] = _deleted
+            return
+        super().__delitem__(key)
+        self._touch(key)
+
+    def open_batch(self):
+        """
+        Start holding back writes from this thread.
+
+        Raises:
+            RuntimeError: if this thread already has a batch open
+        """
+        if self._batch() is not None:
+            raise RuntimeError("a blackboard batch is already open on this thread")
+        self._pending[threading.get_ident()] = {}
+
+    def commit_batch(self) -> typing.List[str]:
+        """
+        Commit the writes held back since this thread's batch was opened.
+
+        Returns:
+            the keys that were written (or deleted)
+        """
+        pending = self._pending.pop(threading.get_ident(), None) or {}
+        deleted = [key for key, value in pending.items() if value is _deleted]
+        written = {key: value for key, value in pending.items() if value is not _deleted}
+        with self._lock:
+            super().update(written)
+            for key in deleted:
+                super().pop(key, None)
+            for key in pending:
+                self._touch(key)
+        return list(pending.keys())
+
+    def pop(self, key, *args):
+        if key in self:
+            self._touch(key)
+        return super().pop(key, *args)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._touch(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+            return default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        for key in self:
+            self._touch(key)
+        super().clear()
+
+
+_deleted = object()
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def install() -> VersionedStorage:
+    """
+    Swap the blackboard's storage for a :class:`VersionedStorage` (once),
+    retaining anything already stored.
+
+    Returns:
+        the blackboard's storage
+    """
+    if not isinstance(py_trees.blackboard.Blackboard.storage, VersionedStorage):
+        py_trees.blackboard.Blackboard.storage = VersionedStorage(py_trees.blackboard.Blackboard.storage)
+    return py_trees.blackboard.Blackboard.storage
+
+
+@contextlib.contextmanager
+def batch() -> typing.Iterator[VersionedStorage]:
+    """
+    Hold back this thread's blackboard writes until the block exits, then
+    commit them in one go. Other threads see all of them or none. Reads
+    inside the block still see the values from before it.
+
+    The batch is committed even if the block raises, writes that were
+    already made are not rolled back.
+
+    Yields:
+        the blackboard's storage (change tracking is installed if need be)
+
+    Raises:
+        RuntimeError: if this thread already has a batch open
+    """
+    storage = install()
+    storage.open_batch()
+    try:
+        yield storage
+    finally:
+        storage.commit_batch()
+
+
+def versions(keys: typing.Iterable[str]) -> typing.Tuple[int, ...]:
+    """
+    Current versions of the specified keys.
+
+    Args:
+        keys: absolute names of the keys
+
+    Returns:
+        the versions, in order (all zero if change tracking is not installed)
+    """
+    storage = py_trees.blackboard.Blackboard.storage
+    if not isinstance(storage, VersionedStorage):
+        return tuple(0 for unused_key in keys)
+    return tuple(storage.version(key) for key in keys)
+
+
+_immutable_types = (type(None), bool, int, float, complex, str, bytes, frozenset, enum.Enum)
+
+
+def is_immutable(value: typing.Any) -> bool:
+    """
+    Whether the value can only change by being replaced on the blackboard
+    (nested writes or mutation of the object otherwise bypass change tracking).
+
+    Args:
+        value: the value to check
+
+    Returns:
+        true for primitive and enum values, and tuples of them
+    """
+    if isinstance(value, tuple):
+        return all(is_immutable(element) for element in value)
+    return isinstance(value, _immutable_types)
+
+
+class Watch(object):
+    """
+    Watches a set of keys for changes between successive checks.
+    Unless change tracking is installed, or while any of the values are
+    mutable, every check reports a change.
+
+    Args:
+        keys: absolute names of the keys to watch
+    """
+    def __init__(self, keys: typing.Iterable[str]):
+        self.keys = sorted(keys)
+        self.last_versions = None
+
+    def changed(self) -> bool:
+        """
+        Check whether any of the keys have changed since the last check.
+        """
+        storage = py_trees.blackboard.Blackboard.storage
+        current = versions(self.keys)
+        if (
+            current == self.last_versions and
+            isinstance(storage, VersionedStorage)
+        ):
+            return False
+        trackable = isinstance(storage, VersionedStorage) and all(
+            is_immutable(storage.get(key, None)) for key in self.keys
+        )
+        self.last_versions = current if trackable else None
+        return True
+
+    def reset(self):
+        """
+        Forget the last check, the next check will report a change.
+        """
+        self.last_versions = None
@@ -0,0 +1,326 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Compile a static tree into a flat tick program.
+
+Ticking a tree the usual way creates and resumes a generator for every
+behaviour visited, every tick. A :class:`Program` instead numbers the
+behaviours up front, records each composite's children as an index range
+into a flat array and ticks the lot with plain function calls that follow
+the exact semantics of :class:`py_trees.composites.Sequence`,
+:class:`py_trees.composites.Selector`, :class:`py_trees.composites.Parallel`
+and :meth:`py_trees.behaviour.Behaviour.tick`.
+
+Status and feedback are kept on the behaviours themselves (their own
+methods read them), so introspection, visitors and snapshots carry on as before.
+Anything that customises its own ticking (decorators, other composites,
+subclasses of the above) is ticked through its generator, along with
+the subtree beneath it.
+
+The program follows the composites of a particular py_trees release
+(refer to :data:`PY_TREES_VERSIONS`). With any other release installed,
+:func:`compile_tree` refuses to compile and trees carry on ticking with
+the generators.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import array
+import typing
+
+import py_trees
+
+##############################################################################
+# Instructions
+##############################################################################
+
+LEAF = 0
+SEQUENCE = 1
+SELECTOR = 2
+PARALLEL = 3
+GENERATOR = 4
+
+_composites = {
+    py_trees.composites.Sequence: SEQUENCE,
+    py_trees.composites.Selector: SELECTOR,
+    py_trees.composites.Parallel: PARALLEL,
+}
+
+_statuses = tuple(py_trees.common.Status)
+
+PY_TREES_VERSIONS = ("2.2",)
+"""Releases (major.minor) of py_trees whose composites the program follows."""
+
+
+def supported(version: str=py_trees.version.__version__) -> bool:
+    """
+    Check whether the compiler follows the composites of a py_trees release.
+
+    Args:
+        version: the py_trees version (default: the installed version)
+
+    Returns:
+        whether trees can be compiled
+    """
+    return ".".join(version.split(".")[:2]) in PY_TREES_VERSIONS
+
+##############################################################################
+# Program
+##############################################################################
+
+
+def instruction(behaviour: py_trees.behaviour.Behaviour) -> int:
+    """
+    The instruction that ticks this behaviour.
+
+    Args:
+        behaviour: the behaviour to classify
+
+    Returns:
+        one of the instruction constants
+    """
+    kind = _composites.get(type(behaviour), None)
+    if kind is not None:
+        return kind
+    if type(behaviour).tick is py_trees.behaviour.Behaviour.tick:
+        return LEAF
+    return GENERATOR
+
+
+class Program(object):
+    """
+    A flat tick program for a (sub)tree. Compiling is cheap, but the program
+    only remains valid while the tree keeps its shape, check with :meth:`valid`
+    before ticking and recompile if need be.
+
+    Args:
+        root: root of the (sub)tree to compile
+    """
+    __slots__ = ('root', 'nodes', 'instructions', 'first', 'end', 'children', 'composites', 'shapes', 'ops', '_plain_stop')
+
+    def __init__(self, root: py_trees.behaviour.Behaviour):
+        self.root = root
+        self.nodes = []
+        self.instructions = array.array('B')
+        pending = [root]
+        while pending:
+            behaviour = pending.pop()
+            self.nodes.append(behaviour)
+            kind = instruction(behaviour)
+            self.instructions.append(kind)
+            if kind in (SEQUENCE, SELECTOR, PARALLEL):
+                pending.extend(reversed(behaviour.children))
+        indices = {id(behaviour): i for i, behaviour in enumerate(self.nodes)}
+        self.first = array.array('i', [0] * len(self.nodes))
+        self.end = array.array('i', [0] * len(self.nodes))
+        self.children = array.array('i')
+        self.composites = []
+        self.shapes = []
+        for i, behaviour in enumerate(self.nodes):
+            if self.instructions[i] in (SEQUENCE, SELECTOR, PARALLEL):
+                self.first[i] = len(self.children)
+                self.children.extend(indices[id(child)] for child in behaviour.children)
+                self.end[i] = len(self.children)
+                self.composites.append(behaviour)
+                self.shapes.append(list(behaviour.children))
+        self._plain_stop = {
+            id(behaviour) for behaviour in self.nodes
+            if type(behaviour).stop is py_trees.behaviour.Behaviour.stop
+        }
+        self.ops = (self._leaf, self._sequence, self._selector, self._parallel, self._generator)
+
+    def valid(self) -> bool:
+        """
+        Check that the compiled composites still have the same children.
+
+        Returns:
+            whether the program can still be used to tick the tree
+        """
+        for composite, shape in zip(self.composites, self.shapes):
+            if composite.children != shape:
+                return False
+        return True
+
+    def tick(self, visitors: typing.Sequence[py_trees.visitors.VisitorBase]=()):
+        """
+        Tick the tree once, visiting behaviours in the same order as a
+        generator driven tick would.
+
+        Args:
+            visitors: visitors to run on behaviours as they finish ticking
+        """
+        self.ops[self.instructions[0]](0, tuple(visitors))
+
+    def _tick(self, i: int, visitors: typing.Tuple[py_trees.visitors.VisitorBase, ...]):
+        self.ops[self.instructions[i]](i, visitors)
+
+    def _leaf(self, i, visitors):
+        behaviour = self.nodes[i]
+        if behaviour.status != py_trees.common.Status.RUNNING:
+            behaviour.initialise()
+        new_status = behaviour.update()
+        if new_status not in _statuses:
+            behaviour.logger.error("A behaviour returned an invalid status, setting to INVALID [%s][%s]" % (new_status, behaviour.name))
+            new_status = py_trees.common.Status.INVALID
+        if new_status != py_trees.common.Status.RUNNING:
+            self._stop(behaviour, new_status)
+        behaviour.status = new_status
+        for visitor in visitors:
+            behaviour.visit(visitor)
+
+    def _stop(self, behaviour, new_status):
+        # skip the debug formatting and generator reset of the stock stop()
+        if id(behaviour) in self._plain_stop:
+            behaviour.terminate(new_status)
+            behaviour.status = new_status
+        else:
+            behaviour.stop(new_status)
+
+    def _sequence(self, i, visitors):
+        sequence = self.nodes[i]
+        children = sequence.children
+        index = 0
+        if sequence.status != py_trees.common.Status.RUNNING:
+            sequence.current_child = children[0] if children else None
+            for child in children:
+                if child.status != py_trees.common.Status.INVALID:
+                    self._stop(child, py_trees.common.Status.INVALID)
+            sequence.initialise()
+        elif sequence.memory:
+            index = children.index(sequence.current_child)
+        else:
+            sequence.current_child = children[0] if children else None
+        if not children:
+            sequence.current_child = None
+            sequence.stop(py_trees.common.Status.SUCCESS)
+        else:
+            for k in range(self.first[i] + index, self.end[i]):
+                child = self.nodes[self.children[k]]
+                self._tick(self.children[k], visitors)
+                if child.status != py_trees.common.Status.SUCCESS:
+                    sequence.status = child.status
+                    if not sequence.memory:
+                        for sibling in children[index + 1:]:
+                            if sibling.status != py_trees.common.Status.INVALID:
+                                self._stop(sibling, py_trees.common.Status.INVALID)
+                    break
+                if index + 1 < len(children):
+                    index += 1
+                    sequence.current_child = children[index]
+            else:
+                sequence.stop(py_trees.common.Status.SUCCESS)
+        for visitor in visitors:
+            sequence.visit(visitor)
+
+    def _selector(self, i, visitors):
+        selector = self.nodes[i]
+        children = selector.children
+        if selector.status != py_trees.common.Status.RUNNING:
+            selector.current_child = children[0] if children else None
+            selector.initialise()
+        if not children:
+            selector.current_child = None
+            selector.stop(py_trees.common.Status.FAILURE)
+            for visitor in visitors:
+                selector.visit(visitor)
+            return
+        index = 0
+        if selector.memory:
+            index = children.index(selector.current_child)
+            for child in children[:index]:
+                self._stop(child, py_trees.common.Status.INVALID)
+        previous = selector.current_child
+        for k in range(self.first[i] + index, self.end[i]):
+            child = self.nodes[self.children[k]]
+            self._tick(self.children[k], visitors)
+            if child.status == py_trees.common.Status.RUNNING or child.status == py_trees.common.Status.SUCCESS:
+                selector.current_child = child
+                selector.status = child.status
+                if previous is None or previous != child:
+                    # we interrupted, invalidate everything at a lower priority
+                    passed = False
+                    for sibling in children:
+                        if passed and sibling.status != py_trees.common.Status.INVALID:
+                            self._stop(sibling, py_trees.common.Status.INVALID)
+                        passed = passed or sibling == child
+                break
+        else:
+            selector.status = py_trees.common.Status.FAILURE
+            selector.current_child = children[-1]
+        for visitor in visitors:
+            selector.visit(visitor)
+
+    def _parallel(self, i, visitors):
+        parallel = self.nodes[i]
+        parallel.validate_policy_configuration()
+        children = parallel.children
+        if parallel.status != py_trees.common.Status.RUNNING:
+            for child in children:
+                if child.status != py_trees.common.Status.INVALID:
+                    self._stop(child, py_trees.common.Status.INVALID)
+            parallel.current_child = None
+            parallel.initialise()
+        if not children:
+            parallel.current_child = None
+            parallel.stop(py_trees.common.Status.SUCCESS)
+            for visitor in visitors:
+                parallel.visit(visitor)
+            return
+        policy = parallel.policy
+        for k in range(self.first[i], self.end[i]):
+            if policy.synchronise and self.nodes[self.children[k]].status == py_trees.common.Status.SUCCESS:
+                continue
+            self._tick(self.children[k], visitors)
+        new_status = py_trees.common.Status.RUNNING
+        parallel.current_child = children[-1]
+        failed = [child for child in children if child.status == py_trees.common.Status.FAILURE]
+        if failed:
+            parallel.current_child = failed[0]
+            new_status = py_trees.common.Status.FAILURE
+        elif type(policy) is py_trees.common.ParallelPolicy.SuccessOnAll:
+            if all(child.status == py_trees.common.Status.SUCCESS for child in children):
+                new_status = py_trees.common.Status.SUCCESS
+        elif type(policy) is py_trees.common.ParallelPolicy.SuccessOnOne:
+            successful = [child for child in children if child.status == py_trees.common.Status.SUCCESS]
+            if successful:
+                new_status = py_trees.common.Status.SUCCESS
+                parallel.current_child = successful[-1]
+        elif type(policy) is py_trees.common.ParallelPolicy.SuccessOnSelected:
+            if all(child.status == py_trees.common.Status.SUCCESS for child in policy.children):
+                new_status = py_trees.common.Status.SUCCESS
+                parallel.current_child = policy.children[-1]
+        else:
+            raise RuntimeError("this parallel has been configured with an unrecognised policy [{}]".format(type(policy)))
+        if new_status != py_trees.common.Status.RUNNING:
+            parallel.stop(new_status)
+        parallel.status = new_status
+        for visitor in visitors:
+            parallel.visit(visitor)
+
+    def _generator(self, i, visitors):
+        for node in self.nodes[i].tick():
+            for visitor in visitors:
+                node.visit(visitor)
+
+
+def compile_tree(root: py_trees.behaviour.Behaviour) -> typing.Optional[Program]:
+    """
+    Compile a (sub)tree into a flat tick program.
+
+    Args:
+        root: root of the (sub)tree
+
+    Returns:
+        the program, or None if the installed py_trees isn't supported (refer to :func:`supported`)
+    """
+    if not supported():
+        return None
+    return Program(root)
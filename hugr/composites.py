@@ -0,0 +1,138 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Composites for the tutorials.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import time
+import typing
+
+import py_trees
+
+from . import blackboard
+from . import metrics
+
+##############################################################################
+# Composites
+##############################################################################
+
+
+class DataGathering(py_trees.composites.Composite):
+    """
+    Ticks all of its children, the data gatherers, once per tick and
+    independently of one another. Unlike a sequence, a gatherer that is
+    still waiting on data (or failing) doesn't hold up the gatherers
+    behind it.
+
+    The gatherers' blackboard writes are batched and committed together
+    once they have all ticked (refer to :func:`hugr.blackboard.batch`), so
+    anything else reading the blackboard never sees a partial update.
+    Gatherers should therefore not read back what they write in the same tick.
+    Batches are per thread, so trees ticking on other threads are unaffected,
+    but the tree's visitors run (on the ticking thread) as each gatherer
+    yields, so their blackboard writes land in the batch too.
+
+    The time each gatherer spends ticking is recorded (refer to :meth:`statistics`)
+    and the slowest is named in the feedback message.
+
+    * :data:`~py_trees.common.Status.SUCCESS` if all gatherers succeeded
+    * :data:`~py_trees.common.Status.FAILURE` if any gatherer failed
+    * :data:`~py_trees.common.Status.RUNNING` otherwise (e.g. still waiting for a first message)
+
+    Args:
+        name: the composite behaviour name
+        children: the data gathering behaviours
+    """
+    def __init__(
+            self,
+            name: typing.Union[str, py_trees.common.Name]="Topics2BB",
+            children: typing.List[py_trees.behaviour.Behaviour]=None
+    ):
+        super().__init__(name, children)
+        self.costs = {}
+
+    def tick(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        """
+        Tick over all the gatherers, then commit their writes.
+
+        Yields:
+            :class:`~py_trees.behaviour.Behaviour`: a reference to itself or one of its children
+        """
+        self.logger.debug("%s.tick()" % self.__class__.__name__)
+        if self.status != py_trees.common.Status.RUNNING:
+            for child in self.children:
+                if child.status != py_trees.common.Status.INVALID:
+                    child.stop(py_trees.common.Status.INVALID)
+            self.current_child = None
+            self.initialise()
+        if not self.children:
+            self.current_child = None
+            self.stop(py_trees.common.Status.SUCCESS)
+            yield self
+            return
+        with blackboard.batch():
+            for child in self.children:
+                # only charge the child's own work, not that of the visitors in between
+                cost = 0.0
+                start_time = time.perf_counter()
+                for node in child.tick():
+                    cost += time.perf_counter() - start_time
+                    yield node
+                    start_time = time.perf_counter()
+                cost += time.perf_counter() - start_time
+                self._cost(child).observe(cost)
+        statuses = [child.status for child in self.children]
+        if py_trees.common.Status.FAILURE in statuses:
+            new_status = py_trees.common.Status.FAILURE
+            self.current_child = self.children[statuses.index(py_trees.common.Status.FAILURE)]
+        elif all(status == py_trees.common.Status.SUCCESS for status in statuses):
+            new_status = py_trees.common.Status.SUCCESS
+            self.current_child = self.children[-1]
+        else:
+            new_status = py_trees.common.Status.RUNNING
+            self.current_child = self.children[statuses.index(py_trees.common.Status.RUNNING)]
+        slowest = max(self.children, key=lambda child: self._cost(child).mean)
+        self.feedback_message = "slowest: {} ({:.1f}us mean)".format(slowest.name, 1e6 * self._cost(slowest).mean)
+        if new_status != py_trees.common.Status.RUNNING:
+            self.stop(new_status)
+        self.status = new_status
+        yield self
+
+    def stop(self, new_status: py_trees.common.Status=py_trees.common.Status.INVALID):
+        """
+        Stop any gatherers that are still running.
+
+        Args:
+            new_status: the composite is transitioning to this new status
+        """
+        for child in self.children:
+            if child.status == py_trees.common.Status.RUNNING:
+                child.stop(py_trees.common.Status.INVALID)
+        super().stop(new_status)
+
+    def statistics(self) -> typing.Dict[str, typing.Dict[str, float]]:
+        """
+        Per gatherer tick cost summaries (s).
+
+        Returns:
+            summaries, keyed by gatherer name
+        """
+        return {child.name: self._cost(child).summary() for child in self.children}
+
+    def _cost(self, child: py_trees.behaviour.Behaviour) -> metrics.Histogram:
+        if child.id not in self.costs:
+            self.costs[child.id] = metrics.Histogram(
+                name=child.name,
+                buckets=metrics.exponential_buckets(start=1e-6, factor=2.0, count=20)
+            )
+        return self.costs[child.id]
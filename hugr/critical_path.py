@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Critical path analysis of jobs in a trace (refer to :mod:`hugr.tracing`).
+
+A job is an activation of its subtree's root (e.g. 'Scan'). Its critical
+path is found by descending the activations below it: a parallel waits on
+the child that finished last, any other composite on the chain of children
+that ran one after the other, ending with the one that finished last.
+
+Time on the critical path that isn't spent on a step is waiting:
+
+* **gaps**: between one step finishing and the next starting (e.g. it
+  was only ticked on a later tick)
+* **latency**: between an action's result arriving and the tick that
+  noticed it, finishing the step
+
+Both are quantised by the tick period. From them, the tool estimates what
+ticking faster would save, and what running adjacent steps concurrently
+would save if they are independent of each other.
+
+.. code-block:: bash
+
+   $ hugr-critical-path /tmp/scan.json
+   $ hugr-critical-path /tmp/scan.json --job Scan --target-period 0.05 --json
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import argparse
+import collections
+import json
+import statistics
+import sys
+import typing
+
+import py_trees.console as console
+
+from . import tracing
+
+##############################################################################
+# Results
+##############################################################################
+
+Span = collections.namedtuple(
+    'Span',
+    ['name', 'id', 'parent', 'class_name', 'start', 'end', 'start_tick', 'end_tick', 'sequence', 'outcome']
+)
+Span.__doc__ = """
+A behaviour activation: start and end times (s) and ticks, and its outcome.
+"""
+
+Goal = collections.namedtuple('Goal', ['action', 'behaviour', 'sent', 'accepted', 'result', 'outcome'])
+Goal.__doc__ = """
+An action goal sent by a behaviour: when it was sent, accepted and its
+result arrived (s, None if it never did), and the result's outcome.
+"""
+
+Step = collections.namedtuple(
+    'Step', ['name', 'parent', 'depth', 'start', 'end', 'duration', 'gap', 'latency']
+)
+Step.__doc__ = """
+An activation on the critical path, its depth below the job, the gap (s)
+since the previous step under the same parent finished (or the parent
+started) and the latency (s) between its action's result and its finishing.
+"""
+
+Job = collections.namedtuple('Job', ['name', 'start', 'end', 'duration', 'start_tick', 'end_tick', 'outcome', 'steps'])
+Job.__doc__ = """
+A job, its duration (s) and the steps on its critical path, in order.
+"""
+
+Suggestion = collections.namedtuple('Suggestion', ['description', 'saving'])
+Suggestion.__doc__ = """
+A restructuring and the job time (s) it is estimated to save.
+"""
+
+##############################################################################
+# Analysis
+##############################################################################
+
+
+class Timeline(object):
+    """
+    Behaviour activations and action goals loaded from trace events.
+
+    Args:
+        events: trace events, as saved by :class:`hugr.tracing.Tracer`
+    """
+    def __init__(self, events: typing.List[typing.Dict[str, typing.Any]]):
+        self.spans = []
+        self.children = collections.defaultdict(list)  # parent id: [Span]
+        self.goals = collections.defaultdict(list)  # behaviour name: [Goal]
+        tick_starts = []
+        goal_events = collections.defaultdict(dict)  # id: phase: event (marks by name)
+        for event in events:
+            if event.get('ph') == 'X' and event.get('cat') == 'behaviour':
+                args = event['args']
+                span = Span(
+                    name=event['name'],
+                    id=args['id'],
+                    parent=args['parent'],
+                    class_name=args.get('class', ""),
+                    start=event['ts'] / 1e6,
+                    end=(event['ts'] + event['dur']) / 1e6,
+                    start_tick=args['start_tick'],
+                    end_tick=args['end_tick'],
+                    sequence=args.get('sequence', 0),
+                    outcome=args.get('outcome', "")
+                )
+                self.spans.append(span)
+                self.children[span.parent].append(span)
+            elif event.get('ph') == 'X' and event.get('cat') == 'tick':
+                tick_starts.append(event['ts'] / 1e6)
+            elif event.get('cat') == 'action' and event.get('ph') in ('b', 'n', 'e'):
+                key = event['ph'] if event['ph'] != 'n' else event['name']
+                goal_events[event['id']][key] = event
+        for events_by_phase in goal_events.values():
+            sent = events_by_phase.get('b', None)
+            if sent is None:
+                continue
+            accepted = events_by_phase.get('accepted', None)
+            result = events_by_phase.get('e', None)
+            goal = Goal(
+                action=sent['name'],
+                behaviour=sent['args'].get('behaviour', ""),
+                sent=sent['ts'] / 1e6,
+                accepted=accepted['ts'] / 1e6 if accepted is not None else None,
+                result=result['ts'] / 1e6 if result is not None else None,
+                outcome=result['args'].get('outcome', "") if result is not None else None
+            )
+            self.goals[goal.behaviour].append(goal)
+        for spans in self.children.values():
+            spans.sort(key=lambda span: span.sequence)
+        for goals in self.goals.values():
+            goals.sort(key=lambda goal: goal.sent)
+        tick_starts.sort()
+        intervals = [b - a for a, b in zip(tick_starts, tick_starts[1:])]
+        self.period = statistics.median(intervals) if intervals else None
+
+    def jobs(self, name: str) -> typing.List[Job]:
+        """
+        Every activation of a job's root and its critical path.
+
+        Args:
+            name: name of the job's root behaviour
+
+        Returns:
+            the jobs, in order
+        """
+        roots = sorted([span for span in self.spans if span.name == name], key=lambda span: span.start)
+        return [
+            Job(
+                name=root.name, start=root.start, end=root.end, duration=root.end - root.start,
+                start_tick=root.start_tick, end_tick=root.end_tick, outcome=root.outcome,
+                steps=self.critical_path(root)
+            ) for root in roots
+        ]
+
+    def critical_path(self, span: Span, depth: int=0) -> typing.List[Step]:
+        """
+        The activations below a span that its finishing waited on.
+
+        Args:
+            span: the activation
+            depth: depth of the span's children (relative to the job)
+
+        Returns:
+            the steps, parents before their children
+        """
+        children = [
+            child for child in self.children.get(span.id, [])
+            if span.start_tick <= child.start_tick and child.end_tick <= span.end_tick
+        ]
+        if not children:
+            return []
+        # of those finishing together, the one that finished of its own accord, rather than being stopped
+        last = max(children, key=lambda child: (child.end, child.outcome != "INVALID", child.sequence))
+        chain = [last]
+        if span.class_name != 'Parallel':
+            # work back through the children that ran before it
+            while True:
+                predecessors = [
+                    child for child in children
+                    if child.sequence < chain[-1].sequence and child.end_tick <= chain[-1].start_tick
+                ]
+                if not predecessors:
+                    break
+                chain.append(max(predecessors, key=lambda child: (child.end, child.outcome != "INVALID", child.sequence)))
+            chain.reverse()
+        steps = []
+        previous_end = span.start
+        for child in chain:
+            steps.append(Step(
+                name=child.name, parent=span.name, depth=depth,
+                start=child.start, end=child.end, duration=child.end - child.start,
+                gap=max(0.0, child.start - previous_end), latency=self.latency(child)
+            ))
+            steps.extend(self.critical_path(child, depth + 1))
+            previous_end = child.end
+        return steps
+
+    def latency(self, span: Span) -> float:
+        """
+        Time between the result of the (last) goal a span sent arriving and the span finishing.
+
+        Args:
+            span: the activation
+
+        Returns:
+            the latency (s), zero if it sent no goal that finished within it
+        """
+        results = [
+            goal.result for goal in self.goals.get(span.name, [])
+            if span.start <= goal.sent <= span.end and goal.result is not None and goal.result <= span.end
+        ]
+        return span.end - max(results) if results else 0.0
+
+
+def waiting(job: Job) -> float:
+    """
+    Time (s) on a job's critical path spent waiting, rather than on a step.
+
+    Args:
+        job: the job
+
+    Returns:
+        the sum of its steps' gaps and latencies
+    """
+    return sum(step.gap + step.latency for step in job.steps)
+
+
+def suggestions(
+        job: Job,
+        period: typing.Optional[float],
+        target_period: float=None,
+        top: int=3
+) -> typing.List[Suggestion]:
+    """
+    Estimate the savings of ticking faster and of overlapping adjacent steps.
+
+    Waiting on the critical path is assumed to scale with the tick period.
+    Overlapping two adjacent steps under the same parent (e.g. in a parallel)
+    saves at most the shorter of the two, if they are independent.
+
+    Args:
+        job: the job
+        period: the measured tick period (s), None if unknown
+        target_period: the faster tick period (s) (default: half the measured period)
+        top: number of overlapping steps to suggest
+
+    Returns:
+        the suggestions, largest saving first
+    """
+    results = []
+    if period:
+        target_period = target_period if target_period is not None else period / 2.0
+        if target_period < period:
+            results.append(Suggestion(
+                description="tick every {:.3f}s, rather than {:.3f}s".format(target_period, period),
+                saving=waiting(job) * (1.0 - target_period / period)
+            ))
+    overlaps = []
+    for index, step in enumerate(job.steps):
+        following = [
+            other for other in job.steps[index + 1:]
+            if other.depth <= step.depth
+        ]
+        if following and following[0].depth == step.depth and following[0].parent == step.parent:
+            other = following[0]
+            overlaps.append(Suggestion(
+                description="overlap '{}' with '{}' (under '{}')".format(step.name, other.name, step.parent),
+                saving=min(step.duration, other.duration)
+            ))
+    results.extend(sorted(overlaps, key=lambda suggestion: -suggestion.saving)[:top])
+    return sorted(results, key=lambda suggestion: -suggestion.saving)
+
+##############################################################################
+# Main
+##############################################################################
+
+
+def _name(name: str) -> str:
+    return name.replace("\n", " ")
+
+
+def command_line_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="find the critical path of jobs in a trace and where to restructure them",
+        epilog="And his noodly appendage reached forth to tickle the blessed...\n"
+    )
+    parser.add_argument('trace', help='trace file (refer to hugr.tracing)')
+    parser.add_argument('-j', '--job', default="Scan", help="name of the job's root behaviour (default: Scan)")
+    parser.add_argument('-t', '--target-period', type=float, default=None,
+                        help='tick period (s) to estimate the savings of (default: half the measured period)')
+    parser.add_argument('-n', '--top', type=int, default=3, help='number of overlapping steps to suggest')
+    parser.add_argument('--json', action='store_true', default=False, help='print the analysis as json')
+    return parser
+
+
+def main():
+    """
+    Entry point for the critical path analyser.
+    """
+    args = command_line_argument_parser().parse_args()
+    try:
+        timeline = Timeline(tracing.load(args.trace))
+    except (OSError, ValueError, KeyError) as e:
+        console.logerror("failed to load the trace [{}]".format(e))
+        sys.exit(1)
+    jobs = timeline.jobs(args.job)
+    if not jobs:
+        console.logerror("no '{}' jobs in the trace".format(args.job))
+        sys.exit(1)
+    analyses = [
+        (job, suggestions(job, timeline.period, target_period=args.target_period, top=args.top))
+        for job in jobs
+    ]
+    if args.json:
+        print(json.dumps({
+            'period': timeline.period,
+            'jobs': [
+                dict(
+                    job._replace(steps=[step._asdict() for step in job.steps])._asdict(),
+                    waiting=waiting(job),
+                    suggestions=[suggestion._asdict() for suggestion in job_suggestions]
+                ) for job, job_suggestions in analyses
+            ]
+        }, indent=2))
+        return
+    print(console.green + "tick period: " + console.yellow +
+          ("{:.3f}s".format(timeline.period) if timeline.period else "unknown") + console.reset)
+    for index, (job, job_suggestions) in enumerate(analyses):
+        print(console.green + "\n{} #{}: ".format(_name(job.name), index) + console.yellow +
+              "{:.3f}s, ticks {}-{} [{}]".format(job.duration, job.start_tick, job.end_tick, job.outcome) + console.reset)
+        for step in job.steps:
+            print("  {:>8.3f}s {}{:<{width}} {:>8.3f}s{}{}".format(
+                step.start - job.start, "  " * step.depth, _name(step.name), step.duration,
+                "  gap {:.3f}s".format(step.gap) if step.gap > 0.0 else "",
+                "  latency {:.3f}s".format(step.latency) if step.latency > 0.0 else "",
+                width=max(1, 32 - 2 * step.depth)
+            ))
+        print(console.green + "  waiting: " + console.yellow + "{:.3f}s".format(waiting(job)) + console.reset)
+        for suggestion in job_suggestions:
+            print(console.cyan + "  - {}: ".format(suggestion.description) + console.yellow +
+                  "~{:.3f}s".format(suggestion.saving) + console.reset)
+    if len(jobs) > 1:
+        print(console.green + "\njobs: " + console.yellow + "{}, mean {:.3f}s, mean waiting {:.3f}s".format(
+            len(jobs), statistics.mean(job.duration for job in jobs), statistics.mean(waiting(job) for job in jobs)
+        ) + console.reset)
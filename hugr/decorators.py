@@ -0,0 +1,85 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Decorators for the tutorials.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import typing
+
+import py_trees
+
+from . import blackboard
+
+##############################################################################
+# Decorators
+##############################################################################
+
+
+class EternalGuard(py_trees.decorators.EternalGuard):
+    """
+    An eternal guard that only re-evaluates its condition when one of its
+    blackboard keys has changed, otherwise the last result is reused.
+    Idle ticks past a guard whose keys are quiet then cost a handful of
+    dictionary lookups, however expensive the condition.
+
+    The condition must depend on nothing but its blackboard keys. Results
+    are not cached while any of the keys hold mutable values (refer to
+    :mod:`hugr.blackboard`).
+
+    Args:
+        child: the child behaviour or subtree
+        condition: a functional check that determines execution or not of the subtree
+        blackboard_keys: provide read access for the conditional function to these keys
+        name: the decorator name
+        cache: cache the condition's result (disable for conditions with other dependencies)
+    """
+    def __init__(
+            self,
+            *,
+            child: py_trees.behaviour.Behaviour,
+            condition: typing.Any,
+            blackboard_keys: typing.Union[typing.List[str], typing.Set[str]]=[],
+            name: typing.Union[str, py_trees.common.Name]=py_trees.common.Name.AUTO_GENERATED,
+            cache: bool=True
+    ):
+        super().__init__(child=child, condition=condition, blackboard_keys=blackboard_keys, name=name)
+        blackboard.install()
+        self.evaluations = 0
+        self.uncached_condition = self.condition
+        self.watch = blackboard.Watch(
+            keys=[self.blackboard.remappings[key] for key in self.blackboard.read]
+        )
+        self.cached_result = None
+        if cache:
+            self.condition = self.cached_condition
+        else:
+            self.condition = self.evaluate_condition
+
+    def evaluate_condition(self) -> typing.Union[bool, py_trees.common.Status]:
+        """
+        Evaluate the condition.
+        """
+        self.evaluations += 1
+        return self.uncached_condition()
+
+    def cached_condition(self) -> typing.Union[bool, py_trees.common.Status]:
+        """
+        Evaluate the condition, if any of its keys have changed.
+        """
+        if self.watch.changed():
+            try:
+                self.cached_result = self.evaluate_condition()
+            except Exception:
+                self.watch.reset()
+                raise
+        return self.cached_result
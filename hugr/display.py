@@ -0,0 +1,179 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Differential console display of a tree.
+
+Printing the whole tree on every tick costs the tick a tree walk, a
+rendering and a large console write, and drowns the log. Here, the tick
+only notes which behaviours changed status (or appeared, or were pruned).
+A background thread prints the changes at most once a period, with
+changes to the same behaviour within a period folded into one line.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import collections
+import threading
+import typing
+
+import py_trees
+import py_trees.console as console
+
+##############################################################################
+# Display
+##############################################################################
+
+
+class _Change(object):
+    __slots__ = ('name', 'initial', 'final', 'feedback_message', 'transitions', 'tick')
+
+    def __init__(self, name, initial, tick):
+        self.name = name
+        self.initial = initial
+        self.final = initial
+        self.feedback_message = ""
+        self.transitions = 0
+        self.tick = tick
+
+
+class DifferentialDisplay(object):
+    """
+    Prints the behaviours whose status changed, rather than the whole tree.
+    Call :meth:`record` after every tick (e.g. from a post tick handler),
+    :meth:`start` to print from a background thread and :meth:`stop` when done.
+
+    Args:
+        period: minimum time (s) between prints
+        max_lines: lines per print, beyond which changes are only counted
+        unicode: use unicode status symbols, rather than status names
+        printer: prints the lines
+    """
+    def __init__(
+            self,
+            period: float=1.0,
+            max_lines: int=40,
+            unicode: bool=True,
+            printer: typing.Callable[[str], None]=print
+    ):
+        self.period = period
+        self.max_lines = max_lines
+        self.unicode = unicode
+        self.printer = printer
+        self.statuses = {}  # behaviour id: (name, status)
+        self.changes = collections.OrderedDict()  # behaviour id: _Change
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def record(self, tree: py_trees.trees.BehaviourTree):
+        """
+        Note the behaviours that changed status in the tree's latest tick.
+
+        Args:
+            tree: the tree, just after ticking
+        """
+        statuses = {}
+        changed = []
+        for behaviour in tree.root.iterate():
+            statuses[behaviour.id] = (behaviour.name, behaviour.status)
+            last = self.statuses.get(behaviour.id, None)
+            if last is None or last[1] != behaviour.status:
+                changed.append((behaviour.id, behaviour.name, None if last is None else last[1], behaviour.status, behaviour.feedback_message))
+        if len(statuses) != len(self.statuses) or changed:
+            for behaviour_id, (name, status) in self.statuses.items():
+                if behaviour_id not in statuses:
+                    changed.append((behaviour_id, name, status, None, ""))
+        self.statuses = statuses
+        if not changed:
+            return
+        with self.lock:
+            for behaviour_id, name, previous, status, feedback_message in changed:
+                change = self.changes.get(behaviour_id, None)
+                if change is None:
+                    change = self.changes[behaviour_id] = _Change(name, previous, tree.count)
+                change.final = status
+                change.feedback_message = feedback_message
+                change.transitions += 1
+
+    def flush(self) -> typing.List[str]:
+        """
+        Take the changes noted since the last flush, as lines for the console.
+
+        Returns:
+            the lines, empty if nothing changed
+        """
+        with self.lock:
+            changes, self.changes = self.changes, collections.OrderedDict()
+        if not changes:
+            return []
+        lines = []
+        for change in list(changes.values())[:self.max_lines]:
+            lines.append("{}[{}] {}{}: {} {} {}{}{}{}".format(
+                console.cyan, change.tick, console.yellow, change.name,
+                self._status(change.initial, missing="(new)"),
+                "→" if self.unicode else "->",
+                self._status(change.final, missing="(pruned)"),
+                " ({} changes)".format(change.transitions) if change.transitions > 1 else "",
+                console.white + " -- " + change.feedback_message if change.feedback_message else "",
+                console.reset
+            ))
+        if len(changes) > self.max_lines:
+            lines.append("... and {} more".format(len(changes) - self.max_lines))
+        return lines
+
+    def start(self):
+        """
+        Start printing changes from a background thread.
+        """
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._spin, name="differential_display", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread, printing anything still pending.
+        """
+        if self.thread is None:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+
+    def full_tree(self, root: py_trees.behaviour.Behaviour) -> str:
+        """
+        Render the whole tree, e.g. on request.
+
+        Args:
+            root: root of the tree
+
+        Returns:
+            the rendering
+        """
+        if self.unicode:
+            return py_trees.display.unicode_tree(root=root, show_status=True)
+        return py_trees.display.ascii_tree(root=root, show_status=True)
+
+    def _status(self, status: typing.Optional[py_trees.common.Status], missing: str) -> str:
+        if status is None:
+            return missing
+        if self.unicode:
+            return py_trees.display.unicode_symbols[status]
+        return status.name
+
+    def _spin(self):
+        while not self.stopped.wait(self.period):
+            self._print()
+        self._print()
+
+    def _print(self):
+        lines = self.flush()
+        if lines:
+            self.printer("\n".join(lines))
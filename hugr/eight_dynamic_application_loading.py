@@ -30,11 +30,11 @@ mode of operation for robots due to similar resource contention arguments) and t
 conventional use of roslaunch files to bringup a core and later bootstrap / tear
 down application level processes on demand.
 
-This tutorial uses a wrapper class around :class:`py_trees_ros.trees.BehaviourTree` to handle:
+This tutorial uses a wrapper class around :class:`hugr.trees.BehaviourTree` to handle:
 
 1. Construction of the core tree
 2. A job (application) request callback
-3. Insertion of the application subtree in the request callback (if not busy)
+3. Setup of the application subtree in the request callback (if not busy) and insertion in a pre-tick handler
 4. Pruning of the application subtree in a post-tick handler (if finished)
 5. A status report service for external clients of the tree
 
@@ -111,14 +111,22 @@ Dynamic Application Tree (Class)
 
 .. note::
 
-   In the code above, there is a conspicuous absence of thread locks. This is
-   possible due to the use of ROS2's single threaded executors to handle service and
-   subscriber callbacks along with the tree's tick tock that operates from within
-   ROS2 timer callbacks. If using a behaviour tree, as is exemplified here,
-   to handle robot application logic, you should never need to go beyond single
-   threaded execution and thus avoid the complexity and bugs that come along with
-   having to handle concurrency (this is a considerable improvement on the situation
-   for ROS1).
+   The tree is spun by a multi-threaded executor. Job requests and status
+   reports are served from a reentrant callback group (refer to
+   :class:`hugr.trees.BehaviourTree`) so that neither a slow status report
+   nor the (blocking) setup of a job's subtree delays the tick. The only
+   lock guards the hand over of a setup subtree to a pre-tick handler,
+   which inserts it in between ticks. Tree modifications thus remain
+   with the tick, as with a single threaded executor.
+
+.. note::
+
+   The context switch only begins once the robot has moved out, so its
+   service round trips add to every job. Created with ``prefetch_context``,
+   the job fetches the context while moving out instead, then commits the switch
+   as soon as scanning starts. Fetching is read only, so a job cancelled
+   or failing before the scan has nothing to roll back, and a committed
+   switch is rolled back when scanning stops, just as before.
 
 Running
 ^^^^^^^
@@ -140,19 +148,26 @@ Running
 
 import operator
 import sys
+import threading
+import time
 
-import launch
-import launch_ros
 import py_trees
 import py_trees_ros.trees
 import py_trees.console as console
 import py_trees_ros_interfaces.action as py_trees_actions  # noqa
 import py_trees_ros_interfaces.srv as py_trees_srvs  # noqa
 import rclpy
+import rclpy.executors
 import std_msgs.msg as std_msgs
 
+from . import battery
 from . import behaviours
+from . import composites
+from . import decorators
+from . import metrics
 from . import mock
+from . import subscribers
+from . import trees
 
 ##############################################################################
 # Launcher
@@ -166,6 +181,9 @@ def generate_launch_description():
     Returns:
         the launch description
     """
+    import launch
+    import launch_ros
+
     return launch.LaunchDescription(
         mock.launch.generate_launch_nodes() +
         [
@@ -199,20 +217,20 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         )
     )
 
-    topics2bb = py_trees.composites.Sequence(name="Topics2BB", memory=True)
-    scan2bb = py_trees_ros.subscribers.EventToBlackboard(
+    topics2bb = composites.DataGathering(name="Topics2BB")
+    scan2bb = subscribers.EventQueueToBlackboard(
         name="Scan2BB",
         topic_name="/dashboard/scan",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
         variable_name="event_scan_button"
     )
-    cancel2bb = py_trees_ros.subscribers.EventToBlackboard(
+    cancel2bb = subscribers.EventQueueToBlackboard(
         name="Cancel2BB",
         topic_name="/dashboard/cancel",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
         variable_name="event_cancel_button"
     )
-    battery2bb = py_trees_ros.battery.ToBlackboard(
+    battery2bb = battery.ToBlackboard(
         name="Battery2BB",
         topic_name="/battery/state",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
@@ -228,7 +246,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     def check_battery_low_on_blackboard(blackboard: py_trees.blackboard.Blackboard) -> bool:
         return blackboard.battery_low_warning
 
-    battery_emergency = py_trees.decorators.EternalGuard(
+    battery_emergency = decorators.EternalGuard(
         name="Battery Low?",
         condition=check_battery_low_on_blackboard,
         blackboard_keys={"battery_low_warning"},
@@ -245,11 +263,16 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     return root
 
 
-def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
+def tutorial_create_scan_subtree(prefetch_context: bool=False) -> py_trees.behaviour.Behaviour:
     """
     Create the job subtree based on the incoming goal specification.
+
+    With prefetching, the safety sensors context is fetched while moving out,
+    so that the context switch is committed as soon as scanning starts (refer
+    to :class:`hugr.behaviours.PrefetchScanContext`).
+
     Args:
-        goal (:class:`~std_msgs.msg.Empty`): incoming goal specification
+        prefetch_context: prefetch the context for the switch while moving out
     Returns:
        :class:`~py_trees.behaviour.Behaviour`: subtree root
     """
@@ -262,7 +285,7 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
     failed_flash_green = behaviours.FlashLedStrip(name="Flash Red", colour="red")
-    failed_pause = py_trees.timers.Timer("Pause", duration=3.0)
+    failed_pause = behaviours.Timer("Pause", duration=3.0)
     result_failed_to_bb = py_trees.behaviours.SetBlackboardVariable(
         name="Result2BB\n'failed'",
         variable_name='scan_result',
@@ -270,7 +293,7 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
         overwrite=True
     )
     ere_we_go = py_trees.composites.Sequence(name="Ere we Go", memory=True)
-    undock = py_trees_ros.actions.ActionClient(
+    undock = behaviours.ActionClient(
         name="UnDock",
         action_type=py_trees_actions.Dock,
         action_name="dock",
@@ -279,7 +302,7 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
     )
     scan_or_be_cancelled = py_trees.composites.Selector(name="Scan or Be Cancelled", memory=False)
     cancelling = py_trees.composites.Sequence(name="Cancelling?", memory=True)
-    is_cancel_requested = py_trees.behaviours.CheckBlackboardVariableValue(
+    is_cancel_requested = behaviours.CheckBlackboardVariableValue(
         name="Cancel?",
         check=py_trees.common.ComparisonExpression(
             variable="event_cancel_button",
@@ -287,7 +310,7 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
             operator=operator.eq
         )
     )
-    move_home_after_cancel = py_trees_ros.actions.ActionClient(
+    move_home_after_cancel = behaviours.ActionClient(
         name="Move Home",
         action_type=py_trees_actions.MoveBase,
         action_name="move_base",
@@ -301,7 +324,7 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
         overwrite=True
     )
     move_out_and_scan = py_trees.composites.Sequence(name="Move Out and Scan", memory=True)
-    move_base = py_trees_ros.actions.ActionClient(
+    move_base = behaviours.ActionClient(
         name="Move Out",
         action_type=py_trees_actions.MoveBase,
         action_name="move_base",
@@ -312,8 +335,9 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
         name="Scanning",
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
-    scan_context_switch = behaviours.ScanContext("Context Switch")
-    scan_rotate = py_trees_ros.actions.ActionClient(
+    prefetch_context_switch = behaviours.PrefetchScanContext(name="Prefetch Context") if prefetch_context else None
+    scan_context_switch = behaviours.ScanContext("Context Switch", prefetch=prefetch_context_switch)
+    scan_rotate = behaviours.ActionClient(
         name="Rotate",
         action_type=py_trees_actions.Rotate,
         action_name="rotate",
@@ -321,7 +345,7 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
         generate_feedback_message=lambda msg: "{:.2f}%%".format(msg.feedback.percentage_completed)
     )
     scan_flash_blue = behaviours.FlashLedStrip(name="Flash Blue", colour="blue")
-    move_home_after_scan = py_trees_ros.actions.ActionClient(
+    move_home_after_scan = behaviours.ActionClient(
         name="Move Home",
         action_type=py_trees_actions.MoveBase,
         action_name="move_base",
@@ -339,8 +363,8 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
     celebrate_flash_green = behaviours.FlashLedStrip(name="Flash Green", colour="green")
-    celebrate_pause = py_trees.timers.Timer("Pause", duration=3.0)
-    dock = py_trees_ros.actions.ActionClient(
+    celebrate_pause = behaviours.Timer("Pause", duration=3.0)
+    dock = behaviours.ActionClient(
         name="Dock",
         action_type=py_trees_actions.Dock,
         action_name="dock",
@@ -374,30 +398,52 @@ def tutorial_create_scan_subtree() -> py_trees.behaviour.Behaviour:
     ere_we_go.add_children([undock, scan_or_be_cancelled, dock, celebrate])
     scan_or_be_cancelled.add_children([cancelling, move_out_and_scan])
     cancelling.add_children([is_cancel_requested, move_home_after_cancel, result_cancelled_to_bb])
-    move_out_and_scan.add_children([move_base, scanning, move_home_after_scan, result_succeeded_to_bb])
+    if prefetch_context:
+        # the prefetch rides along with the motion, never holding it up
+        move_out_and_prefetch = py_trees.composites.Parallel(
+            name="Move Out and Prefetch",
+            policy=py_trees.common.ParallelPolicy.SuccessOnSelected(children=[move_base])
+        )
+        move_out_and_prefetch.add_children([move_base, prefetch_context_switch])
+        move_out_and_scan.add_children([move_out_and_prefetch, scanning, move_home_after_scan, result_succeeded_to_bb])
+    else:
+        move_out_and_scan.add_children([move_base, scanning, move_home_after_scan, result_succeeded_to_bb])
     scanning.add_children([scan_context_switch, scan_rotate, scan_flash_blue])
     celebrate.add_children([celebrate_flash_green, celebrate_pause])
     return scan
 
 
-class DynamicApplicationTree(py_trees_ros.trees.BehaviourTree):
+class DynamicApplicationTree(trees.BehaviourTree):
     """
     Wraps the ROS behaviour tree manager in a class that manages loading
     and unloading of jobs.
     """
 
-    def __init__(self):
+    def __init__(self, unicode_tree_debug: bool=True, prefetch_context: bool=False, concurrent_setup: bool=False):
         """
         Create the core tree and add post tick handlers for post-execution
         management of the tree.
+
+        Args:
+            unicode_tree_debug: print the behaviours that change (the full tree via ~/display_tree)
+            prefetch_context: create jobs that prefetch the scan context while moving out
+            concurrent_setup: setup the tree and each job's subtree concurrently
         """
         super().__init__(
             root=tutorial_create_root(),
-            unicode_tree_debug=True
+            unicode_tree_debug=unicode_tree_debug,
+            concurrent_setup=concurrent_setup
+        )
+        self.add_pre_tick_handler(
+            self.insert_application_subtree_if_ready
         )
         self.add_post_tick_handler(
             self.prune_application_subtree_if_done
         )
+        self._job_lock = threading.Lock()
+        self._job_requested = False  # a job's subtree is being setup or awaits insertion
+        self._job_subtree = None  # a setup job subtree, awaiting insertion
+        self.prefetch_context = prefetch_context
 
     def setup(self, timeout: float):
         """
@@ -412,39 +458,88 @@ class DynamicApplicationTree(py_trees_ros.trees.BehaviourTree):
             srv_type=py_trees_srvs.StatusReport,
             srv_name="~/report",
             callback=self.deliver_status_report,
-            qos_profile=rclpy.qos.qos_profile_services_default
+            qos_profile=rclpy.qos.qos_profile_services_default,
+            callback_group=self.callback_group('services')
         )
         self._job_subscriber = self.node.create_subscription(
             msg_type=std_msgs.Empty,
             topic="/dashboard/scan",
             callback=self.receive_incoming_job,
-            qos_profile=py_trees_ros.utilities.qos_profile_unlatched()
+            qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
+            callback_group=self.callback_group('services')  # setup blocks, leave the tick be
         )
+        self.jobs = {
+            outcome: self.register_metric(
+                metrics.Counter(name="hugr_jobs_total", help="jobs, by outcome"),
+                labels={'outcome': outcome}
+            ) for outcome in ['accepted', 'rejected', 'succeeded', 'failed']
+        }
+        self.register_metric(metrics.Gauge(
+            name="hugr_jobs_active", help="whether a job subtree is in the tree",
+            function=lambda: 1 if self.busy() else 0
+        ))
 
     def receive_incoming_job(self, msg: std_msgs.Empty):
         """
-        Incoming job callback.
+        Incoming job callback. The job's subtree is created and setup here,
+        alongside the tick, and handed over to the tick for insertion.
+
+        If the subtree fails to setup, the job is dropped (and counted as
+        failed), leaving the tree free to accept the next.
 
         Args:
             msg: incoming goal message
-
-        Raises:
-            Exception: be ready to catch if any of the behaviours raise an exception
         """
-        if self.busy():
-            self.node.get_logger().warning("rejecting new job, last job is still active")
-        else:
-            scan_subtree = tutorial_create_scan_subtree()
-            try:
+        with self._job_lock:
+            if self.busy() or self._job_requested:
+                self.node.get_logger().warning("rejecting new job, last job is still active")
+                self.jobs['rejected'].inc()
+                return
+            self._job_requested = True
+        self.jobs['accepted'].inc()
+        scan_subtree = tutorial_create_scan_subtree(prefetch_context=self.prefetch_context)
+        try:
+            if self.concurrent_setup:
+                # the job's clients discover their servers together
+                trees.setup_concurrently(
+                    root=scan_subtree,
+                    node=self.node
+                )
+            else:
                 py_trees.trees.setup(
                     root=scan_subtree,
                     node=self.node
                 )
-            except Exception as e:
-                console.logerror(console.red + "failed to setup the scan subtree, aborting [{}]".format(str(e)) + console.reset)
-                sys.exit(1)
-            self.insert_subtree(scan_subtree, self.priorities.id, 1)
-            self.node.get_logger().info("inserted job subtree")
+        except Exception as e:
+            self.node.get_logger().error("failed to setup the scan subtree, dropping the job [{}]".format(str(e)))
+            for node in scan_subtree.iterate():
+                try:
+                    node.shutdown()  # release whatever did get setup
+                except Exception as shutdown_error:
+                    self.node.get_logger().warning("failed to shutdown '{}' [{}]".format(node.name, str(shutdown_error)))
+                for client in node.blackboards:
+                    client.unregister(clear=False)
+            with self._job_lock:
+                self._job_requested = False
+            self.jobs['failed'].inc()
+            return
+        with self._job_lock:
+            self._job_subtree = scan_subtree
+
+    def insert_application_subtree_if_ready(self, tree):
+        """
+        Insert a job subtree that has finished setting up.
+
+        Args:
+            tree (:class:`~py_trees.trees.BehaviourTree`): tree to investigate/manipulate.
+        """
+        with self._job_lock:
+            if self._job_subtree is None:
+                return
+            tree.insert_subtree(self._job_subtree, self.priorities.id, 1)
+            self._job_subtree = None
+            self._job_requested = False
+        self.node.get_logger().info("inserted job subtree")
 
     def deliver_status_report(
             self,
@@ -480,8 +575,12 @@ class DynamicApplicationTree(py_trees_ros.trees.BehaviourTree):
             # finished
             if job.status == py_trees.common.Status.SUCCESS or job.status == py_trees.common.Status.FAILURE:
                 self.node.get_logger().info("{0}: finished [{1}]".format(job.name, job.status))
+                self.jobs['succeeded' if job.status == py_trees.common.Status.SUCCESS else 'failed'].inc()
                 for node in job.iterate():
                     node.shutdown()
+                    # release the blackboard registrations, but keep the data (e.g. scan_result)
+                    for client in node.blackboards:
+                        client.unregister(clear=False)
                 tree.prune_subtree(job.id)
 
     def busy(self):
@@ -506,14 +605,34 @@ class DynamicApplicationTree(py_trees_ros.trees.BehaviourTree):
         return self.root.children[-1]
 
 
+# mocks serving this tree and its jobs: battery and led strip (the root),
+# docking, move base, rotation and safety sensors (the scan jobs)
+tutorial_mock_nodes = [
+    'battery',
+    'led_strip',
+    'docking_controller',
+    'move_base_controller',
+    'rotation_controller',
+    'safety_sensors',
+]
+
+
 def tutorial_main():
     """
     Entry point for the demo script.
     """
     rclpy.init(args=None)
-    tree = DynamicApplicationTree()
+    tree = DynamicApplicationTree(concurrent_setup=True)
     try:
-        tree.setup(timeout=15)
+        # one budget for the readiness barrier and the (concurrent) setup, once the
+        # mocks have reported, discovery of their endpoints is all but immediate
+        timeout = 15.0
+        start_time = time.monotonic()
+        reports = mock.readiness.wait_until_ready(node_names=tutorial_mock_nodes, timeout=timeout)
+        missing = [name for name in tutorial_mock_nodes if name not in reports]
+        if missing:
+            console.logwarn("no readiness report from [{}], setting up anyway".format(", ".join(missing)))
+        tree.setup(timeout=max(0.0, timeout - (time.monotonic() - start_time)))
     except py_trees_ros.exceptions.TimedOutError as e:
         console.logerror(console.red + "failed to setup the tree, aborting [{}]".format(str(e)) + console.reset)
         tree.shutdown()
@@ -528,10 +647,14 @@ def tutorial_main():
 
     tree.tick_tock(period_ms=1000.0)
 
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    executor.add_node(tree.node)
+
     try:
-        rclpy.spin(tree.node)
+        executor.spin()
     except (KeyboardInterrupt, rclpy.executors.ExternalShutdownException):
         pass
     finally:
         tree.shutdown()
+        executor.shutdown()
         rclpy.try_shutdown()
@@ -56,9 +56,11 @@ Data Gathering
    :align: center
 
 The Scan2BB behaviour collects incoming requests from the qt dashboard and drops them
-onto the blackboard. This is your usual :class:`py_trees_ros.subscribers.EventToBlackboard`
-behaviour which will only register the result `True` on the blackboard if
-there was an incoming message between the last and the current tick.
+onto the blackboard. This is a :class:`hugr.subscribers.EventQueueToBlackboard`
+behaviour which queues incoming messages and consumes one per tick, registering
+the result `True` on the blackboard if it did. Unlike
+:class:`py_trees_ros.subscribers.EventToBlackboard`, a burst of requests between
+ticks is not collapsed into a single event.
 
 The Scanning Branch
 -------------------
@@ -165,16 +167,20 @@ Send scan requests from the qt dashboard.
 import operator
 import sys
 
-import launch
-import launch_ros
 import py_trees
 import py_trees_ros.trees
 import py_trees.console as console
 import py_trees_ros_interfaces.action as py_trees_actions  # noqa
 import rclpy
+import rclpy.executors
 
+from . import battery
 from . import behaviours
+from . import composites
+from . import decorators
+from . import trees
 from . import mock
+from . import subscribers
 
 ##############################################################################
 # Launcher
@@ -188,6 +194,9 @@ def generate_launch_description():
     Returns:
         the launch description
     """
+    import launch
+    import launch_ros
+
     return launch.LaunchDescription(
         mock.launch.generate_launch_nodes() +
         [
@@ -221,14 +230,14 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         )
     )
 
-    topics2bb = py_trees.composites.Sequence(name="Topics2BB", memory=True)
-    scan2bb = py_trees_ros.subscribers.EventToBlackboard(
+    topics2bb = composites.DataGathering(name="Topics2BB")
+    scan2bb = subscribers.EventQueueToBlackboard(
         name="Scan2BB",
         topic_name="/dashboard/scan",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
         variable_name="event_scan_button"
     )
-    battery2bb = py_trees_ros.battery.ToBlackboard(
+    battery2bb = battery.ToBlackboard(
         name="Battery2BB",
         topic_name="/battery/state",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
@@ -244,7 +253,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     def check_battery_low_on_blackboard(blackboard: py_trees.blackboard.Blackboard) -> bool:
         return blackboard.battery_low_warning
 
-    battery_emergency = py_trees.decorators.EternalGuard(
+    battery_emergency = decorators.EternalGuard(
         name="Battery Low?",
         condition=check_battery_low_on_blackboard,
         blackboard_keys={"battery_low_warning"},
@@ -252,7 +261,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     )
     # Worker Tasks
     scan = py_trees.composites.Sequence(name="Scan", memory=True)
-    is_scan_requested = py_trees.behaviours.CheckBlackboardVariableValue(
+    is_scan_requested = behaviours.CheckBlackboardVariableValue(
         name="Scan?",
         check=py_trees.common.ComparisonExpression(
             variable="event_scan_button",
@@ -263,7 +272,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     scan_preempt = py_trees.composites.Selector(name="Preempt?", memory=False)
     is_scan_requested_two = py_trees.decorators.SuccessIsRunning(
         name="SuccessIsRunning",
-        child=py_trees.behaviours.CheckBlackboardVariableValue(
+        child=behaviours.CheckBlackboardVariableValue(
             name="Scan?",
             check=py_trees.common.ComparisonExpression(
                 variable="event_scan_button",
@@ -276,7 +285,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         name="Scanning",
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
-    scan_rotate = py_trees_ros.actions.ActionClient(
+    scan_rotate = behaviours.ActionClient(
         name="Rotate",
         action_type=py_trees_actions.Rotate,
         action_name="rotate",
@@ -292,7 +301,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
     flash_green = behaviours.FlashLedStrip(name="Flash Green", colour="green")
-    scan_pause = py_trees.timers.Timer("Pause", duration=3.0)
+    scan_pause = behaviours.Timer("Pause", duration=3.0)
     # Fallback task
     idle = py_trees.behaviours.Running(name="Idle")
 
@@ -313,9 +322,10 @@ def tutorial_main():
     """
     rclpy.init(args=None)
     root = tutorial_create_root()
-    tree = py_trees_ros.trees.BehaviourTree(
+    tree = trees.BehaviourTree(
         root=root,
-        unicode_tree_debug=True
+        unicode_tree_debug=True,
+        compiled=True
     )
     try:
         tree.setup(timeout=15)
@@ -333,10 +343,14 @@ def tutorial_main():
 
     tree.tick_tock(period_ms=1000.0)
 
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    executor.add_node(tree.node)
+
     try:
-        rclpy.spin(tree.node)
+        executor.spin()
     except (KeyboardInterrupt, rclpy.executors.ExternalShutdownException):
         pass
     finally:
         tree.shutdown()
+        executor.shutdown()
         rclpy.try_shutdown()
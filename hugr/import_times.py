@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Benchmark the time each of the package's console scripts spends importing
+modules before it gets to do any work. Each script's module is imported
+in a fresh interpreter under ``python -X importtime``.
+
+.. code-block:: bash
+
+   $ hugr-import-times
+   $ hugr-import-times --scripts mock-battery mock-led-strip --repeat 10 --json
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import argparse
+import importlib.metadata
+import json
+import subprocess
+import sys
+import typing
+
+import py_trees.console as console
+
+##############################################################################
+# Benchmark
+##############################################################################
+
+
+def console_scripts() -> typing.Dict[str, str]:
+    """
+    Discover the package's console scripts from its installed entry points.
+
+    Returns:
+        script names mapped to the module they run from
+    """
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        scripts = entry_points.select(group='console_scripts')
+    else:
+        scripts = entry_points.get('console_scripts', [])
+    return {
+        entry_point.name: entry_point.value.split(':')[0]
+        for entry_point in scripts
+        if entry_point.value.startswith('hugr.')
+    }
+
+
+def parse_import_times(stderr: str) -> typing.List[typing.Tuple[str, int, int]]:
+    """
+    Parse the report generated by ``python -X importtime``.
+
+    Args:
+        stderr: the report
+
+    Returns:
+        (module name, self time (us), cumulative time (us)) for each imported module
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            imports.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+        except (IndexError, ValueError):
+            continue  # the header
+    return imports
+
+
+def measure(module: str, repeat: int=5) -> typing.Dict[str, typing.Any]:
+    """
+    Import a module, several times, in a fresh interpreter and record the
+    fastest run (the least disturbed by everything else running on the machine).
+
+    Args:
+        module: name of the module to import
+        repeat: number of runs
+
+    Returns:
+        cumulative import time (s), number of modules imported and
+        the top level packages that took the most time (s)
+
+    Raises:
+        RuntimeError: if the module fails to import
+    """
+    best = None
+    for unused_i in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError("failed to import [{}][{}]".format(module, process.stderr.strip().splitlines()[-1]))
+        imports = parse_import_times(process.stderr)
+        total = sum(self_time for unused_name, self_time, unused_cumulative in imports)
+        if best is None or total < best[0]:
+            best = (total, imports)
+    total, imports = best
+    packages = {}
+    for name, self_time, unused_cumulative in imports:
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + self_time
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        'module': module,
+        'time': total * 1e-6,
+        'modules': len(imports),
+        'heaviest': {package: self_time * 1e-6 for package, self_time in heaviest},
+    }
+
+##############################################################################
+# Main
+##############################################################################
+
+
+def command_line_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="benchmark import times for each of the console scripts",
+        epilog="And his noodly appendage reached forth to tickle the blessed...\n"
+    )
+    parser.add_argument('-s', '--scripts', nargs='+', default=None, help='scripts to benchmark (default: all)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='runs per script, the fastest is reported')
+    parser.add_argument('--json', action='store_true', default=False, help='print the results as json')
+    return parser
+
+
+def main():
+    """
+    Entry point for the import time benchmark.
+    """
+    args = command_line_argument_parser().parse_args()
+    scripts = console_scripts()
+    if not scripts:
+        console.logerror("no console scripts found, is the package installed?")
+        sys.exit(1)
+    names = args.scripts if args.scripts is not None else sorted(scripts.keys())
+    unknown = [name for name in names if name not in scripts]
+    if unknown:
+        console.logerror("unknown scripts [{}]".format(", ".join(unknown)))
+        sys.exit(1)
+    results = {}
+    for name in names:
+        try:
+            results[name] = measure(scripts[name], repeat=args.repeat)
+        except RuntimeError as e:
+            console.logerror(str(e))
+            continue
+        if not args.json:
+            result = results[name]
+            print(
+                console.cyan + "{:<36}".format(name) +
+                console.yellow + "{:8.1f}ms {:5d} modules  ".format(1000.0 * result['time'], result['modules']) +
+                console.reset + ", ".join(
+                    "{}: {:.1f}ms".format(package, 1000.0 * time)
+                    for package, time in result['heaviest'].items()
+                )
+            )
+    if args.json:
+        print(json.dumps(results, indent=2))
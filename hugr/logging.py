@@ -0,0 +1,383 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Asynchronous, structured logging for the trees and the mock robot.
+
+Logging from a callback usually formats the message there and then, and
+waits for the logging backend to write it out. Here, a call only puts the
+format string, arguments and fields on a queue. A single background thread,
+shared by every :class:`Logger` in the process, formats the messages and
+hands them to each logger's sink.
+
+* **Lazy formatting**: messages are formatted on the background thread,
+  callable arguments are called there (so pass ``lambda: expensive(msg)``
+  rather than ``expensive(msg)``). Other arguments that aren't immutable
+  builtins are converted with :func:`str` by the caller, so they can be
+  mutated as soon as the call returns. Callables and fields must not be.
+* **Rate limits**: with a period, messages from the same site (format string)
+  within the period of the last emitted one are dropped and counted.
+* **Structured fields**: keyword arguments are kept as fields, appended
+  to the text and written as json to the binary sink.
+* **Binary sink**: optionally, every record is also appended to a file
+  (refer to :class:`BinarySink` and :func:`read_binary`).
+
+If the queue is full, records are dropped (and counted) rather than
+blocking the caller.
+
+.. code-block:: python
+
+   logger = hugr.logging.get_logger("led_strip", sink=hugr.logging.node_sink(node))
+   logger.info("feedback: {}", lambda: describe(msg), period=1.0, goal=goal_id)
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import atexit
+import collections
+import json
+import queue
+import struct
+import threading
+import time
+import typing
+
+##############################################################################
+# Records
+##############################################################################
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+level_names = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# arguments of these types are safe to format later, as is
+immutable_types = (type(None), bool, int, float, complex, str, bytes)
+
+Record = collections.namedtuple('Record', ['stamp', 'level', 'name', 'message', 'fields'])
+Record.__doc__ = """
+A formatted log record: wall clock stamp (s), level, logger name, message and fields.
+"""
+
+##############################################################################
+# Sinks
+##############################################################################
+
+
+def print_sink(record: Record):
+    """
+    Print a record to the console.
+
+    Args:
+        record: the record
+    """
+    print("[{}] [{:.6f}] [{}]: {}".format(level_names.get(record.level, record.level), record.stamp, record.name, text(record)))
+
+
+def node_sink(node: typing.Any) -> typing.Callable[[Record], None]:
+    """
+    A sink that writes to a ROS node's logger.
+
+    Args:
+        node: the node
+
+    Returns:
+        the sink
+    """
+    ros_logger = node.get_logger()
+    methods = {DEBUG: ros_logger.debug, INFO: ros_logger.info, WARNING: ros_logger.warning, ERROR: ros_logger.error}
+
+    def sink(record: Record):
+        methods.get(record.level, ros_logger.info)(text(record))
+    return sink
+
+
+def text(record: Record) -> str:
+    """
+    The record's message with its fields appended.
+
+    Args:
+        record: the record
+
+    Returns:
+        the text
+    """
+    if not record.fields:
+        return record.message
+    return record.message + " [" + " ".join("{}={}".format(key, value) for key, value in record.fields.items()) + "]"
+
+
+class BinarySink(object):
+    """
+    Appends records to a file: per record, a header (stamp f64, level u8,
+    name, message and fields lengths u16, u32, u32) followed by the utf-8
+    name, message and json fields.
+
+    Args:
+        path: the file, appended to if it exists
+    """
+    _header = struct.Struct("<dBHII")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "ab")
+
+    def write(self, record: Record):
+        """
+        Append a record.
+
+        Args:
+            record: the record
+        """
+        name = record.name.encode('utf-8')
+        message = record.message.encode('utf-8')
+        fields = json.dumps(record.fields, default=str).encode('utf-8') if record.fields else b""
+        self.file.write(self._header.pack(record.stamp, record.level, len(name), len(message), len(fields)) + name + message + fields)
+
+    def flush(self):
+        """
+        Flush written records to the file.
+        """
+        self.file.flush()
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self.file.close()
+
+
+def read_binary(path: str) -> typing.Iterator[Record]:
+    """
+    Read back the records written by a :class:`BinarySink`.
+
+    Args:
+        path: the file
+
+    Yields:
+        the records, in order
+    """
+    header = BinarySink._header
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset + header.size <= len(data):
+        stamp, level, name_length, message_length, fields_length = header.unpack_from(data, offset)
+        offset += header.size
+        name = data[offset:offset + name_length].decode('utf-8')
+        offset += name_length
+        message = data[offset:offset + message_length].decode('utf-8')
+        offset += message_length
+        fields = json.loads(data[offset:offset + fields_length].decode('utf-8')) if fields_length else {}
+        offset += fields_length
+        yield Record(stamp, level, name, message, fields)
+
+##############################################################################
+# Dispatcher
+##############################################################################
+
+
+class Dispatcher(object):
+    """
+    Formats and emits queued records on a background thread, started on
+    the first record.
+
+    Args:
+        maxsize: records that can be queued, beyond which they are dropped
+        binary_sink: also write every record here
+    """
+    def __init__(self, maxsize: int=10000, binary_sink: BinarySink=None):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.binary_sink = binary_sink
+        self.dropped = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def put(self, item: typing.Tuple):
+        """
+        Queue an unformatted record, without blocking.
+
+        Args:
+            item: (stamp, level, logger, format string, args, fields, suppressed)
+        """
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        """
+        Start the background thread (if not already started).
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._spin, name="hugr_logging", daemon=True)
+                self.thread.start()
+
+    def flush(self):
+        """
+        Block until everything queued so far has been emitted.
+        """
+        if self.thread is not None:
+            self.queue.join()
+
+    def stop(self):
+        """
+        Emit everything queued and stop the background thread.
+        """
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is None:
+            return
+        self.queue.put(None)
+        thread.join()
+        if self.binary_sink is not None:
+            self.binary_sink.flush()
+
+    def _spin(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._emit(item)
+            finally:
+                self.queue.task_done()
+
+    def _emit(self, item: typing.Tuple):
+        stamp, level, logger, template, args, fields, suppressed = item
+        try:
+            message = template.format(*[arg() if callable(arg) else arg for arg in args])
+            if suppressed:
+                message += " [{} similar suppressed]".format(suppressed)
+            record = Record(stamp, level, logger.name, message, fields)
+            logger.sink(record)
+            if self.binary_sink is not None:
+                self.binary_sink.write(record)
+        except Exception:
+            # never let a bad format string or sink take the thread down
+            self.errors += 1
+
+
+_dispatcher = Dispatcher()
+atexit.register(lambda: _dispatcher.stop())
+
+
+def dispatcher() -> Dispatcher:
+    """
+    The dispatcher shared by all loggers.
+
+    Returns:
+        the dispatcher
+    """
+    return _dispatcher
+
+
+def configure(maxsize: int=10000, binary_path: str=None) -> Dispatcher:
+    """
+    Replace the shared dispatcher, e.g. to add a binary sink. Records queued
+    on the old dispatcher are emitted first.
+
+    Args:
+        maxsize: records that can be queued, beyond which they are dropped
+        binary_path: also write every record to this file
+
+    Returns:
+        the new dispatcher
+    """
+    global _dispatcher
+    old = _dispatcher
+    old.stop()
+    _dispatcher = Dispatcher(maxsize=maxsize, binary_sink=BinarySink(binary_path) if binary_path else None)
+    if old.binary_sink is not None:
+        old.binary_sink.close()
+    return _dispatcher
+
+##############################################################################
+# Loggers
+##############################################################################
+
+
+class Logger(object):
+    """
+    Queues records for the shared dispatcher. Create with :func:`get_logger`.
+
+    Args:
+        name: name of the logger
+        sink: emits formatted records (on the dispatcher's thread)
+    """
+    def __init__(self, name: str, sink: typing.Callable[[Record], None]=print_sink):
+        self.name = name
+        self.sink = sink
+        self.last_emitted = {}  # site: stamp
+        self.suppressed = {}  # site: count
+        self.lock = threading.Lock()  # loggers are shared across callback threads
+
+    def log(self, level: int, template: str, *args: typing.Any, period: float=None, **fields: typing.Any):
+        """
+        Queue a record.
+
+        Args:
+            level: severity, e.g. :data:`INFO`
+            template: :meth:`str.format` string, also identifies the call site for rate limiting
+            *args: positional arguments for the format string, callables are called when
+                formatting, others that aren't immutable builtins are converted with :func:`str` now
+            period: drop records from this site within this time (s) of the last emitted one
+            **fields: structured fields
+        """
+        stamp = time.time()
+        suppressed = 0
+        if period is not None:
+            with self.lock:
+                last = self.last_emitted.get(template, None)
+                if last is not None and stamp - last < period:
+                    self.suppressed[template] = self.suppressed.get(template, 0) + 1
+                    return
+                self.last_emitted[template] = stamp
+                suppressed = self.suppressed.pop(template, 0)
+        args = tuple(
+            arg if callable(arg) or isinstance(arg, immutable_types) else str(arg) for arg in args
+        )
+        _dispatcher.put((stamp, level, self, template, args, fields, suppressed))
+
+    def debug(self, template: str, *args: typing.Any, period: float=None, **fields: typing.Any):
+        """Queue a :data:`DEBUG` record (refer to :meth:`log`)."""
+        self.log(DEBUG, template, *args, period=period, **fields)
+
+    def info(self, template: str, *args: typing.Any, period: float=None, **fields: typing.Any):
+        """Queue an :data:`INFO` record (refer to :meth:`log`)."""
+        self.log(INFO, template, *args, period=period, **fields)
+
+    def warning(self, template: str, *args: typing.Any, period: float=None, **fields: typing.Any):
+        """Queue a :data:`WARNING` record (refer to :meth:`log`)."""
+        self.log(WARNING, template, *args, period=period, **fields)
+
+    def error(self, template: str, *args: typing.Any, period: float=None, **fields: typing.Any):
+        """Queue an :data:`ERROR` record (refer to :meth:`log`)."""
+        self.log(ERROR, template, *args, period=period, **fields)
+
+
+def get_logger(name: str, sink: typing.Callable[[Record], None]=print_sink) -> Logger:
+    """
+    Create a logger that queues its records on the shared dispatcher.
+
+    Args:
+        name: name of the logger, e.g. the node's name
+        sink: emits formatted records, e.g. :func:`node_sink`
+
+    Returns:
+        the logger
+    """
+    return Logger(name=name, sink=sink)
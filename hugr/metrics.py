@@ -0,0 +1,502 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Lightweight metric primitives for the trees and the mock robot.
+
+Metrics registered with the shared :class:`Registry` (refer to :func:`registry`)
+can be served in the Prometheus text exposition format on a local HTTP
+port, e.g. for the mocks:
+
+.. code-block:: bash
+
+   $ mock-battery --metrics-port 9101
+   $ curl http://localhost:9101/metrics
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import argparse
+import bisect
+import http.server
+import math
+import threading
+import typing
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> typing.List[float]:
+    """
+    Generate exponentially spaced histogram bucket (upper) bounds.
+
+    Args:
+        start: upper bound of the first bucket
+        factor: ratio between successive bucket bounds
+        count: number of buckets
+
+    Returns:
+        the list of bucket upper bounds
+    """
+    return [start * factor**i for i in range(count)]
+
+
+# 100us -> ~105s, suitable for everything from callback to action latencies
+DEFAULT_LATENCY_BUCKETS = exponential_buckets(start=0.0001, factor=2.0, count=21)
+
+##############################################################################
+# Metrics
+##############################################################################
+
+
+class Histogram(object):
+    """
+    A thread-safe, fixed bucket histogram. Observations are counted in
+    the first bucket whose upper bound is greater than or equal to the
+    observed value (values beyond the last bound land in an overflow bucket).
+    Percentiles are estimated by interpolating within buckets.
+
+    Args:
+        name: name of the histogram
+        buckets: sorted bucket upper bounds
+        help: description, for the exposition
+    """
+    def __init__(self, name: str, buckets: typing.List[float]=None, help: str=""):
+        self.name = name
+        self.help = help
+        self.buckets = list(buckets) if buckets is not None else list(DEFAULT_LATENCY_BUCKETS)
+        if self.buckets != sorted(self.buckets):
+            raise ValueError("histogram buckets must be sorted [{}]".format(self.name))
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all observations.
+        """
+        with self.lock:
+            self.counts = [0] * (len(self.buckets) + 1)  # last is the overflow bucket
+            self.count = 0
+            self.sum = 0.0
+            self.min = math.inf
+            self.max = -math.inf
+
+    def observe(self, value: float):
+        """
+        Record an observation.
+
+        Args:
+            value: the observed value
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean of the observations (nan if there are none).
+        """
+        return self.sum / self.count if self.count else math.nan
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile of the observations.
+
+        Args:
+            q: the percentile, in the range [0, 100]
+
+        Returns:
+            the estimate (nan if there are no observations)
+        """
+        with self.lock:
+            if not self.count:
+                return math.nan
+            rank = q / 100.0 * self.count
+            cumulative = 0
+            for index, count in enumerate(self.counts):
+                if count and cumulative + count >= rank:
+                    lower = self.buckets[index - 1] if index > 0 else self.min
+                    upper = self.buckets[index] if index < len(self.buckets) else self.max
+                    lower = max(lower, self.min)
+                    upper = min(upper, self.max)
+                    return lower + (upper - lower) * (rank - cumulative) / count
+                cumulative += count
+            return self.max
+
+    def summary(self) -> typing.Dict[str, float]:
+        """
+        Summary statistics, suitable for printing or serialising.
+
+        Returns:
+            count, mean, min, max and the 50th, 90th, 99th percentiles
+        """
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min if self.count else math.nan,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max if self.count else math.nan,
+        }
+
+
+class Counter(object):
+    """
+    A thread-safe, monotonically increasing count. Alternatively, the
+    count can be read from a function when it is collected (e.g. from
+    counters that are already kept elsewhere).
+
+    Args:
+        name: name of the counter
+        help: description, for the exposition
+        function: read the count from here, rather than from :meth:`inc`
+    """
+    def __init__(self, name: str, help: str="", function: typing.Callable[[], float]=None):
+        self.name = name
+        self.help = help
+        self.function = function
+        self.lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float=1.0):
+        """
+        Increment the count.
+
+        Args:
+            amount: the (non-negative) increment
+
+        Raises:
+            ValueError: if the increment is negative
+        """
+        if amount < 0:
+            raise ValueError("counters can only increase [{}][{}]".format(self.name, amount))
+        with self.lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        """
+        The current count.
+        """
+        return float(self.function()) if self.function is not None else self._value
+
+
+class Gauge(object):
+    """
+    A thread-safe value that goes up and down, e.g. a queue depth.
+    Alternatively, the value can be read from a function when it is collected.
+
+    Args:
+        name: name of the gauge
+        help: description, for the exposition
+        function: read the value from here, rather than from :meth:`set`
+    """
+    def __init__(self, name: str, help: str="", function: typing.Callable[[], float]=None):
+        self.name = name
+        self.help = help
+        self.function = function
+        self.lock = threading.Lock()
+        self._value = 0.0
+
+    def set(self, value: float):
+        """
+        Set the value.
+
+        Args:
+            value: the new value
+        """
+        self._value = float(value)
+
+    def inc(self, amount: float=1.0):
+        """
+        Increment (or decrement, if negative) the value.
+
+        Args:
+            amount: the increment
+        """
+        with self.lock:
+            self._value += amount
+
+    def dec(self, amount: float=1.0):
+        """
+        Decrement the value.
+
+        Args:
+            amount: the decrement
+        """
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        """
+        The current value.
+        """
+        return float(self.function()) if self.function is not None else self._value
+
+##############################################################################
+# Registry
+##############################################################################
+
+
+Metric = typing.Union[Counter, Gauge, Histogram]
+
+_types = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}
+
+
+def _format_labels(labels: typing.Tuple[typing.Tuple[str, str], ...], extra: str="") -> str:
+    pairs = [
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Registry(object):
+    """
+    A thread-safe collection of named, labelled metrics. Metrics sharing a
+    name (e.g. per action, or per node in a process running several)
+    must be of the same type and are told apart by their labels.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}  # (name, labels): metric
+        self.types = {}  # name: type
+
+    def register(self, metric: Metric, name: str=None, labels: typing.Dict[str, str]=None) -> Metric:
+        """
+        Register a metric, replacing any with the same name and labels.
+
+        Args:
+            metric: the metric
+            name: name to expose it under (default: the metric's name)
+            labels: labels to expose it with
+
+        Returns:
+            the metric
+
+        Raises:
+            ValueError: if a metric of another type is registered under this name
+        """
+        name = name if name is not None else metric.name
+        with self.lock:
+            if self.types.get(name, type(metric)) is not type(metric):
+                raise ValueError("'{}' is already registered as a {}".format(name, _types[self.types[name]]))
+            self.types[name] = type(metric)
+            self.metrics[(name, tuple(sorted((labels or {}).items())))] = metric
+        return metric
+
+    def unregister(self, metric: Metric):
+        """
+        Remove a metric, wherever it was registered.
+
+        Args:
+            metric: the metric
+        """
+        with self.lock:
+            for key in [key for key, registered in self.metrics.items() if registered is metric]:
+                del self.metrics[key]
+            names = {name for name, unused_labels in self.metrics}
+            self.types = {name: metric_type for name, metric_type in self.types.items() if name in names}
+
+    def _get_or_create(self, metric_type, name, labels, **kwargs) -> Metric:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            metric = self.metrics.get(key, None)
+        if metric is not None and type(metric) is metric_type:
+            return metric
+        return self.register(metric_type(name=name, **kwargs), labels=labels)
+
+    def counter(self, name: str, help: str="", labels: typing.Dict[str, str]=None, function: typing.Callable[[], float]=None) -> Counter:
+        """
+        Get, or create and register, a counter.
+
+        Args:
+            name: name of the counter
+            help: description, for the exposition
+            labels: labels to expose it with
+            function: read the count from here (only used on creation)
+
+        Returns:
+            the counter
+        """
+        return self._get_or_create(Counter, name, labels, help=help, function=function)
+
+    def gauge(self, name: str, help: str="", labels: typing.Dict[str, str]=None, function: typing.Callable[[], float]=None) -> Gauge:
+        """
+        Get, or create and register, a gauge.
+
+        Args:
+            name: name of the gauge
+            help: description, for the exposition
+            labels: labels to expose it with
+            function: read the value from here (only used on creation)
+
+        Returns:
+            the gauge
+        """
+        return self._get_or_create(Gauge, name, labels, help=help, function=function)
+
+    def histogram(self, name: str, help: str="", labels: typing.Dict[str, str]=None, buckets: typing.List[float]=None) -> Histogram:
+        """
+        Get, or create and register, a histogram.
+
+        Args:
+            name: name of the histogram
+            help: description, for the exposition
+            labels: labels to expose it with
+            buckets: sorted bucket upper bounds (only used on creation)
+
+        Returns:
+            the histogram
+        """
+        return self._get_or_create(Histogram, name, labels, help=help, buckets=buckets)
+
+    def exposition(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            the exposition
+        """
+        with self.lock:
+            metrics = sorted(self.metrics.items(), key=lambda item: item[0])
+        lines = []
+        last_name = None
+        for (name, labels), metric in metrics:
+            if name != last_name:
+                if metric.help:
+                    lines.append("# HELP {} {}".format(name, metric.help.replace("\\", "\\\\").replace("\n", "\\n")))
+                lines.append("# TYPE {} {}".format(name, _types[type(metric)]))
+                last_name = name
+            if isinstance(metric, Histogram):
+                with metric.lock:
+                    counts = list(metric.counts)
+                    total = metric.sum
+                    count = metric.count
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets + [math.inf], counts):
+                    cumulative += bucket_count
+                    lines.append("{}_bucket{} {}".format(
+                        name, _format_labels(labels, 'le="{}"'.format(_format_value(bound))), cumulative
+                    ))
+                lines.append("{}_sum{} {}".format(name, _format_labels(labels), _format_value(total)))
+                lines.append("{}_count{} {}".format(name, _format_labels(labels), count))
+            else:
+                try:
+                    value = metric.value
+                except Exception:
+                    continue  # e.g. a function reading from something that has since been torn down
+                lines.append("{}{} {}".format(name, _format_labels(labels), _format_value(value)))
+        return "\n".join(lines) + "\n"
+
+
+_registry = Registry()
+
+
+def registry() -> Registry:
+    """
+    The registry shared by the trees and mocks in this process.
+
+    Returns:
+        the registry
+    """
+    return _registry
+
+##############################################################################
+# Exporter
+##############################################################################
+
+
+class MetricsServer(object):
+    """
+    Serves a registry's exposition at ``/metrics`` over HTTP, from a background thread.
+
+    Args:
+        port: port to serve on (0 for any free port, refer to :attr:`port`)
+        host: interface to serve on (local only, by default)
+        registry: the registry to serve (default: the shared registry)
+    """
+    def __init__(self, port: int, host: str="127.0.0.1", registry: Registry=None):
+        served = registry if registry is not None else _registry
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = served.exposition().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *unused_args):
+                pass  # scrapes are frequent, don't litter the console
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics_server", daemon=True)
+        self.thread.start()
+
+    def shutdown(self):
+        """
+        Stop serving.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+def add_command_line_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the metrics port option to a program's argument parser.
+
+    Args:
+        parser: the parser
+    """
+    parser.add_argument('--metrics-port', type=int, default=None, help='serve metrics on this local port (at /metrics)')
+
+
+def serve_from_command_line(args: argparse.Namespace) -> typing.Optional[MetricsServer]:
+    """
+    Serve the shared registry if a metrics port was requested.
+
+    Args:
+        args: parsed arguments (refer to :func:`add_command_line_arguments`)
+
+    Returns:
+        the server, or None if no port was requested
+    """
+    if getattr(args, 'metrics_port', None) is None:
+        return None
+    return MetricsServer(port=args.metrics_port)
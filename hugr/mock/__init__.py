@@ -13,10 +13,36 @@ A mocked robot for use in the tutorials.
 # Imports
 ##############################################################################
 
-from . import actions
-from . import battery
-from . import dock
-from . import move_base
-from . import rotate
-from . import launch
-from . import led_strip
+import importlib
+import typing
+
+# Submodules are imported on first access (PEP 562), so that each
+# mock process only imports its own dependencies.
+__all__ = [
+    'actions',
+    'battery',
+    'bringup_profiler',
+    'clock',
+    'dashboard',
+    'dock',
+    'launch',
+    'led_strip',
+    'load_generator',
+    'move_base',
+    'readiness',
+    'robot',
+    'rotate',
+    'safety_sensors',
+]
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in __all__:
+        module = importlib.import_module("." + name, __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__() -> typing.List[str]:
+    return sorted(set(globals()) | set(__all__))
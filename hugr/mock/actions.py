@@ -18,14 +18,434 @@ Action servers and clients
 
 import action_msgs.msg as action_msgs  # GoalStatus
 import argparse
+import collections
+import json
 import py_trees_ros.exceptions
+import py_trees_ros.utilities
 # import py_trees_ros_interfaces.action as py_trees_actions  # noqa
 import hugr_interfaces.action as hugr_actions
 import rclpy.action
+import rclpy.callback_groups
+import rclpy.duration
+import rclpy.parameter
+import std_msgs.msg as std_msgs
 import sys
+import threading
+import time
 
 from typing import Any, Callable
 
+from .. import logging
+from .. import metrics
+from . import readiness
+
+##############################################################################
+# Action Server
+##############################################################################
+
+
+class Goal(object):
+    """
+    Progress, cancellation and timing state for a single goal
+    executing (or waiting to execute) on a :class:`GenericServer`.
+
+    Args:
+        goal_handle: the server side handle for the goal
+        feedback: preallocated feedback message for this goal
+        accepted_time: time (s) at which the goal was accepted
+    """
+    def __init__(self, goal_handle: rclpy.action.server.ServerGoalHandle, feedback: Any, accepted_time: float):
+        self.goal_handle = goal_handle
+        self.feedback = feedback
+        self.title = ""
+        self.percent_completed = 0.0
+        self.preempted = False
+        self.accepted_time = accepted_time
+        self.execution_time = None
+
+    @property
+    def id(self) -> str:
+        """
+        Goal uuid as a hex string (for logging and metrics).
+        """
+        return bytes(self.goal_handle.goal_id.uuid).hex()
+
+
+class GenericServer(object):
+    """
+    Generic action server that can be used to mock an action server. Unlike
+    :class:`py_trees_ros.mock.actions.GenericServer`, it can execute several goals
+    concurrently. Each goal has its own progress and cancellation state
+    (:class:`Goal`). When the maximum number of concurrent goals is reached,
+    incoming goals are handled according to the configured policy:
+
+    * **queue**: accept the goal, execute it when a slot frees up
+    * **preempt**: abort the oldest executing goal in favour of the new goal
+    * **reject**: reject the goal
+
+    A single concurrent goal with the 'preempt' policy (the default)
+    reproduces the behaviour of the original py_trees_ros mock servers.
+
+    Execution is paced by the node's clock, so the server will happily
+    run in simulated time (refer to :class:`hugr.mock.clock.SimulatedClock`).
+
+    Node Name:
+        * **<node_name>**
+
+    Action Servers:
+        * **<action_name>** (<action_type>)
+
+    Publishers:
+        * **~goal_metrics** (:class:`std_msgs.msg.String`)
+
+          * json latency metrics (queued, executing, total) for each finished goal
+        * **~ready** (:class:`std_msgs.msg.String`, latched)
+
+          * bringup readiness report (:class:`hugr.mock.readiness.Readiness`)
+
+    Metrics (refer to :mod:`hugr.metrics`, labelled with the action name):
+        * **hugr_action_goals_total** (counter): goals, by outcome (accepted, rejected)
+        * **hugr_action_results_total** (counter): finished goals, by outcome (succeeded, cancelled, aborted)
+        * **hugr_action_{queued,executing,latency}_seconds** (histograms): time queued, executing and in total
+        * **hugr_action_goals_{executing,queued}** (gauges): goals executing and queued
+
+    Parameters:
+        * **~duration** (:obj:`float`): mocked duration of a successful goal (default: 5.0)
+        * **~max_concurrent_goals** (:obj:`int`): goals that may execute concurrently (default: 1)
+        * **~policy** (:obj:`str`): one of 'queue', 'preempt', 'reject' (default: 'preempt')
+
+    Args:
+        node_name: name to use when creating the node for this process
+        action_name: the action namespace under which topics and services exist (e.g. move_base)
+        action_type: the action type (e.g. move_base_msgs.msg.MoveBaseAction)
+        generate_feedback_message: populate the (preallocated) feedback message for a goal
+        goal_received_callback: called with each goal request as it begins executing
+        duration: overrides the duration parameter
+        max_concurrent_goals: overrides the max_concurrent_goals parameter
+        policy: overrides the policy parameter
+
+    Raises:
+        ValueError: if the policy is not recognised or max_concurrent_goals < 1
+    """
+    policies = ["queue", "preempt", "reject"]
+    outcomes = {
+        action_msgs.GoalStatus.STATUS_SUCCEEDED: 'succeeded',  # noqa
+        action_msgs.GoalStatus.STATUS_CANCELED: 'cancelled',  # noqa
+        action_msgs.GoalStatus.STATUS_ABORTED: 'aborted',  # noqa
+    }
+
+    def __init__(self,
+                 node_name: str,
+                 action_name: str,
+                 action_type: Any,
+                 generate_feedback_message: Callable[[Goal], Any]=None,
+                 goal_received_callback: Callable[[Any], None]=lambda request: None,
+                 duration: float=None,
+                 max_concurrent_goals: int=None,
+                 policy: str=None
+                 ):
+        self.node = rclpy.create_node(
+            node_name,
+            parameter_overrides=[
+                rclpy.parameter.Parameter('duration', rclpy.parameter.Parameter.Type.DOUBLE, 5.0),
+                rclpy.parameter.Parameter('max_concurrent_goals', rclpy.parameter.Parameter.Type.INTEGER, 1),
+                rclpy.parameter.Parameter('policy', rclpy.parameter.Parameter.Type.STRING, 'preempt'),
+            ],
+            automatically_declare_parameters_from_overrides=True
+        )
+        self.readiness = readiness.Readiness(self.node)
+        self.duration = duration if duration is not None else self.node.get_parameter("duration").value
+        self.max_concurrent_goals = (
+            max_concurrent_goals if max_concurrent_goals is not None
+            else self.node.get_parameter("max_concurrent_goals").value
+        )
+        self.policy = policy if policy is not None else self.node.get_parameter("policy").value
+        if self.policy not in GenericServer.policies:
+            raise ValueError("unknown goal policy '{}', expected one of {}".format(self.policy, GenericServer.policies))
+        if self.max_concurrent_goals < 1:
+            raise ValueError("max_concurrent_goals must be >= 1 [{}]".format(self.max_concurrent_goals))
+
+        # feedback frequency (Hz)
+        self.frequency = 3.0
+        self.title = action_name
+        self.action_name = action_name
+        self.action_type = action_type
+        if generate_feedback_message is None:
+            self.generate_feedback_message = lambda goal: goal.feedback
+        else:
+            self.generate_feedback_message = generate_feedback_message
+        self.goal_received_callback = goal_received_callback
+
+        # failure injection (e.g. for scenario tests), executing goals abort while set
+        self.failing = False
+
+        self.lock = threading.Lock()
+        self.reserved = 0  # accepted goals, executing or queued (guards the 'reject' policy)
+        self.executing = collections.OrderedDict()  # goal id -> Goal, oldest first
+        self.queued = collections.deque()  # Goal
+        self.released = {}  # goal id -> Goal, cancelled while queued, awaiting their result
+
+        labels = {'action': self.action_name}
+        self.metrics = {}
+        for name, description, outcomes in [
+            ('goals', "goal requests, by outcome", ['accepted', 'rejected']),
+            ('results', "finished goals, by outcome", ['succeeded', 'cancelled', 'aborted']),
+        ]:
+            for outcome in outcomes:
+                self.metrics[outcome] = metrics.registry().register(
+                    metrics.Counter(name="hugr_action_{}_total".format(name), help=description),
+                    labels=dict(labels, outcome=outcome)
+                )
+        for name, description in [
+            ('queued', "time (s) from acceptance to execution"),
+            ('executing', "time (s) from execution to a result"),
+            ('latency', "time (s) from acceptance to a result"),
+        ]:
+            self.metrics[name] = metrics.registry().register(
+                metrics.Histogram(name="hugr_action_{}_seconds".format(name), help=description), labels=labels
+            )
+        for name, function in [('executing', lambda: len(self.executing)), ('queued', lambda: len(self.queued))]:
+            self.metrics['goals_' + name] = metrics.registry().register(
+                metrics.Gauge(name="hugr_action_goals_" + name, help="goals " + name, function=function),
+                labels=labels
+            )
+
+        self.metrics_publisher = self.node.create_publisher(
+            msg_type=std_msgs.String,
+            topic="~/goal_metrics",
+            qos_profile=py_trees_ros.utilities.qos_profile_unlatched()
+        )
+        self.action_server = rclpy.action.ActionServer(
+            node=self.node,
+            action_type=self.action_type,
+            action_name=self.action_name,
+            callback_group=rclpy.callback_groups.ReentrantCallbackGroup(),
+            execute_callback=self.execute_goal_callback,
+            goal_callback=self.goal_callback,
+            cancel_callback=self.cancel_callback,
+            handle_accepted_callback=self.handle_accepted_callback,
+            result_timeout=10
+        )
+        self.readiness.ready()
+
+    def goal_callback(self, goal_request: Any) -> rclpy.action.server.GoalResponse:
+        """
+        Accept the goal, unless at capacity with the 'reject' policy.
+
+        Args:
+            goal_request: the goal request message
+        """
+        with self.lock:
+            if self.policy == "reject" and self.reserved >= self.max_concurrent_goals:
+                self.node.get_logger().info("received a goal, rejecting [at capacity]")
+                self.metrics['rejected'].inc()
+                return rclpy.action.server.GoalResponse.REJECT
+            self.reserved += 1
+        self.metrics['accepted'].inc()
+        self.node.get_logger().info("received a goal")
+        return rclpy.action.server.GoalResponse.ACCEPT
+
+    def cancel_callback(self, goal_handle: rclpy.action.server.ServerGoalHandle) -> rclpy.action.server.CancelResponse:
+        """
+        Cancel requests are always accepted. Queued goals are released from
+        the queue immediately, rather than waiting for a free slot to deliver
+        their (cancelled) result.
+
+        Args:
+            goal_handle: the goal being cancelled
+        """
+        goal_id = bytes(goal_handle.goal_id.uuid).hex()
+        self.node.get_logger().info("cancel requested: [{}]".format(goal_id))
+        with self.lock:
+            goal = next((queued for queued in self.queued if queued.id == goal_id), None)
+            if goal is not None:
+                self.queued.remove(goal)
+                self.released[goal.id] = goal
+        if goal is not None:
+            # not via execute(), it never executes, the execute callback only delivers the result
+            self.action_server.notify_execute(goal.goal_handle, self.execute_goal_callback)
+        return rclpy.action.server.CancelResponse.ACCEPT
+
+    def handle_accepted_callback(self, goal_handle: rclpy.action.server.ServerGoalHandle):
+        """
+        Start executing the goal if there is a free slot, otherwise queue it
+        or preempt the oldest executing goal, according to the policy.
+
+        Args:
+            goal_handle: the accepted goal
+        """
+        goal = Goal(goal_handle=goal_handle, feedback=self.action_type.Feedback(), accepted_time=self.now())
+        with self.lock:
+            # preempted goals may take a moment to exit, they don't count
+            active = [g for g in self.executing.values() if not g.preempted]
+            if len(active) >= self.max_concurrent_goals:
+                if self.policy == "queue":
+                    self.node.get_logger().info("queueing goal [{}]".format(goal.id))
+                    self.queued.append(goal)
+                    return
+                elif self.policy == "preempt":
+                    active[0].preempted = True  # oldest
+            self.executing[goal.id] = goal
+        self._execute(goal)
+
+    def execute_goal_callback(self, goal_handle: rclpy.action.server.ServerGoalHandle) -> Any:
+        """
+        Step through the mocked execution of a goal, publishing feedback as it goes.
+
+        Args:
+            goal_handle: the goal to execute
+
+        Returns:
+            the result message for the goal
+        """
+        goal_id = bytes(goal_handle.goal_id.uuid).hex()
+        with self.lock:
+            released = goal_id in self.released
+            goal = self.released[goal_id] if released else self.executing[goal_id]
+            goal.execution_time = self.now()
+            if not released:
+                self.goal_received_callback(goal_handle.request)
+            goal.title = self.title
+        if released:
+            result = self.action_type.Result()
+            try:
+                self._release(goal, result)
+                return result
+            finally:
+                self._finish(goal, result)
+        self.node.get_logger().info("executing a goal [{}]".format(goal.id))
+        increment = 100 / (self.frequency * self.duration)
+        period = rclpy.duration.Duration(seconds=1.0 / self.frequency)
+        result = self.action_type.Result()
+        try:
+            while True:
+                if not goal_handle.is_active:
+                    self.node.get_logger().info("goal is no longer active, aborting")
+                    return result
+                elif goal_handle.is_cancel_requested:
+                    result.message = "goal cancelled at {percentage:.2f}%%".format(percentage=goal.percent_completed)
+                    self.node.get_logger().info(result.message)
+                    goal_handle.canceled()
+                    return result
+                elif goal.preempted:
+                    result.message = "goal pre-empted at {percentage:.2f}%%".format(percentage=goal.percent_completed)
+                    self.node.get_logger().info(result.message)
+                    goal_handle.abort()
+                    return result
+                elif self.failing:
+                    result.message = "goal failed at {percentage:.2f}%%".format(percentage=goal.percent_completed)
+                    self.node.get_logger().info(result.message)
+                    goal_handle.abort()
+                    return result
+                elif goal.percent_completed >= 100.0:
+                    self.node.get_logger().info("{title}...{percentage:.2f}%%".format(title=goal.title, percentage=goal.percent_completed))
+                    result.message = "goal executed with success"
+                    self.node.get_logger().info(result.message)
+                    goal_handle.succeed()
+                    return result
+                elif goal.percent_completed > 0.0:
+                    self.node.get_logger().info("{title}...{percentage:.2f}%%".format(title=goal.title, percentage=goal.percent_completed))
+                    goal_handle.publish_feedback(self.generate_feedback_message(goal))
+                # node clock, so it will respect simulated time (use_sim_time)
+                if not self.node.get_clock().sleep_for(period):
+                    self.node.get_logger().info("interrupted while executing, aborting")
+                    if goal_handle.is_active:
+                        goal_handle.abort()
+                    return result
+                goal.percent_completed = min(100.0, goal.percent_completed + increment)
+        finally:
+            self._finish(goal, result)
+
+    def _release(self, goal: Goal, result: Any):
+        """
+        Deliver the cancelled result of a goal released from the queue. It is
+        scheduled from the cancel callback, i.e. before the goal transitions to
+        canceling and from there, only to cancelled (it never executed).
+        """
+        result.message = "goal cancelled while queued"
+        # the transition follows the cancel callback immediately, wall clock is fine
+        deadline = time.monotonic() + 1.0
+        while goal.goal_handle.is_active and not goal.goal_handle.is_cancel_requested:
+            if time.monotonic() > deadline:
+                self.node.get_logger().warning("released goal was not cancelled, aborting [{}]".format(goal.id))
+                goal.goal_handle.execute()
+                goal.goal_handle.abort()
+                return
+            time.sleep(0.001)
+        self.node.get_logger().info("{} [{}]".format(result.message, goal.id))
+        if goal.goal_handle.is_active:
+            goal.goal_handle.canceled()
+
+    def _finish(self, goal: Goal, result: Any):
+        """
+        Release the goal's slot, publish its metrics and start the next queued goal.
+        """
+        finished_time = self.now()
+        next_goal = None
+        with self.lock:
+            self.executing.pop(goal.id, None)
+            self.released.pop(goal.id, None)
+            self.reserved -= 1
+            if self.queued and len(self.executing) < self.max_concurrent_goals:
+                next_goal = self.queued.popleft()
+                self.executing[next_goal.id] = next_goal
+        outcome = self.outcomes.get(goal.goal_handle.status, None)
+        if outcome is not None:
+            self.metrics[outcome].inc()
+        self.metrics['queued'].observe(goal.execution_time - goal.accepted_time)
+        self.metrics['executing'].observe(finished_time - goal.execution_time)
+        self.metrics['latency'].observe(finished_time - goal.accepted_time)
+        self.metrics_publisher.publish(
+            std_msgs.String(
+                data=json.dumps({
+                    'goal_id': goal.id,
+                    'message': result.message,
+                    'queued': goal.execution_time - goal.accepted_time,
+                    'executing': finished_time - goal.execution_time,
+                    'total': finished_time - goal.accepted_time,
+                })
+            )
+        )
+        if next_goal is not None:
+            self._execute(next_goal)
+
+    def _execute(self, goal: Goal):
+        """
+        Start execution of a goal. Goals that were cancelled just as they
+        left the queue can no longer transition to executing, but still need
+        the execute callback to run to deliver their (cancelled) result.
+        """
+        if goal.goal_handle.is_cancel_requested:
+            self.action_server.notify_execute(goal.goal_handle, self.execute_goal_callback)
+        else:
+            goal.goal_handle.execute()
+
+    def now(self) -> float:
+        """
+        Current time (s) according to the node's clock (wall or simulated).
+        """
+        return self.node.get_clock().now().nanoseconds * 1e-9
+
+    def abort(self):
+        """
+        Abort all executing goals (queued goals are left to expire with the server).
+        """
+        with self.lock:
+            goals = list(self.executing.values())
+        for goal in goals:
+            if goal.goal_handle.is_active:
+                self.node.get_logger().info("aborting...[{}]".format(goal.id))
+                goal.goal_handle.abort()
+
+    def shutdown(self):
+        """
+        Cleanup
+        """
+        for metric in self.metrics.values():
+            metrics.registry().unregister(metric)
+        self.action_server.destroy()
+        self.node.destroy_node()
+
 ##############################################################################
 # Action Client
 ##############################################################################
@@ -40,12 +460,14 @@ class GenericClient(object):
         action_name: the action namespace under which topics and services exist (e.g. move_base)
         action_type: the action type (e.g. move_base_msgs.msg.MoveBaseAction)
         generate_feedback_message: format the feedback message
+        feedback_period: minimum time (s) between logged feedback messages
     """
     def __init__(self,
                  node_name: str,
                  action_name: str,
                  action_type: Any,
-                 generate_feedback_message: Callable[[Any], str]=None
+                 generate_feedback_message: Callable[[Any], str]=None,
+                 feedback_period: float=1.0
                  ):
         self.action_type = action_type
         self.action_name = action_name
@@ -69,6 +491,8 @@ class GenericClient(object):
         # ROS Setup
         ####################
         self.node = rclpy.create_node(self.node_name)
+        self.logger = logging.get_logger(name=self.node_name, sink=logging.node_sink(self.node))
+        self.feedback_period = feedback_period
         self.action_client = rclpy.action.ActionClient(
             node=self.node,
             action_type=self.action_type,
@@ -105,12 +529,12 @@ class GenericClient(object):
 
     def feedback_callback(self, msg: Any):
         """
-        Prints the feedback on the node's logger.
+        Logs the feedback, formatted off the callback and rate limited.
 
         Args:
             msg: the feedback message, particular to the action type definition
         """
-        self.node.get_logger().info('feedback: {0}'.format(self.generate_feedback_message(msg)))
+        self.logger.info('feedback: {}', lambda: self.generate_feedback_message(msg), period=self.feedback_period)
 
     def send_cancel_request(self):
         """
@@ -210,6 +634,7 @@ class GenericClient(object):
         Shutdown, cleanup.
         """
         self.action_client.destroy()
+        logging.dispatcher().flush()  # anything queued still needs the node's logger
         self.node.destroy_node()
 
 
@@ -24,6 +24,9 @@ import rclpy.parameter
 import sensor_msgs.msg as sensor_msgs
 import sys
 
+from .. import metrics
+from . import readiness
+
 ##############################################################################
 # Class
 ##############################################################################
@@ -40,6 +43,9 @@ class Battery(object):
         * **~state** (:class:`sensor_msgs.msg.BatteryState`)
 
           * full battery state information
+        * **~ready** (:class:`std_msgs.msg.String`, latched)
+
+          * bringup readiness report (:class:`hugr.mock.readiness.Readiness`)
 
     Dynamic Parameters:
         * **~charging_percentage** (:obj:`float`)
@@ -66,6 +72,7 @@ class Battery(object):
             ],
             automatically_declare_parameters_from_overrides=True
         )
+        self.readiness = readiness.Readiness(self.node)
 
         # publishers
         not_latched = False  # latched = True
@@ -92,10 +99,21 @@ class Battery(object):
         self.battery.location = ""
         self.battery.serial_number = ""
 
+        # metrics
+        self.published = metrics.registry().register(
+            metrics.Counter(name="hugr_messages_published_total", help="messages published, by topic"),
+            labels={'node': 'battery', 'topic': 'state'}
+        )
+        self.percentage = metrics.registry().register(
+            metrics.Gauge(name="hugr_battery_percentage", help="battery percentage",
+                          function=lambda: self.battery.percentage)
+        )
+
         self.timer = self.node.create_timer(
             timer_period_sec=0.2,
             callback=self.update_and_publish
         )
+        self.readiness.ready()
 
     def update_and_publish(self):
         """
@@ -136,6 +154,7 @@ class Battery(object):
         else:
             self.battery.power_supply_status = sensor_msgs.BatteryState.POWER_SUPPLY_STATUS_DISCHARGING
         self.publishers.state.publish(msg=self.battery)
+        self.published.inc()
 
     def shutdown(self):
         """
@@ -144,6 +163,8 @@ class Battery(object):
         # currently complains with:
         #  RuntimeWarning: Failed to fini publisher: rcl node implementation is invalid, at /tmp/binarydeb/ros-dashing-rcl-0.7.5/src/rcl/node.c:462
         # Q: should rlcpy.shutdown() automagically handle descruction of nodes implicitly?
+        metrics.registry().unregister(self.published)
+        metrics.registry().unregister(self.percentage)
         self.node.destroy_node()
 
 
@@ -151,10 +172,13 @@ def main():
     """
     Entry point for the mock batttery node.
     """
+    readiness.imports_done()
     parser = argparse.ArgumentParser(description='Mock the state of a battery component')
     command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
-    parser.parse_args(command_line_args)
+    metrics.add_command_line_arguments(parser)
+    args = parser.parse_args(command_line_args)
     rclpy.init()  # picks up sys.argv automagically internally
+    metrics_server = metrics.serve_from_command_line(args)
     battery = Battery()
     try:
         rclpy.spin(battery.node)
@@ -162,4 +186,6 @@ def main():
         pass
     finally:
         battery.shutdown()
+        if metrics_server is not None:
+            metrics_server.shutdown()
         rclpy.try_shutdown()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Collect the mock robot's readiness reports and print a startup waterfall.
+
+.. code-block:: bash
+
+   $ ros2 launch hugr mock_robot_launch.py
+   $ hugr-bringup-profiler
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import argparse
+import json
+import py_trees.console as console
+import rclpy
+import sys
+import typing
+
+from . import readiness
+
+##############################################################################
+# Waterfall
+##############################################################################
+
+# bar characters for the time spent reaching each stage (after process start)
+stage_symbols = {
+    'imports_done': '=',
+    'node_created': '-',
+    'endpoints_ready': '#',
+}
+
+
+def waterfall(reports: typing.Dict[str, typing.Dict[str, typing.Any]], width: int=60) -> typing.List[str]:
+    """
+    Render readiness reports as a waterfall, one row per node, ordered
+    by process start. Times are relative to the first process to start.
+    Unknown stages (e.g. no /proc, or imports not stamped) are merged into the next stage.
+
+    Args:
+        reports: readiness reports, keyed by node name
+        width: width (characters) of the bars
+
+    Returns:
+        the lines of the waterfall
+    """
+    def first_stamp(report):
+        return next(report['stamps'][stage] for stage in readiness.stages if report['stamps'][stage] is not None)
+
+    if not reports:
+        return []
+    origin = min(first_stamp(report) for report in reports.values())
+    end = max(report['stamps']['endpoints_ready'] for report in reports.values())
+    scale = width / max(end - origin, 1e-6)
+    lines = []
+    for name, report in sorted(reports.items(), key=lambda item: first_stamp(item[1])):
+        stamps = report['stamps']
+        start = first_stamp(report)
+        bar = " " * int(round((start - origin) * scale))
+        previous = start
+        for stage in readiness.stages[1:]:
+            if stamps[stage] is None:
+                continue
+            bar += stage_symbols[stage] * max(0, int(round((stamps[stage] - origin) * scale)) - len(bar))
+            previous = stamps[stage]
+        lines.append(
+            console.cyan + "{:<22}".format(name) + console.yellow + "|{:<{width}}|".format(bar, width=width) +
+            console.reset + " {:7.1f}ms".format(1000.0 * (previous - origin))
+        )
+    lines.append(
+        console.white + "{:<22} ".format("") + "  ".join(
+            "{} {}".format(symbol, stage) for stage, symbol in stage_symbols.items()
+        ) + console.reset
+    )
+    return lines
+
+##############################################################################
+# Main
+##############################################################################
+
+
+def command_line_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="collect readiness reports from the mock robot and print a startup waterfall",
+        epilog="And his noodly appendage reached forth to tickle the blessed...\n"
+    )
+    parser.add_argument('-n', '--nodes', nargs='+', default=readiness.mock_nodes, help='nodes to wait for')
+    parser.add_argument('-t', '--timeout', type=float, default=30.0, help='time (s) to wait for the reports')
+    parser.add_argument('--json', action='store_true', default=False, help='print the raw reports as json')
+    command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
+    return parser.parse_args(command_line_args)
+
+
+def main():
+    """
+    Entry point for the bringup profiler.
+    """
+    args = command_line_argument_parser()
+    rclpy.init()  # picks up sys.argv automagically internally
+    try:
+        reports = readiness.wait_until_ready(node_names=args.nodes, timeout=args.timeout)
+    except KeyboardInterrupt:
+        reports = {}
+    finally:
+        rclpy.try_shutdown()
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for line in waterfall(reports):
+            print(line)
+    missing = [name for name in args.nodes if name not in reports]
+    if missing:
+        console.logerror("no readiness report from [{}]".format(", ".join(missing)))
+        sys.exit(1)
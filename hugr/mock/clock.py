@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Drive simulated time for mocks and behaviours running in-process.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import rclpy
+import rclpy.executors
+import rclpy.node
+import rclpy.parameter
+import rclpy.qos
+import rclpy.time
+import rosgraph_msgs.msg as rosgraph_msgs
+import typing
+
+##############################################################################
+# Class
+##############################################################################
+
+
+class SimulatedClock(object):
+    """
+    Publishes simulated time for nodes running with
+    ``use_sim_time`` and advances it as fast as the cpu allows.
+    Timers, rates and clock sleeps on attached nodes all follow the simulated
+    clock, so multi-second action timelines complete in a handful of
+    milliseconds.
+
+    Time is advanced in fixed steps. After each step, the executor is spun
+    a fixed number of times to process the work that the step released.
+    This is not a lockstep: delivery goes through the middleware and a
+    multi-threaded executor runs callbacks on its own threads, so work may
+    still be in flight when the next step is taken, more so on a loaded
+    machine. Timings observed in simulated time are therefore only
+    approximate, check them with a tolerance.
+
+    Node Name:
+        * **simulated_clock**
+
+    Publishers:
+        * **/clock** (:class:`rosgraph_msgs.msg.Clock`)
+
+          * the simulated time
+
+    Args:
+        executor: the executor that spins all nodes under test (a multi-threaded executor
+            is required if any callback blocks on the clock, e.g. the mock action servers)
+        step: simulated time (s) advanced on each step
+        spins_per_step: executor iterations after each step
+        start: simulated time (s) to start from (zero is reserved by ROS for 'uninitialised')
+    """
+    def __init__(
+            self,
+            executor: rclpy.executors.Executor,
+            step: float=0.05,
+            spins_per_step: int=10,
+            start: float=1.0
+    ):
+        self.executor = executor
+        self.step = step
+        self.spins_per_step = spins_per_step
+        self.nanoseconds = int(start * 1e9)
+        self.node = rclpy.create_node("simulated_clock")
+        self.publisher = self.node.create_publisher(
+            msg_type=rosgraph_msgs.Clock,
+            topic="/clock",
+            qos_profile=rclpy.qos.QoSProfile(depth=1)
+        )
+        self.executor.add_node(self.node)
+
+    @property
+    def now(self) -> float:
+        """
+        The current simulated time (s).
+        """
+        return self.nanoseconds * 1e-9
+
+    def add_node(self, node: rclpy.node.Node):
+        """
+        Switch the node over to simulated time and add it to the executor.
+
+        Args:
+            node: the node to attach
+        """
+        node.set_parameters([
+            rclpy.parameter.Parameter('use_sim_time', rclpy.parameter.Parameter.Type.BOOL, True)
+        ])
+        self.executor.add_node(node)
+        self.publish()
+        self.spin()
+
+    def publish(self):
+        """
+        Publish the current simulated time.
+        """
+        self.publisher.publish(
+            rosgraph_msgs.Clock(
+                clock=rclpy.time.Time(nanoseconds=self.nanoseconds).to_msg()
+            )
+        )
+
+    def spin(self):
+        """
+        Process work released by the last step.
+        """
+        for unused_i in range(self.spins_per_step):
+            self.executor.spin_once(timeout_sec=0.001)
+
+    def advance(self, duration: float):
+        """
+        Advance the simulated time, step by step.
+
+        Args:
+            duration: simulated time (s) to advance by
+        """
+        target = self.nanoseconds + int(duration * 1e9)
+        while self.nanoseconds < target:
+            self.nanoseconds = min(target, self.nanoseconds + int(self.step * 1e9))
+            self.publish()
+            self.spin()
+
+    def spin_until(self, condition: typing.Callable[[], bool], timeout: float) -> bool:
+        """
+        Step simulated time until the condition is met or the timeout expires.
+
+        Args:
+            condition: checked after each step
+            timeout: simulated time (s) to wait before giving up
+
+        Returns:
+            whether the condition was met
+        """
+        target = self.nanoseconds + int(timeout * 1e9)
+        self.spin()
+        while not condition():
+            if self.nanoseconds >= target:
+                return False
+            self.advance(self.step)
+        return True
+
+    def shutdown(self):
+        """
+        Cleanup ROS components.
+        """
+        self.executor.remove_node(self.node)
+        self.node.destroy_node()
@@ -8,12 +8,16 @@
 # Documentation
 ##############################################################################
 """
-A qt dashboard for interactions with the mock robot
+A qt dashboard for interactions with the mock robot.
+
+Button presses are counted in the ``hugr_dashboard_button_presses_total``
+metric, labelled with the button (refer to :mod:`hugr.metrics`).
 """
 ##############################################################################
 # Imports
 ##############################################################################
 
+import argparse
 import functools
 import py_trees_ros
 import rcl_interfaces.msg as rcl_msgs
@@ -29,6 +33,9 @@ import time
 import PyQt5.QtCore as qt_core
 import PyQt5.QtWidgets as qt_widgets
 
+from .. import logging
+from .. import metrics
+
 # To use generated files instead of loading ui's directly
 from . import gui
 
@@ -49,6 +56,7 @@ class Backend(qt_core.QObject):
 
         self.ui = dashboard_group_box
         self.node = rclpy.create_node("dashboard")
+        self.logger = logging.get_logger(name="dashboard", sink=logging.node_sink(self.node))
 
         self.shutdown_requested = False
         self.last_battery_charging_status = None
@@ -63,16 +71,26 @@ class Backend(qt_core.QObject):
             ]
         )
 
+        self.button_presses = {
+            button: metrics.registry().register(
+                metrics.Counter(name="hugr_dashboard_button_presses_total", help="dashboard button presses, by button"),
+                labels={'button': button}
+            )
+            for button in ['scan', 'cancel']
+        }
+
         self.ui.ui.scan_push_button.pressed.connect(
             functools.partial(
                 self.publish_button_message,
-                self.publishers.scan)
+                self.publishers.scan,
+                'scan')
         )
 
         self.ui.ui.cancel_push_button.pressed.connect(
             functools.partial(
                 self.publish_button_message,
-                self.publishers.cancel)
+                self.publishers.cancel,
+                'cancel')
         )
 
         latched = True
@@ -114,6 +132,9 @@ class Backend(qt_core.QObject):
         while rclpy.ok() and not self.shutdown_requested:
             self.fetch_safety_sensors_parameters(timeout_sec=0.1)
             rclpy.spin_once(self.node, timeout_sec=0.1)
+        logging.dispatcher().flush()  # anything queued still needs the node's logger
+        for counter in self.button_presses.values():
+            metrics.registry().unregister(counter)
         self.node.destroy_node()
 
     def spin_until_future_complete(self, future: rclpy.task.Future, timeout_sec: float):
@@ -170,7 +191,8 @@ class Backend(qt_core.QObject):
             self.last_safety_sensors_enabled_status = value.bool_value
             self.safety_sensors_enabled_changed.emit(value.bool_value)
 
-    def publish_button_message(self, publisher):
+    def publish_button_message(self, publisher, button):
+        self.button_presses[button].inc()
         publisher.publish(std_msgs.Empty())
 
     def terminate_ros_spinner(self):
@@ -195,9 +217,9 @@ class Backend(qt_core.QObject):
     def led_strip_display_callback(self, msg):
         colour = "grey"
         if not msg.data:
-            self.node.get_logger().info("no colour specified, setting '{}'".format(colour))
+            self.logger.info("no colour specified, setting '{}'", colour, period=5.0)
         elif msg.data not in ["grey", "blue", "red", "green"]:
-            self.node.get_logger().info("received unsupported LED colour '{0}', setting '{1}'".format(msg.data, colour))
+            self.logger.info("received unsupported LED colour '{}', setting '{}'", msg.data, colour, period=5.0, colour=msg.data)
         else:
             colour = msg.data
         self.led_colour_changed.emit(colour)
@@ -259,8 +281,13 @@ class Backend(qt_core.QObject):
 ##############################################################################
 
 def main():
+    parser = argparse.ArgumentParser(description='Dashboard for the mock robot')
+    metrics.add_command_line_arguments(parser)
+    # leave qt's arguments to qt
+    args, unused_qt_args = parser.parse_known_args(rclpy.utilities.remove_ros_args(args=sys.argv)[1:])
     # picks up sys.argv automagically internally
     rclpy.init()
+    metrics_server = metrics.serve_from_command_line(args)
     # enable handling of ctrl-c (from roslaunch as well)
     # signal.signal(signal.SIGINT, signal.SIG_DFL)
 
@@ -312,5 +339,7 @@ def main():
     # shutdown
     backend.node.get_logger().info("joining")
     ros_thread.join()
+    if metrics_server is not None:
+        metrics_server.shutdown()
     rclpy.shutdown()
     sys.exit(result)
@@ -18,18 +18,21 @@ Mocks a docking controller
 ##############################################################################
 
 import argparse
-import py_trees_ros.mock.actions
 # import py_trees_ros_interfaces.action as py_trees_actions
 import hugr_interfaces.action as hugr_actions
 import rclpy
 import sys
 
+from .. import metrics
+from . import actions
+from . import readiness
+
 ##############################################################################
 # Class
 ##############################################################################
 
 
-class Dock(py_trees_ros.mock.actions.GenericServer):
+class Dock(actions.GenericServer):
     """
     Simple action server that docks/undocks depending on the instructions
     in the goal requests.
@@ -44,15 +47,19 @@ class Dock(py_trees_ros.mock.actions.GenericServer):
 
     Args:
         duration: mocked duration of a successful docking/undocking action
+        max_concurrent_goals: goals that may execute concurrently (default: parameter, 1)
+        policy: 'queue', 'preempt' or 'reject' when at capacity (default: parameter, 'preempt')
     """
-    def __init__(self, duration: float=2.0):
+    def __init__(self, duration: float=2.0, max_concurrent_goals: int=None, policy: str=None):
         super().__init__(
             node_name="docking_controller",
             action_name="dock",
             action_type=hugr_actions.Dock,
             generate_feedback_message=self.generate_feedback_message,
             goal_received_callback=self.goal_received_callback,
-            duration=duration
+            duration=duration,
+            max_concurrent_goals=max_concurrent_goals,
+            policy=policy
         )
 
     def goal_received_callback(self, goal):
@@ -65,30 +72,34 @@ class Dock(py_trees_ros.mock.actions.GenericServer):
         else:
             self.title = "UnDock"
 
-    def generate_feedback_message(self) -> hugr_actions.Dock.Feedback:
+    def generate_feedback_message(self, goal: actions.Goal) -> hugr_actions.Dock.Feedback:
         """
-        Create a feedback message that populates the percent completed.
+        Populate the goal's (preallocated) feedback message with the percent completed.
+
+        Args:
+            goal: the goal to generate feedback for
 
         Returns:
-            :class:`py_trees_actions.Dock_Feedback`: the populated feedback message
+            :class:`py_trees_actions.Dock_Feedback`: the populated (reused) feedback message
         """
-        msg = hugr_actions.Dock.Feedback(
-            percentage_completed=self.percent_completed
-        )
-        return msg
+        goal.feedback.percentage_completed = float(goal.percent_completed)
+        return goal.feedback
 
 
 def main():
     """
     Entry point for the mocked docking controller.
     """
+    readiness.imports_done()
     parser = argparse.ArgumentParser(description='Mock a docking controller')
     command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
-    parser.parse_args(command_line_args)
+    metrics.add_command_line_arguments(parser)
+    args = parser.parse_args(command_line_args)
     rclpy.init()  # picks up sys.argv automagically internally
+    metrics_server = metrics.serve_from_command_line(args)
     docking = Dock()
 
-    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=max(4, docking.max_concurrent_goals + 2))
     executor.add_node(docking.node)
 
     try:
@@ -102,4 +113,6 @@ def main():
         #   The following exception was never retrieved: PyCapsule_GetPointer
         #   called with invalid PyCapsule object
         executor.shutdown()  # finishes all remaining work and exits
+        if metrics_server is not None:
+            metrics_server.shutdown()
         rclpy.try_shutdown()
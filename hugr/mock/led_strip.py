@@ -28,6 +28,10 @@ import sys
 import threading
 import uuid
 
+from .. import logging
+from .. import metrics
+from . import readiness
+
 ##############################################################################
 # Class
 ##############################################################################
@@ -44,6 +48,9 @@ class LEDStrip(object):
         * **~display** (:class:`std_msgs.msg.String`)
 
           * colourised string display of the current led strip state
+        * **~ready** (:class:`std_msgs.msg.String`, latched)
+
+          * bringup readiness report (:class:`hugr.mock.readiness.Readiness`)
 
     Subscribers:
         * **~command** (:class:`std_msgs.msg.String`)
@@ -56,6 +63,12 @@ class LEDStrip(object):
 
     def __init__(self):
         self.node = rclpy.create_node("led_strip")
+        self.logger = logging.get_logger(name=self.node.get_name(), sink=logging.node_sink(self.node))
+        self.readiness = readiness.Readiness(self.node)
+        self.commands = metrics.registry().register(
+            metrics.Counter(name="hugr_messages_received_total", help="messages received, by topic"),
+            labels={'node': self.node.get_name(), 'topic': 'command'}
+        )
         self.command_subscriber = self.node.create_subscription(
             msg_type=std_msgs.String,
             topic='~/command',
@@ -72,6 +85,7 @@ class LEDStrip(object):
         self.last_uuid = None
         self.lock = threading.Lock()
         self.flashing_timer = None
+        self.readiness.ready()
 
     def _get_display_string(self, width: int, label: str="Foo") -> str:
         """
@@ -142,11 +156,12 @@ class LEDStrip(object):
         Args:
             msg (:class:`std_msgs.msg.String`): incoming command message
         """
+        self.commands.inc()
         with self.lock:
             text = self.generate_led_text(msg.data)
             # don't bother publishing if nothing changed.
             if self.last_text != text:
-                self.node.get_logger().info("{}".format(text))
+                self.logger.info("{}", text, colour=msg.data)
                 self.last_text = text
                 self.last_uuid = uuid.uuid4()
                 self.display_publisher.publish(std_msgs.String(data=msg.data))
@@ -184,6 +199,8 @@ class LEDStrip(object):
         """
         Cleanup ROS components.
         """
+        logging.dispatcher().flush()  # anything queued still needs the node's logger
+        metrics.registry().unregister(self.commands)
         self.node.destroy_node()
 
 
@@ -191,14 +208,19 @@ def main():
     """
     Entry point for the mock led strip.
     """
+    readiness.imports_done()
     parser = argparse.ArgumentParser(description='Mock an led strip')
     command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
-    parser.parse_args(command_line_args)
+    metrics.add_command_line_arguments(parser)
+    args = parser.parse_args(command_line_args)
     rclpy.init(args=sys.argv)
+    metrics_server = metrics.serve_from_command_line(args)
     led_strip = LEDStrip()
     try:
         rclpy.spin(led_strip.node)
     except (KeyboardInterrupt, rclpy.executors.ExternalShutdownException):
         pass
     finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
         rclpy.try_shutdown()
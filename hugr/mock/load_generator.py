@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Load generating action clients for capacity planning of the mock action servers.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import action_msgs.msg as action_msgs  # GoalStatus
+import argparse
+import functools
+import json
+import math
+import py_trees.console as console
+import py_trees_ros_interfaces.action as py_trees_actions  # noqa
+import hugr_interfaces.action as hugr_actions
+import random
+import rclpy.action
+import rclpy.executors
+import sys
+import threading
+import time
+import typing
+
+from .. import metrics
+
+##############################################################################
+# Helpers
+##############################################################################
+
+# action types as served by the mock action servers
+action_types = {
+    'dock': hugr_actions.Dock,
+    'move_base': hugr_actions.MoveBase,
+    'rotate': py_trees_actions.Rotate,
+}
+
+status_strings = {
+    action_msgs.GoalStatus.STATUS_UNKNOWN: "unknown",
+    action_msgs.GoalStatus.STATUS_ACCEPTED: "accepted",
+    action_msgs.GoalStatus.STATUS_EXECUTING: "executing",
+    action_msgs.GoalStatus.STATUS_CANCELING: "canceling",
+    action_msgs.GoalStatus.STATUS_SUCCEEDED: "succeeded",
+    action_msgs.GoalStatus.STATUS_CANCELED: "canceled",
+    action_msgs.GoalStatus.STATUS_ABORTED: "aborted",
+}
+
+
+class Statistics(object):
+    """
+    Latency histograms and outcome counts for one action, also registered
+    with the shared metrics registry (labelled with the action name).
+
+    Args:
+        action_name: the action these statistics are collected for
+    """
+    def __init__(self, action_name: str):
+        self.action_name = action_name
+        self.labels = {'action': action_name}
+        self.accept = metrics.registry().histogram(
+            name="hugr_load_accept_seconds", help="time (s) from sending a goal to its response", labels=self.labels
+        )
+        self.feedback = metrics.registry().histogram(
+            name="hugr_load_feedback_seconds", help="time (s) from sending a goal to its first feedback", labels=self.labels
+        )
+        self.result = metrics.registry().histogram(
+            name="hugr_load_result_seconds", help="time (s) from sending a goal to its result", labels=self.labels
+        )
+        self.outcomes = {}
+        self.lock = threading.Lock()
+
+    def count(self, outcome: str):
+        """
+        Count a goal outcome (e.g. 'succeeded', 'rejected').
+
+        Args:
+            outcome: name of the outcome
+        """
+        with self.lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        metrics.registry().counter(
+            name="hugr_load_goals_total", help="goals sent, by outcome", labels=dict(self.labels, outcome=outcome)
+        ).inc()
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        """
+        Summary of latencies (s) and outcomes.
+        """
+        return {
+            'latencies': {
+                'accept': self.accept.summary(),
+                'feedback': self.feedback.summary(),
+                'result': self.result.summary(),
+            },
+            'outcomes': dict(self.outcomes)
+        }
+
+
+class PendingGoal(object):
+    """
+    Timestamps for a goal in flight.
+    """
+    def __init__(self):
+        self.sent = time.monotonic()
+        self.accepted = None
+        self.feedback = None
+        self.goal_handle = None
+        self.cancel = False
+        self.cancel_requested = False
+
+##############################################################################
+# Load Generator
+##############################################################################
+
+
+class LoadClient(object):
+    """
+    Fires goals at an action server at a fixed rate, optionally cancelling
+    some of them a short while after they have been accepted, and records
+    goal-accept, first feedback and result latencies (all measured from
+    the moment the goal was sent).
+
+    Args:
+        node_name: name of the node for this client
+        action_name: the action to load (e.g. 'dock')
+        rate: goals per second
+        statistics: where latencies and outcomes are recorded
+        cancel_probability: probability that an accepted goal is cancelled
+        cancel_after: delay (s) between acceptance and the cancel request
+        seed: seed for the cancellation decisions
+    """
+    def __init__(
+            self,
+            node_name: str,
+            action_name: str,
+            rate: float,
+            statistics: Statistics,
+            cancel_probability: float=0.0,
+            cancel_after: float=0.5,
+            seed: int=None
+    ):
+        self.action_name = action_name
+        self.action_type = action_types[action_name]
+        self.statistics = statistics
+        self.cancel_probability = cancel_probability
+        self.cancel_after = cancel_after
+        self.random = random.Random(seed)
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.node = rclpy.create_node(node_name)
+        self.action_client = rclpy.action.ActionClient(
+            node=self.node,
+            action_type=self.action_type,
+            action_name=self.action_name
+        )
+        self.period = 1.0 / rate
+        self.send_timer = None
+        self.cancel_timer = None
+
+    def start(self):
+        """
+        Start firing goals.
+        """
+        self.send_timer = self.node.create_timer(self.period, self.send_goal)
+        self.cancel_timer = self.node.create_timer(0.05, self.send_cancel_requests)
+
+    def stop(self):
+        """
+        Stop firing goals (goals in flight will still complete).
+        """
+        if self.send_timer is not None:
+            self.node.destroy_timer(self.send_timer)
+            self.send_timer = None
+
+    def in_flight(self) -> int:
+        """
+        Number of goals awaiting a response or result.
+        """
+        with self.lock:
+            return len(self.pending)
+
+    def send_goal(self):
+        """
+        Timer callback that fires off the next goal.
+        """
+        pending = PendingGoal()
+        with self.lock:
+            self.pending.add(pending)
+        future = self.action_client.send_goal_async(
+            self.action_type.Goal(),
+            feedback_callback=functools.partial(self.feedback_callback, pending)
+        )
+        future.add_done_callback(functools.partial(self.goal_response_callback, pending))
+
+    def feedback_callback(self, pending: PendingGoal, unused_msg: typing.Any):
+        """
+        Record the latency of the first feedback message for the goal.
+        """
+        if pending.feedback is None:
+            pending.feedback = time.monotonic()
+            self.statistics.feedback.observe(pending.feedback - pending.sent)
+
+    def goal_response_callback(self, pending: PendingGoal, future: rclpy.task.Future):
+        """
+        Record the accept latency (or rejection) and chain the result request.
+        """
+        goal_handle = future.result()
+        if goal_handle is None or not goal_handle.accepted:
+            self.statistics.count("rejected")
+            with self.lock:
+                self.pending.discard(pending)
+            return
+        pending.accepted = time.monotonic()
+        pending.goal_handle = goal_handle
+        pending.cancel = self.random.random() < self.cancel_probability
+        self.statistics.accept.observe(pending.accepted - pending.sent)
+        goal_handle.get_result_async().add_done_callback(
+            functools.partial(self.result_callback, pending)
+        )
+
+    def send_cancel_requests(self):
+        """
+        Timer callback that cancels goals flagged for cancellation once they are due.
+        """
+        now = time.monotonic()
+        with self.lock:
+            due = [p for p in self.pending if p.cancel and not p.cancel_requested and now - p.accepted > self.cancel_after]
+        for pending in due:
+            pending.cancel_requested = True
+            pending.goal_handle.cancel_goal_async()
+
+    def result_callback(self, pending: PendingGoal, future: rclpy.task.Future):
+        """
+        Record the result latency and the goal's outcome.
+        """
+        self.statistics.result.observe(time.monotonic() - pending.sent)
+        self.statistics.count(status_strings.get(future.result().status, "unknown"))
+        with self.lock:
+            self.pending.discard(pending)
+
+    def shutdown(self):
+        """
+        Cleanup
+        """
+        self.action_client.destroy()
+        self.node.destroy_node()
+
+
+def to_json(summary: typing.Dict[str, typing.Any]) -> str:
+    """
+    Serialise a load generator summary, undefined statistics become nulls.
+
+    Args:
+        summary: statistics summaries, keyed by action name
+    """
+    def sanitise(value):
+        if isinstance(value, dict):
+            return {k: sanitise(v) for k, v in value.items()}
+        if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+            return None
+        return value
+    return json.dumps(sanitise(summary), indent=2)
+
+
+def print_summary(summary: typing.Dict[str, typing.Any]):
+    """
+    Pretty print a load generator summary.
+
+    Args:
+        summary: statistics summaries, keyed by action name
+    """
+    def ms(value):
+        return "{:9.2f}".format(value * 1000.0) if not math.isnan(value) else "        -"
+
+    for action_name, statistics in summary.items():
+        print(console.bold + "{}".format(action_name) + console.reset)
+        print(console.cyan + "  {:<10}{:>7}{:>10}{:>10}{:>10}{:>10}{:>10}  [ms]".format(
+            "latency", "count", "mean", "p50", "p90", "p99", "max") + console.reset)
+        for name, latency in statistics['latencies'].items():
+            print("  {:<10}{:>7} {} {} {} {} {}".format(
+                name, latency['count'], ms(latency['mean']), ms(latency['p50']),
+                ms(latency['p90']), ms(latency['p99']), ms(latency['max'])
+            ))
+        print(console.cyan + "  outcomes  " + console.yellow + "{}".format(
+            ", ".join("{}: {}".format(k, v) for k, v in sorted(statistics['outcomes'].items()))) + console.reset)
+
+
+def command_line_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="fire goals at the mock action servers and report latencies",
+        epilog="And his noodly appendage reached forth to tickle the blessed...\n"
+    )
+    parser.add_argument('-a', '--actions', nargs='+', choices=sorted(action_types.keys()),
+                        default=sorted(action_types.keys()), help='actions to load')
+    parser.add_argument('-n', '--clients', type=int, default=1, help='concurrent clients per action')
+    parser.add_argument('-r', '--rate', type=float, default=1.0, help='goals per second, per client')
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help='time (s) to fire goals for')
+    parser.add_argument('--drain', type=float, default=10.0, help='time (s) to wait for goals in flight')
+    parser.add_argument('-c', '--cancel-probability', type=float, default=0.0,
+                        help='probability an accepted goal is cancelled')
+    parser.add_argument('--cancel-after', type=float, default=0.5, help='delay (s) before cancelling')
+    parser.add_argument('--seed', type=int, default=None, help='seed for cancellation decisions')
+    parser.add_argument('--json', action='store_true', default=False, help='print the summary as json')
+    metrics.add_command_line_arguments(parser)
+    command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
+    return parser.parse_args(command_line_args)
+
+
+def main():
+    """
+    Entry point for the load generator.
+    """
+    args = command_line_argument_parser()
+    rclpy.init()  # picks up sys.argv automagically internally
+    metrics_server = metrics.serve_from_command_line(args)
+    statistics = {name: Statistics(name) for name in args.actions}
+    clients = []
+    for action_name in args.actions:
+        for i in range(args.clients):
+            clients.append(
+                LoadClient(
+                    node_name="{}_load_client_{}".format(action_name, i),
+                    action_name=action_name,
+                    rate=args.rate,
+                    statistics=statistics[action_name],
+                    cancel_probability=args.cancel_probability,
+                    cancel_after=args.cancel_after,
+                    seed=None if args.seed is None else args.seed + len(clients)
+                )
+            )
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    for client in clients:
+        executor.add_node(client.node)
+
+    started = False  # only summarise a run that happened
+    try:
+        for client in clients:
+            if not client.action_client.wait_for_server(timeout_sec=2.0):
+                console.logerror("timed out waiting for the server [{}]".format(client.action_name))
+                sys.exit(1)
+        for client in clients:
+            client.start()
+        started = True
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < args.duration:
+            executor.spin_once(timeout_sec=0.1)
+        for client in clients:
+            client.stop()
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < args.drain and any(c.in_flight() for c in clients):
+            executor.spin_once(timeout_sec=0.1)
+    except (KeyboardInterrupt, rclpy.executors.ExternalShutdownException):
+        pass
+    finally:
+        if started:
+            summary = {name: s.summary() for name, s in statistics.items()}
+            if args.json:
+                print(to_json(summary))
+            else:
+                print_summary(summary)
+        for client in clients:
+            client.shutdown()
+        executor.shutdown()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        rclpy.try_shutdown()
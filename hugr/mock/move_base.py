@@ -18,19 +18,21 @@ Mocks a simple action server that rotates the robot 360 degrees.
 ##############################################################################
 
 import argparse
-import geometry_msgs.msg as geometry_msgs
-import py_trees_ros.mock.actions
 # import py_trees_ros_interfaces.action as py_trees_actions
 import hugr_interfaces.action as hugr_actions
 import rclpy
 import sys
 
+from .. import metrics
+from . import actions
+from . import readiness
+
 ##############################################################################
 # Class
 ##############################################################################
 
 
-class MoveBase(py_trees_ros.mock.actions.GenericServer):
+class MoveBase(actions.GenericServer):
     """
     Simulates a move base style interface.
 
@@ -44,46 +46,53 @@ class MoveBase(py_trees_ros.mock.actions.GenericServer):
 
     Args:
         duration: mocked duration of a successful action
+        max_concurrent_goals: goals that may execute concurrently (default: parameter, 1)
+        policy: 'queue', 'preempt' or 'reject' when at capacity (default: parameter, 'preempt')
     """
-    def __init__(self, duration=None):
+    def __init__(self, duration=None, max_concurrent_goals: int=None, policy: str=None):
         super().__init__(
             node_name="move_base_controller",
             action_name="move_base",
             action_type=hugr_actions.MoveBase,
             generate_feedback_message=self.generate_feedback_message,
-            duration=duration
+            duration=duration,
+            max_concurrent_goals=max_concurrent_goals,
+            policy=policy
         )
-        self.pose = geometry_msgs.PoseStamped()
-        self.pose.pose.position = geometry_msgs.Point(x=0.0, y=0.0, z=0.0)
 
-    def generate_feedback_message(self) -> hugr_actions.MoveBase.Feedback:
+    def generate_feedback_message(self, goal: actions.Goal) -> hugr_actions.MoveBase.Feedback:
         """
-        Do a fake pose incremenet and populate the feedback message.
+        Do a fake pose increment on the goal's own (preallocated) feedback
+        message, so concurrent goals each make their own progress.
+
+        Args:
+            goal: the goal to generate feedback for
 
         Returns:
-            :class:`hugr_actions.MoveBase.Feedback`: the populated feedback message
+            :class:`hugr_actions.MoveBase.Feedback`: the populated (reused) feedback message
         """
         # actually doesn't go to the goal right now...
         # but we could take the feedback from the action
         # and increment this to that proportion
         # self.odometry.pose.pose.position.x += 0.01
-        self.pose.pose.position.x += 0.01
-        msg = hugr_actions.MoveBase.Feedback()  # .Feedback() is more proper, but indexing can't find it
-        msg.base_position = self.pose
-        return msg
+        goal.feedback.base_position.pose.position.x += 0.01
+        return goal.feedback
 
 
 def main():
     """
     Entry point for the mock move base node.
     """
+    readiness.imports_done()
     parser = argparse.ArgumentParser(description='Mock a docking controller')
     command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
-    parser.parse_args(command_line_args)
+    metrics.add_command_line_arguments(parser)
+    args = parser.parse_args(command_line_args)
 
     rclpy.init()  # picks up sys.argv automagically internally
+    metrics_server = metrics.serve_from_command_line(args)
     move_base = MoveBase()
-    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=max(4, move_base.max_concurrent_goals + 2))
     executor.add_node(move_base.node)
 
     try:
@@ -98,4 +107,6 @@ def main():
         #   The following exception was never retrieved: PyCapsule_GetPointer
         #   called with invalid PyCapsule object
         executor.shutdown()  # finishes all remaining work and exits
+        if metrics_server is not None:
+            metrics_server.shutdown()
         rclpy.try_shutdown()
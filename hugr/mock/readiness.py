@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Readiness reports for the mock robot's processes and a barrier that waits on them.
+
+Each mock publishes a latched report on ``~/ready`` once its endpoints
+are up, with wall clock timestamps for each stage of its bringup
+(process start, imports done, node created, endpoints ready). Trees can
+wait on all of them at once (:func:`wait_until_ready`) rather than
+discovering each endpoint in turn and the bringup profiler
+(:mod:`hugr.mock.bringup_profiler`) turns them into a startup waterfall.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import collections
+import json
+import os
+import time
+import typing
+
+import py_trees_ros
+import rclpy
+import rclpy.node
+import std_msgs.msg as std_msgs
+
+##############################################################################
+# Helpers
+##############################################################################
+
+# names of the mock nodes that report their readiness
+mock_nodes = [
+    'battery',
+    'docking_controller',
+    'led_strip',
+    'move_base_controller',
+    'rotation_controller',
+    'safety_sensors',
+]
+
+# bringup stages, in order
+stages = ['process_start', 'imports_done', 'node_created', 'endpoints_ready']
+
+_imports_done = None
+
+
+def imports_done():
+    """
+    Mark the moment the process finished importing, call this first thing in a mock's main().
+    """
+    global _imports_done
+    _imports_done = time.time()
+
+
+def process_start_time() -> typing.Optional[float]:
+    """
+    Wall clock time at which this process started (linux only).
+
+    Returns:
+        the start time (s since the epoch) or None if it can't be determined
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # the command name may contain spaces, fields resume after its closing bracket
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # field 22, starttime
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError, StopIteration):
+        return None
+
+##############################################################################
+# Readiness
+##############################################################################
+
+
+class Readiness(object):
+    """
+    Stamps the bringup stages of a mock and publishes them once
+    its endpoints are ready. Create this immediately after the node.
+
+    Publishers:
+        * **~ready** (:class:`std_msgs.msg.String`, latched)
+
+          * json report with the node name, pid and stage timestamps (None if unknown)
+
+    Args:
+        node: the mock's node
+    """
+    def __init__(self, node: rclpy.node.Node):
+        self.node = node
+        self.stamps = collections.OrderedDict([
+            ('process_start', process_start_time()),
+            ('imports_done', _imports_done),
+            ('node_created', time.time()),
+            ('endpoints_ready', None),
+        ])
+        self.publisher = self.node.create_publisher(
+            msg_type=std_msgs.String,
+            topic="~/ready",
+            qos_profile=py_trees_ros.utilities.qos_profile_latched()
+        )
+
+    def ready(self):
+        """
+        Stamp and publish the readiness report.
+        """
+        self.stamps['endpoints_ready'] = time.time()
+        self.publisher.publish(
+            std_msgs.String(
+                data=json.dumps({
+                    'node': self.node.get_fully_qualified_name(),
+                    'pid': os.getpid(),
+                    'stamps': self.stamps,
+                })
+            )
+        )
+
+##############################################################################
+# Barrier
+##############################################################################
+
+
+def wait_until_ready(
+        node_names: typing.List[str]=None,
+        timeout: float=15.0,
+        node: rclpy.node.Node=None,
+        namespace: str=None
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """
+    Wait, in parallel, for readiness reports from the specified nodes. Since
+    the reports are latched, they are received whether the nodes came up
+    before or after the wait began.
+
+    The reports are looked up relative to the namespace of the waiting
+    node, so a tree finds the mocks that were launched alongside it
+    (e.g. under a robot's namespace).
+
+    Args:
+        node_names: names of the nodes to wait for (default: all the mocks)
+        timeout: time (s) to wait before giving up
+        node: node to spin while waiting (default: a temporary node)
+        namespace: namespace of the temporary node (default: that of the process, e.g. via ``__ns``)
+
+    Returns:
+        readiness reports, keyed by node name (nodes that did not report are missing)
+    """
+    node_names = node_names if node_names is not None else mock_nodes
+    temporary = node is None
+    if temporary:
+        node = rclpy.create_node("readiness_barrier", namespace=namespace)
+    reports = {}
+
+    def callback(name: str, msg: std_msgs.String):
+        reports[name] = json.loads(msg.data)
+
+    subscriptions = [
+        node.create_subscription(
+            msg_type=std_msgs.String,
+            topic="{}/ready".format(name),
+            callback=lambda msg, name=name: callback(name, msg),
+            qos_profile=py_trees_ros.utilities.qos_profile_latched()
+        )
+        for name in node_names
+    ]
+    try:
+        start_time = time.monotonic()
+        while len(reports) < len(node_names) and time.monotonic() - start_time < timeout:
+            rclpy.spin_once(node, timeout_sec=0.1)
+    finally:
+        for subscription in subscriptions:
+            node.destroy_subscription(subscription)
+        if temporary:
+            node.destroy_node()
+    return reports
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+The mock robot (and a tree) in a single process, for scripted scenarios.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees_ros
+import rclpy
+import rclpy.executors
+import rclpy.node
+import rclpy.parameter
+import std_msgs.msg as std_msgs
+import typing
+
+from . import battery
+from . import clock
+from . import dock
+from . import led_strip
+from . import move_base
+from . import rotate
+from . import safety_sensors
+from .. import trees
+
+##############################################################################
+# Robot
+##############################################################################
+
+
+class Robot(object):
+    """
+    All of the mocked robot components, minus the qt dashboard, instantiated
+    in-process. The dashboard's buttons are replaced by a plain node that
+    publishes the same scan and cancel events.
+
+    Node Name:
+        * **dashboard** (plus the nodes of each mocked component)
+
+    Publishers:
+        * **/dashboard/scan** (:class:`std_msgs.msg.Empty`)
+        * **/dashboard/cancel** (:class:`std_msgs.msg.Empty`)
+
+    Args:
+        dock_duration: mocked duration of docking/undocking actions
+        move_base_duration: mocked duration of move base actions
+        rotation_rate: rate of rotation (rad/s) for the rotation controller
+    """
+    def __init__(
+            self,
+            dock_duration: float=2.0,
+            move_base_duration: float=5.0,
+            rotation_rate: float=1.57
+    ):
+        self.battery = battery.Battery()
+        self.dock = dock.Dock(duration=dock_duration)
+        self.move_base = move_base.MoveBase(duration=move_base_duration)
+        self.rotate = rotate.Rotate(rotation_rate=rotation_rate)
+        self.led_strip = led_strip.LEDStrip()
+        self.safety_sensors = safety_sensors.SafetySensors()
+        self.dashboard = rclpy.create_node("dashboard")
+        not_latched = False  # latched = True
+        self.publishers = py_trees_ros.utilities.Publishers(
+            self.dashboard,
+            [
+                ('scan', "~/scan", std_msgs.Empty, not_latched),
+                ('cancel', "~/cancel", std_msgs.Empty, not_latched),
+            ]
+        )
+        self.action_servers = {
+            'dock': self.dock,
+            'move_base': self.move_base,
+            'rotate': self.rotate
+        }
+
+    @property
+    def nodes(self) -> typing.List[rclpy.node.Node]:
+        """
+        All of the robot's nodes.
+        """
+        return [
+            self.battery.node, self.dock.node, self.move_base.node, self.rotate.node,
+            self.led_strip.node, self.safety_sensors.node, self.dashboard
+        ]
+
+    def press_scan(self):
+        """
+        Emulate a press of the dashboard's scan button.
+        """
+        self.publishers.scan.publish(std_msgs.Empty())
+
+    def press_cancel(self):
+        """
+        Emulate a press of the dashboard's cancel button.
+        """
+        self.publishers.cancel.publish(std_msgs.Empty())
+
+    def set_battery(self, percentage: float, charging: bool=False):
+        """
+        Jump the battery to the specified state.
+
+        Args:
+            percentage: new charge percentage
+            charging: whether the battery is charging or discharging
+        """
+        self.battery.node.set_parameters([
+            rclpy.parameter.Parameter('charging_percentage', rclpy.parameter.Parameter.Type.DOUBLE, float(percentage)),
+            rclpy.parameter.Parameter('charging', rclpy.parameter.Parameter.Type.BOOL, charging),
+        ])
+
+    def fail(self, action_name: str, failing: bool=True):
+        """
+        Inject (or clear) failures into one of the action servers.
+        While failing, executing goals are aborted.
+
+        Args:
+            action_name: one of 'dock', 'move_base', 'rotate'
+            failing: inject or clear
+        """
+        self.action_servers[action_name].failing = failing
+
+    def shutdown(self):
+        """
+        Cleanup ROS components.
+        """
+        for server in self.action_servers.values():
+            server.abort()
+            server.shutdown()
+        self.battery.shutdown()
+        self.led_strip.shutdown()
+        self.safety_sensors.shutdown()
+        self.dashboard.destroy_node()
+
+##############################################################################
+# Scenario
+##############################################################################
+
+
+class Scenario(object):
+    """
+    Ticks a tree against an in-process :class:`Robot`, in simulated time,
+    firing scripted events (e.g. scan, cancel, battery drops, action failures)
+    along the way.
+
+    .. code-block:: python
+
+       scenario = Scenario(root=seven_docking_cancelling_failing.tutorial_create_root())
+       scenario.setup()
+       scenario.at(1.0, scenario.robot.press_scan)
+       assert scenario.run(until=lambda: scenario.blackboard("scan_result") is not None, timeout=60.0)
+       scenario.shutdown()
+
+    Times are simulated seconds, relative to the end of :meth:`setup`.
+
+    The tree is ticked from a (simulated time) timer on its own node, just
+    as it would be in a live system, so the tree's subscriber and service
+    callbacks are serialised with its ticks.
+
+    Args:
+        root: root of the tree to tick
+        tick_period: simulated time (s) between ticks
+        robot: the mock robot, created with defaults if not provided
+        tree: a prebuilt tree (e.g. a dynamic application tree), alternative to root
+
+    Raises:
+        ValueError: if neither (or both) of root and tree are provided
+    """
+    def __init__(
+            self,
+            root: py_trees.behaviour.Behaviour=None,
+            tick_period: float=1.0,
+            robot: Robot=None,
+            tree: py_trees_ros.trees.BehaviourTree=None
+    ):
+        if (root is None) == (tree is None):
+            raise ValueError("scenarios require one of either a root or a tree")
+        self.tick_period = tick_period
+        self.executor = rclpy.executors.MultiThreadedExecutor(num_threads=8)
+        self.clock = clock.SimulatedClock(self.executor)
+        self.robot = robot if robot is not None else Robot()
+        for node in self.robot.nodes:
+            self.clock.add_node(node)
+        if tree is None:
+            tree = trees.BehaviourTree(root=root, unicode_tree_debug=False)
+        self.tree = tree
+        self.events = []  # (time, name, callback)
+        self.history = []  # (time, name)
+        self.start_time = None
+
+    def setup(self, timeout: float=15.0):
+        """
+        Setup the tree and switch its node over to simulated time.
+
+        Args:
+            timeout: time (s) to wait for the tree to setup
+        """
+        self.tree.setup(timeout=timeout)
+        self.clock.add_node(self.tree.node)
+        self.start_time = self.clock.now
+        self.tree.tick_tock(period_ms=1000.0 * self.tick_period)
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Simulated time (s) since setup.
+        """
+        return self.clock.now - self.start_time
+
+    def at(self, time: float, callback: typing.Callable[[], None], name: str=None):
+        """
+        Schedule an event.
+
+        Args:
+            time: simulated time (s) since setup at which to fire the event
+            callback: the event
+            name: name to record in the history (defaults to the callback's name)
+        """
+        name = name if name is not None else getattr(callback, '__name__', str(callback))
+        self.events.append((time, name, callback))
+        self.events.sort(key=lambda event: event[0])
+
+    def blackboard(self, key: str) -> typing.Any:
+        """
+        Convenience lookup of a blackboard variable.
+
+        Args:
+            key: name of the variable (relative to the root namespace)
+
+        Returns:
+            the value, or None if it doesn't exist
+        """
+        return py_trees.blackboard.Blackboard.storage.get(
+            py_trees.blackboard.Blackboard.absolute_name("/", key), None
+        )
+
+    def run(self, until: typing.Callable[[], bool], timeout: float) -> bool:
+        """
+        Step simulated time, firing due events along the way, until
+        the condition is met or the (simulated) timeout expires.
+
+        Args:
+            until: condition checked after every step
+            timeout: simulated time (s) since setup to give up at
+
+        Returns:
+            whether the condition was met
+        """
+        while True:
+            while self.events and self.events[0][0] <= self.elapsed:
+                unused_time, name, callback = self.events.pop(0)
+                self.history.append((self.elapsed, name))
+                callback()
+                self.clock.spin()
+            if until():
+                self.history.append((self.elapsed, "done"))
+                return True
+            if self.elapsed >= timeout:
+                return False
+            self.clock.advance(self.clock.step)
+
+    def shutdown(self):
+        """
+        Cleanup the tree, mock robot and the (global) blackboard.
+        """
+        self.tree.shutdown()
+        self.robot.shutdown()
+        self.clock.shutdown()
+        self.executor.shutdown()
+        py_trees.blackboard.Blackboard.clear()
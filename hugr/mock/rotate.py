@@ -19,18 +19,21 @@ Mocks a simple action server that rotates the robot 360 degrees.
 
 import argparse
 import math
-import py_trees_ros.mock.actions
 import py_trees_ros_interfaces.action as py_trees_actions
 # import hugr_interfaces.action as hugr_actions
 import rclpy
 import sys
 
+from .. import metrics
+from . import actions
+from . import readiness
+
 ##############################################################################
 # Class
 ##############################################################################
 
 
-class Rotate(py_trees_ros.mock.actions.GenericServer):
+class Rotate(actions.GenericServer):
     """
     Simple server that controls a full rotation of the robot.
 
@@ -44,42 +47,49 @@ class Rotate(py_trees_ros.mock.actions.GenericServer):
 
     Args:
         rotation_rate (:obj:`float`): rate of rotation (rad/s)
+        max_concurrent_goals: goals that may execute concurrently (default: parameter, 1)
+        policy: 'queue', 'preempt' or 'reject' when at capacity (default: parameter, 'preempt')
     """
-    def __init__(self, rotation_rate: float=1.57):
+    def __init__(self, rotation_rate: float=1.57, max_concurrent_goals: int=None, policy: str=None):
         super().__init__(node_name="rotation_controller",
                          action_name="rotate",
                          action_type=py_trees_actions.Rotate,
                         #  action_type=hugr_actions.Rotate,
                          generate_feedback_message=self.generate_feedback_message,
-                         duration=2.0 * math.pi / rotation_rate
+                         duration=2.0 * math.pi / rotation_rate,
+                         max_concurrent_goals=max_concurrent_goals,
+                         policy=policy
                          )
 
-    def generate_feedback_message(self):
+    def generate_feedback_message(self, goal: actions.Goal) -> py_trees_actions.Rotate.Feedback:
         """
-        Create a feedback message that populates the percent completed.
+        Populate the goal's (preallocated) feedback message with the percent completed.
+
+        Args:
+            goal: the goal to generate feedback for
 
         Returns:
-            :class:`py_trees_actions.Rotate.Feedback`: the populated feedback message
+            :class:`py_trees_actions.Rotate.Feedback`: the populated (reused) feedback message
         """
-        # TODO: send some feedback message
-        msg = py_trees_actions.Rotate.Feedback()  # Rotate.Feedback() works, but the indexer can't find it
-        # msg = hugr_actions.Rotate.Feedback()  # Rotate.Feedback() works, but the indexer can't find it
-        msg.percentage_completed = self.percent_completed
-        msg.angle_rotated = 2*math.pi*self.percent_completed/100.0
-        return msg
+        goal.feedback.percentage_completed = float(goal.percent_completed)
+        goal.feedback.angle_rotated = 2*math.pi*goal.percent_completed/100.0
+        return goal.feedback
 
 
 def main():
     """
     Entry point for the mock rotation controller node.
     """
+    readiness.imports_done()
     parser = argparse.ArgumentParser(description='Mock a rotation controller')
     command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
-    parser.parse_args(command_line_args)
+    metrics.add_command_line_arguments(parser)
+    args = parser.parse_args(command_line_args)
     rclpy.init()  # picks up sys.argv automagically internally
+    metrics_server = metrics.serve_from_command_line(args)
     rotation = Rotate()
 
-    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=max(4, rotation.max_concurrent_goals + 2))
     executor.add_node(rotation.node)
     print("spinning")
 
@@ -95,6 +105,8 @@ def main():
         #   The following exception was never retrieved: PyCapsule_GetPointer
         #   called with invalid PyCapsule object
         executor.shutdown()  # finishes all remaining work and exits
+        if metrics_server is not None:
+            metrics_server.shutdown()
         rclpy.try_shutdown()
 
 
@@ -22,6 +22,9 @@ import rclpy
 import rclpy.parameter
 import sys
 
+from .. import metrics
+from . import readiness
+
 ##############################################################################
 # Class
 ##############################################################################
@@ -37,6 +40,11 @@ class SafetySensors(object):
     Node Name:
         * **safety_sensors**
 
+    Publishers:
+        * **~ready** (:class:`std_msgs.msg.String`, latched)
+
+          * bringup readiness report (:class:`hugr.mock.readiness.Readiness`)
+
     Dynamic Parameters:
         * **~enable** (:obj:`bool`)
 
@@ -53,6 +61,12 @@ class SafetySensors(object):
             ],
             automatically_declare_parameters_from_overrides=True
         )
+        self.readiness = readiness.Readiness(self.node)
+        self.enabled = metrics.registry().register(
+            metrics.Gauge(name="hugr_safety_sensors_enabled", help="whether the safety sensor pipeline is enabled",
+                          function=lambda: 1 if self.node.get_parameter("enabled").value else 0)
+        )
+        self.readiness.ready()
 
     def shutdown(self):
         """
@@ -61,6 +75,7 @@ class SafetySensors(object):
         # currently complains with:
         #  RuntimeWarning: Failed to fini publisher: rcl node implementation is invalid, at /tmp/binarydeb/ros-dashing-rcl-0.7.5/src/rcl/node.c:462
         # Q: should rlcpy.shutdown() automagically handle descruction of nodes implicitly?
+        metrics.registry().unregister(self.enabled)
         self.node.destroy_node()
 
 
@@ -68,10 +83,13 @@ def main():
     """
     Entry point for the mock safety sensors node.
     """
+    readiness.imports_done()
     parser = argparse.ArgumentParser(description='Mock the safety sensors')
     command_line_args = rclpy.utilities.remove_ros_args(args=sys.argv)[1:]
-    parser.parse_args(command_line_args)
+    metrics.add_command_line_arguments(parser)
+    args = parser.parse_args(command_line_args)
     rclpy.init()  # picks up sys.argv automagically internally
+    metrics_server = metrics.serve_from_command_line(args)
     safety_sensors = SafetySensors()
     try:
         rclpy.spin(safety_sensors.node)
@@ -79,4 +97,6 @@ def main():
         pass
     finally:
         safety_sensors.shutdown()
+        if metrics_server is not None:
+            metrics_server.shutdown()
         rclpy.try_shutdown()
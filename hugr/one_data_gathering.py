@@ -51,7 +51,11 @@ of the :term:`data gathering` pattern.
 Behaviours
 ^^^^^^^^^^
 
-The tree makes use of the :class:`py_trees_ros.battery.ToBlackboard` behaviour.
+The tree makes use of the :class:`hugr.battery.ToBlackboard` behaviour. Like
+:class:`py_trees_ros.battery.ToBlackboard`, it writes the battery state and a low
+battery warning to the blackboard, but it downsamples the incoming messages,
+only writes when something significant has changed and applies hysteresis
+to the warning so it doesn't chatter around the threshold.
 
 This behaviour will cause the entire tree will tick over with
 :attr:`~py_trees.common.Status.SUCCESS` so long as there is data incoming.
@@ -79,14 +83,14 @@ Running
 # Imports
 ##############################################################################
 
-import launch
-import launch_ros
 import py_trees
 import py_trees_ros.trees
 import py_trees.console as console
 import rclpy
 import sys
 
+from . import battery
+from . import composites
 from . import mock
 
 ##############################################################################
@@ -101,6 +105,9 @@ def generate_launch_description():
     Returns:
         the launch description
     """
+    import launch
+    import launch_ros
+
     return launch.LaunchDescription(
         mock.launch.generate_launch_nodes() +
         [
@@ -120,7 +127,7 @@ def generate_launch_description():
 
 def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     """
-    Create a basic tree and start a 'Topics2BB' work sequence that
+    Create a basic tree and start a 'Topics2BB' data gathering composite that
     will become responsible for data gathering behaviours.
 
     Returns:
@@ -133,8 +140,8 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         )
     )
 
-    topics2bb = py_trees.composites.Sequence(name="Topics2BB", memory=True)
-    battery2bb = py_trees_ros.battery.ToBlackboard(
+    topics2bb = composites.DataGathering(name="Topics2BB")
+    battery2bb = battery.ToBlackboard(
         name="Battery2BB",
         topic_name="/battery/state",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
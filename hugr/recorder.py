@@ -0,0 +1,379 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+A compact, binary tick log that is cheap enough to leave on in production.
+
+Ticks are appended to memory-mapped segment files of a fixed size. When a
+segment fills up (or the tree's shape changes), it is truncated to size and
+recording continues in the next, deleting the oldest segments beyond a limit.
+Each segment stands alone, it can be read without any of the others.
+
+**Segment layout** (little-endian):
+
+* magic ``HUGRLOG1``, header length (u32), header (utf-8 json)
+
+  * ``behaviours``: one entry per behaviour in tree (post) order - id, name, class and parent index
+  * ``segment``, ``started``: segment index and wall clock time it was started
+
+* records, each beginning with a type (u8), until a zero type or the end of the file
+
+  * **string** (1): id (u32), length (u16), utf-8 bytes - interns a feedback message, key or value
+  * **tick** (2): tick count (u64), wall clock stamp (f64), behaviour count (u16), key count (u16), then
+
+    * per behaviour: index (u16), status (u8, refer to :data:`statuses`), feedback message string id (u32)
+    * per blackboard key: key string id (u32), value string id (u32, :data:`DELETED` if deleted)
+
+Only behaviours whose status or feedback message changed, and blackboard
+keys that were written, since the previous tick are recorded, except on
+the first tick of a segment, which records everything. Blackboard values
+are recorded by their (truncated) representation.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import collections
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import typing
+
+import py_trees
+
+from . import blackboard
+
+##############################################################################
+# Format
+##############################################################################
+
+MAGIC = b"HUGRLOG1"
+SUFFIX = ".hugrlog"
+
+END = 0
+STRING = 1
+TICK = 2
+
+DELETED = 0xFFFFFFFF
+
+#: status codes, by index
+statuses = [
+    py_trees.common.Status.INVALID,
+    py_trees.common.Status.RUNNING,
+    py_trees.common.Status.SUCCESS,
+    py_trees.common.Status.FAILURE,
+]
+_status_codes = {status: code for code, status in enumerate(statuses)}
+
+_header_length = struct.Struct("<I")
+_string = struct.Struct("<BIH")
+_tick = struct.Struct("<BQdHH")
+_behaviour = struct.Struct("<HBI")
+_key = struct.Struct("<II")
+
+_missing = object()
+
+
+def segment_path(directory: str, index: int) -> str:
+    """
+    Path of a segment file.
+
+    Args:
+        directory: directory holding the segments
+        index: index of the segment
+
+    Returns:
+        the path
+    """
+    return os.path.join(directory, "ticks-{:06d}{}".format(index, SUFFIX))
+
+
+def segment_paths(directory: str) -> typing.List[str]:
+    """
+    Paths of the segment files in a directory, oldest first.
+
+    Args:
+        directory: directory holding the segments
+
+    Returns:
+        the paths
+    """
+    pattern = re.compile(r"ticks-(\d{6})" + re.escape(SUFFIX) + "$")
+    matches = [pattern.match(name) for name in os.listdir(directory)]
+    return [
+        os.path.join(directory, match.group(0))
+        for match in sorted((match for match in matches if match), key=lambda match: int(match.group(1)))
+    ]
+
+##############################################################################
+# Recorder
+##############################################################################
+
+
+class TickRecorder(object):
+    """
+    Appends ticks to a memory-mapped, segment rotated log. Call :meth:`record`
+    after every tick (e.g. from a post tick handler) and :meth:`close` when done.
+
+    Args:
+        directory: directory for the segments (created if need be)
+        segment_size: size (bytes) of each segment
+        max_segments: oldest segments beyond this many are deleted
+        max_value_length: blackboard value representations are truncated to this many characters
+        now: wall clock time source (s)
+
+    Raises:
+        ValueError: if the segment size is too small to be of use
+    """
+    def __init__(
+            self,
+            directory: str,
+            segment_size: int=16 * 1024 * 1024,
+            max_segments: int=64,
+            max_value_length: int=256,
+            now: typing.Callable[[], float]=time.time
+    ):
+        if segment_size < 64 * 1024:
+            raise ValueError("segment size must be at least 64KiB [{}]".format(segment_size))
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.max_value_length = max_value_length
+        self.now = now
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        self.segment_index = int(os.path.basename(existing[-1])[6:12]) + 1 if existing else 0
+        self.storage = blackboard.install()
+        self.file = None
+        self.mmap = None
+        self.offset = 0
+        self.root = None
+        self.behaviours = []
+        self.shapes = []
+
+    def record(self, tree: py_trees.trees.BehaviourTree):
+        """
+        Append the tree's latest tick.
+
+        Args:
+            tree: the tree, just after ticking
+        """
+        if tree.root is not self.root or not self._same_shape():
+            self._open(tree.root)
+        stamp = self.now()
+        data = self._encode(tree.count, stamp)
+        if self.offset + len(data) + 1 > self.segment_size:
+            self._open(tree.root)
+            data = self._encode(tree.count, stamp)
+            if self.offset + len(data) + 1 > self.segment_size:
+                raise ValueError("tick record is larger than a segment [{} bytes]".format(len(data)))
+        self.mmap[self.offset:self.offset + len(data)] = data
+        self.offset += len(data)
+
+    def close(self):
+        """
+        Truncate the current segment to size and close it.
+        """
+        if self.mmap is None:
+            return
+        self.mmap.flush()
+        self.mmap.close()
+        self.file.truncate(self.offset)
+        self.file.close()
+        self.mmap = None
+        self.file = None
+        self.root = None
+
+    def _same_shape(self) -> bool:
+        # cheaper than walking the tree every tick
+        for behaviour, children in self.shapes:
+            if behaviour.children != children:
+                return False
+        return True
+
+    def _open(self, root: py_trees.behaviour.Behaviour):
+        self.close()
+        behaviours = list(root.iterate())
+        indices = {behaviour.id: index for index, behaviour in enumerate(behaviours)}
+        header = json.dumps({
+            'segment': self.segment_index,
+            'started': self.now(),
+            'behaviours': [
+                {
+                    'id': str(behaviour.id),
+                    'name': behaviour.name,
+                    'class_name': type(behaviour).__module__ + "." + type(behaviour).__qualname__,
+                    'parent': indices[behaviour.parent.id] if behaviour.parent is not None and behaviour.parent.id in indices else -1,
+                }
+                for behaviour in behaviours
+            ]
+        }).encode('utf-8')
+        path = segment_path(self.directory, self.segment_index)
+        self.file = open(path, "w+b")
+        self.file.truncate(self.segment_size)
+        self.mmap = mmap.mmap(self.file.fileno(), self.segment_size)
+        prefix = MAGIC + _header_length.pack(len(header)) + header
+        self.mmap[:len(prefix)] = prefix
+        self.offset = len(prefix)
+        self.segment_index += 1
+        self.root = root
+        self.behaviours = behaviours
+        self.shapes = [
+            (behaviour, list(behaviour.children))
+            for behaviour in behaviours
+            if behaviour.children or isinstance(behaviour, py_trees.composites.Composite)
+        ]
+        self.strings = {}
+        self.last_statuses = [None] * len(behaviours)
+        self.last_messages = [None] * len(behaviours)
+        self.versions = {}
+        for stale in segment_paths(self.directory)[:-self.max_segments]:
+            os.remove(stale)
+
+    def _intern(self, text: str, chunks: typing.List[bytes]) -> int:
+        string_id = self.strings.get(text, None)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings[text] = string_id
+            encoded = text.encode('utf-8')[:0xFFFF]
+            chunks.append(_string.pack(STRING, string_id, len(encoded)))
+            chunks.append(encoded)
+        return string_id
+
+    def _encode(self, count: int, stamp: float) -> bytes:
+        strings = []
+        entries = []
+        last_statuses = self.last_statuses
+        last_messages = self.last_messages
+        for index, behaviour in enumerate(self.behaviours):
+            if behaviour.status is not last_statuses[index] or behaviour.feedback_message != last_messages[index]:
+                last_statuses[index] = behaviour.status
+                last_messages[index] = behaviour.feedback_message
+                entries.append(_behaviour.pack(
+                    index,
+                    _status_codes.get(behaviour.status, 0),
+                    self._intern(behaviour.feedback_message, strings)
+                ))
+        keys = []
+        for key, version in self.storage.versions.items():
+            if self.versions.get(key, None) != version:
+                self.versions[key] = version
+                value = self.storage.get(key, _missing)
+                keys.append(_key.pack(
+                    self._intern(key, strings),
+                    DELETED if value is _missing else self._intern(repr(value)[:self.max_value_length], strings)
+                ))
+        return b"".join(strings + [_tick.pack(TICK, count, stamp, len(entries), len(keys))] + entries + keys)
+
+##############################################################################
+# Reader
+##############################################################################
+
+TickRecord = collections.namedtuple('TickRecord', ['tick', 'stamp', 'behaviours', 'blackboard'])
+TickRecord.__doc__ = """
+A recorded tick, with strings resolved: behaviours is a list of (index, status,
+feedback message) and blackboard a list of (key, value representation or None if deleted).
+"""
+
+
+class Segment(object):
+    """
+    Read-only, memory-mapped view of a segment.
+
+    Args:
+        path: path to the segment file
+
+    Raises:
+        ValueError: if it isn't a segment file
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else b""
+        if self.mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a tick log segment [{}]".format(path))
+        (length,) = _header_length.unpack_from(self.mmap, len(MAGIC))
+        start = len(MAGIC) + _header_length.size
+        self.header = json.loads(bytes(self.mmap[start:start + length]).decode('utf-8'))
+        self.behaviours = self.header['behaviours']
+        self.records_offset = start + length
+
+    def records(self) -> typing.Iterator[typing.Tuple]:
+        """
+        Iterate over the raw records, without resolving strings.
+
+        Yields:
+            (:data:`STRING`, string id, offset, length) or (:data:`TICK`, tick, stamp,
+            [(index, status code, string id)], [(key string id, value string id)]), in order
+        """
+        data = self.mmap
+        size = len(data)
+        offset = self.records_offset
+        while offset < size:
+            record_type = data[offset]
+            if record_type == STRING:
+                unused_type, string_id, length = _string.unpack_from(data, offset)
+                offset += _string.size
+                yield (STRING, string_id, offset, length)
+                offset += length
+            elif record_type == TICK:
+                unused_type, tick, stamp, behaviour_count, key_count = _tick.unpack_from(data, offset)
+                offset += _tick.size
+                end = offset + behaviour_count * _behaviour.size
+                behaviours = list(_behaviour.iter_unpack(data[offset:end]))
+                offset = end
+                end = offset + key_count * _key.size
+                keys = list(_key.iter_unpack(data[offset:end]))
+                offset = end
+                yield (TICK, tick, stamp, behaviours, keys)
+            else:
+                return
+
+    def string(self, offset: int, length: int) -> str:
+        """
+        Decode a string record's payload.
+
+        Args:
+            offset: offset of the payload, as yielded by :meth:`records`
+            length: length of the payload
+
+        Returns:
+            the string
+        """
+        return bytes(self.mmap[offset:offset + length]).decode('utf-8', errors='replace')
+
+    def ticks(self) -> typing.Iterator[TickRecord]:
+        """
+        Iterate over the recorded ticks.
+
+        Yields:
+            the ticks, in order
+        """
+        strings = []
+        for record in self.records():
+            if record[0] == STRING:
+                strings.append(self.string(record[2], record[3]))
+            else:
+                unused_type, tick, stamp, behaviours, keys = record
+                yield TickRecord(
+                    tick,
+                    stamp,
+                    [(index, statuses[code], strings[string_id]) for index, code, string_id in behaviours],
+                    [(strings[key_id], None if value_id == DELETED else strings[value_id]) for key_id, value_id in keys]
+                )
+
+    def close(self):
+        """
+        Release the memory map.
+        """
+        if isinstance(self.mmap, mmap.mmap):
+            self.mmap.close()
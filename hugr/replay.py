@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Offline replay and queries over recorded tick logs (refer to :mod:`hugr.recorder`).
+
+A :class:`TickLog` memory-maps the segments in a directory and indexes them
+in a single pass: the tick numbers and stamps, and for every behaviour and
+blackboard key, the ticks at which it changed. Strings (feedback messages,
+blackboard values) stay in the segments until they're needed. Queries then
+bisect the index rather than replaying the log.
+
+.. code-block:: bash
+
+   $ hugr-replay /var/log/hugr/ticks
+   $ hugr-replay /var/log/hugr/ticks status "Battery Low?" RUNNING
+   $ hugr-replay /var/log/hugr/ticks activations Rotate
+   $ hugr-replay /var/log/hugr/ticks show --tick 1234 --blackboard
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import argparse
+import array
+import bisect
+import collections
+import sys
+import typing
+
+import py_trees
+import py_trees.console as console
+
+from . import recorder
+
+##############################################################################
+# Results
+##############################################################################
+
+Interval = collections.namedtuple('Interval', ['start', 'end', 'start_stamp', 'end_stamp'])
+Interval.__doc__ = """
+A run of consecutive ticks (start and end inclusive) and their wall clock stamps.
+"""
+
+Activation = collections.namedtuple('Activation', ['start', 'end', 'duration', 'outcome'])
+Activation.__doc__ = """
+A run of :data:`~py_trees.common.Status.RUNNING`, from the tick it started running
+to the tick it stopped (None if it never did before the log ended), its duration (s)
+and the status it stopped with (None if it never did).
+"""
+
+BehaviourState = collections.namedtuple('BehaviourState', ['name', 'class_name', 'depth', 'status', 'feedback_message'])
+BehaviourState.__doc__ = """
+A behaviour's state after a tick, with its depth in the tree.
+"""
+
+##############################################################################
+# Index
+##############################################################################
+
+
+class _Timeline(object):
+    """
+    Ticks at which a behaviour (or blackboard key) changed, and what it changed to.
+    """
+    __slots__ = ('ticks', 'codes', 'strings', 'last')
+
+    def __init__(self):
+        self.ticks = array.array('q')
+        self.codes = array.array('B')
+        self.strings = array.array('q')
+        self.last = -1
+
+    def at(self, tick: int) -> int:
+        """Position of the change in effect at this tick, -1 if none yet."""
+        return bisect.bisect_right(self.ticks, tick) - 1
+
+
+class TickLog(object):
+    """
+    Memory-mapped, indexed view of a directory of tick log segments.
+
+    Tick counts restart with each run of a tree, so segments are grouped
+    into runs (a run ends where the tick count stops increasing) and a log
+    covers one of them.
+
+    Args:
+        directory: directory holding the segments
+        run: index of the run to load (default: the latest)
+
+    Raises:
+        ValueError: if there are no segments, or no such run
+    """
+    def __init__(self, directory: str, run: int=-1):
+        segments = [recorder.Segment(path) for path in recorder.segment_paths(directory)]
+        if not segments:
+            raise ValueError("no tick log segments found [{}]".format(directory))
+        self.runs = []
+        last_first_tick = None
+        for segment in segments:
+            first_tick = next((record[1] for record in segment.records() if record[0] == recorder.TICK), None)
+            if first_tick is None:
+                segment.close()
+                continue
+            if last_first_tick is None or first_tick <= last_first_tick:
+                self.runs.append([])
+            self.runs[-1].append(segment)
+            last_first_tick = first_tick
+        try:
+            self.segments = self.runs[run]
+        except IndexError:
+            for segment in segments:
+                segment.close()
+            raise ValueError("no such run [{}], there are {}".format(run, len(self.runs)))
+        for segment in segments:
+            if segment not in self.segments:
+                segment.close()
+        self._index()
+
+    def _index(self):
+        self.ticks = array.array('q')
+        self.stamps = array.array('d')
+        self.segment_starts = array.array('q')  # position in ticks of each segment's first tick
+        self.string_segments = array.array('H')
+        self.string_offsets = array.array('q')
+        self.string_lengths = array.array('H')
+        self.behaviours = collections.OrderedDict()  # id: header entry
+        self.names = collections.defaultdict(list)  # name: ids
+        self.timelines = {}  # behaviour id: _Timeline
+        self.keys = collections.OrderedDict()  # key: _Timeline
+        for number, segment in enumerate(self.segments):
+            self.segment_starts.append(len(self.ticks))
+            base = len(self.string_offsets)
+            timelines = []
+            for behaviour in segment.behaviours:
+                if behaviour['id'] not in self.behaviours:
+                    self.behaviours[behaviour['id']] = behaviour
+                    self.names[behaviour['name']].append(behaviour['id'])
+                    self.timelines[behaviour['id']] = _Timeline()
+                timelines.append(self.timelines[behaviour['id']])
+            key_names = {}
+            for record in segment.records():
+                if record[0] == recorder.STRING:
+                    self.string_segments.append(number)
+                    self.string_offsets.append(record[2])
+                    self.string_lengths.append(record[3])
+                    continue
+                unused_type, tick, stamp, behaviours, keys = record
+                self.ticks.append(tick)
+                self.stamps.append(stamp)
+                for index, code, string_id in behaviours:
+                    self._append(timelines[index], tick, code, base + string_id)
+                for key_id, value_id in keys:
+                    key = key_names.get(key_id, None)
+                    if key is None:
+                        key = key_names[key_id] = self.string(base + key_id)
+                    timeline = self.keys.get(key, None)
+                    if timeline is None:
+                        timeline = self.keys[key] = _Timeline()
+                    self._append(timeline, tick, 0, -1 if value_id == recorder.DELETED else base + value_id)
+            if len(self.ticks) > self.segment_starts[-1]:
+                for timeline in timelines:
+                    timeline.last = self.ticks[-1]
+
+    def _append(self, timeline: _Timeline, tick: int, code: int, string_id: int):
+        if timeline.ticks and timeline.codes[-1] == code:
+            previous = timeline.strings[-1]
+            if previous == string_id:
+                return
+            # the first tick of each segment records everything, skip repeats
+            if (
+                previous >= 0 and string_id >= 0 and
+                self.string_segments[previous] != self.string_segments[string_id] and
+                self.string(previous) == self.string(string_id)
+            ):
+                return
+        timeline.ticks.append(tick)
+        timeline.codes.append(code)
+        timeline.strings.append(string_id)
+
+    def string(self, string_id: int) -> str:
+        """
+        Resolve an indexed string.
+
+        Args:
+            string_id: index of the string
+
+        Returns:
+            the string
+        """
+        return self.segments[self.string_segments[string_id]].string(
+            self.string_offsets[string_id], self.string_lengths[string_id]
+        )
+
+    def close(self):
+        """
+        Release the segments' memory maps.
+        """
+        for segment in self.segments:
+            segment.close()
+
+    ########################################
+    # Ticks & Time
+    ########################################
+
+    def stamp(self, tick: int) -> float:
+        """
+        Wall clock stamp of a tick.
+
+        Args:
+            tick: the tick count
+
+        Returns:
+            the stamp (s)
+
+        Raises:
+            KeyError: if the tick isn't in the log
+        """
+        position = bisect.bisect_left(self.ticks, tick)
+        if position == len(self.ticks) or self.ticks[position] != tick:
+            raise KeyError("tick {} is not in the log".format(tick))
+        return self.stamps[position]
+
+    def tick_at(self, stamp: float) -> int:
+        """
+        The latest tick at or before a wall clock time.
+
+        Args:
+            stamp: the time (s)
+
+        Returns:
+            the tick count
+
+        Raises:
+            KeyError: if the log starts after this time
+        """
+        position = bisect.bisect_right(self.stamps, stamp) - 1
+        if position < 0:
+            raise KeyError("the log starts after {}".format(stamp))
+        return self.ticks[position]
+
+    ########################################
+    # Behaviours
+    ########################################
+
+    def behaviour_ids(self, name: str) -> typing.List[str]:
+        """
+        Behaviours (ids) with this name. There may be several, e.g. for
+        subtrees that were inserted more than once.
+
+        Args:
+            name: name of the behaviour
+
+        Returns:
+            the ids, in order of appearance
+
+        Raises:
+            KeyError: if there is no such behaviour in the log
+        """
+        if name not in self.names:
+            raise KeyError("no behaviour named '{}' in the log".format(name))
+        return self.names[name]
+
+    def intervals(self, name: str, status: py_trees.common.Status) -> typing.List[Interval]:
+        """
+        Ticks after which the named behaviour(s) had a status.
+
+        Args:
+            name: name of the behaviour
+            status: the status
+
+        Returns:
+            runs of ticks, in order
+
+        Raises:
+            KeyError: if there is no such behaviour in the log
+        """
+        code = recorder.statuses.index(status)
+        intervals = []
+        for behaviour_id in self.behaviour_ids(name):
+            timeline = self.timelines[behaviour_id]
+            for i, j in self._runs(timeline, code):
+                end = self._previous_tick(timeline.ticks[j]) if j < len(timeline.ticks) else timeline.last
+                intervals.append(Interval(timeline.ticks[i], end, self.stamp(timeline.ticks[i]), self.stamp(end)))
+        return sorted(intervals)
+
+    def activations(self, name: str) -> typing.List[Activation]:
+        """
+        Each time the named behaviour(s) ran, from the tick they started
+        running to the tick they stopped.
+
+        Args:
+            name: name of the behaviour
+
+        Returns:
+            the activations, in order
+
+        Raises:
+            KeyError: if there is no such behaviour in the log
+        """
+        running = recorder.statuses.index(py_trees.common.Status.RUNNING)
+        activations = []
+        for behaviour_id in self.behaviour_ids(name):
+            timeline = self.timelines[behaviour_id]
+            for i, j in self._runs(timeline, running):
+                start = timeline.ticks[i]
+                if j < len(timeline.ticks):
+                    end = timeline.ticks[j]
+                    activations.append(Activation(
+                        start, end, self.stamp(end) - self.stamp(start), recorder.statuses[timeline.codes[j]]
+                    ))
+                else:
+                    activations.append(Activation(start, None, self.stamp(timeline.last) - self.stamp(start), None))
+        return sorted(activations, key=lambda activation: activation.start)
+
+    def _runs(self, timeline: _Timeline, code: int) -> typing.Iterator[typing.Tuple[int, int]]:
+        # changes [i, j) with this status code, feedback changes don't break a run
+        codes = timeline.codes
+        i = 0
+        while i < len(codes):
+            if codes[i] != code:
+                i += 1
+                continue
+            j = i + 1
+            while j < len(codes) and codes[j] == code:
+                j += 1
+            yield i, j
+            i = j
+
+    def _previous_tick(self, tick: int) -> int:
+        return self.ticks[bisect.bisect_left(self.ticks, tick) - 1]
+
+    ########################################
+    # State
+    ########################################
+
+    def state(self, tick: int) -> typing.List[BehaviourState]:
+        """
+        The tree as it was after a tick.
+
+        Args:
+            tick: the tick count
+
+        Returns:
+            the behaviours, depth first from the root
+
+        Raises:
+            KeyError: if the tick isn't in the log
+        """
+        self.stamp(tick)  # validate
+        position = bisect.bisect_left(self.ticks, tick)
+        segment = self.segments[bisect.bisect_right(self.segment_starts, position) - 1]
+        behaviours = segment.behaviours
+        children = collections.defaultdict(list)
+        for index, behaviour in enumerate(behaviours):
+            children[behaviour['parent']].append(index)
+        states = []
+        pending = [(index, 0) for index in reversed(children[-1])]
+        while pending:
+            index, depth = pending.pop()
+            behaviour = behaviours[index]
+            timeline = self.timelines[behaviour['id']]
+            i = timeline.at(tick)
+            states.append(BehaviourState(
+                behaviour['name'],
+                behaviour['class_name'],
+                depth,
+                recorder.statuses[timeline.codes[i]] if i >= 0 else py_trees.common.Status.INVALID,
+                self.string(timeline.strings[i]) if i >= 0 else ""
+            ))
+            pending.extend((child, depth + 1) for child in reversed(children[index]))
+        return states
+
+    def blackboard(self, tick: int) -> typing.Dict[str, str]:
+        """
+        The blackboard as it was after a tick.
+
+        Args:
+            tick: the tick count
+
+        Returns:
+            value representations, keyed by variable
+        """
+        variables = {}
+        for key, timeline in self.keys.items():
+            i = timeline.at(tick)
+            if i >= 0 and timeline.strings[i] >= 0:
+                variables[key] = self.string(timeline.strings[i])
+        return variables
+
+    def render(self, tick: int, show_blackboard: bool=False) -> str:
+        """
+        Render the tree as it was after a tick, as unicode art.
+
+        Args:
+            tick: the tick count
+            show_blackboard: append the blackboard
+
+        Returns:
+            the rendering
+
+        Raises:
+            KeyError: if the tick isn't in the log
+        """
+        symbols = py_trees.display.unicode_symbols
+        # memory isn't logged, so composites are drawn as if without it
+        types = {
+            "py_trees.composites.Sequence": symbols["sequence_without_memory"],
+            "py_trees.composites.Selector": symbols["selector_without_memory"],
+            "py_trees.composites.Parallel": symbols["parallel"],
+        }
+        states = self.state(tick)
+        lines = ["[tick {}]".format(tick)]
+        for i, state in enumerate(states):
+            has_children = i + 1 < len(states) and states[i + 1].depth > state.depth
+            symbol = types.get(state.class_name, "[+]" if has_children else symbols["behaviour"])
+            lines.append("{}{} {} [{}]{}".format(
+                "    " * state.depth,
+                symbol,
+                state.name,
+                symbols[state.status],
+                " -- " + state.feedback_message if state.feedback_message else ""
+            ))
+        if show_blackboard:
+            lines.append("")
+            lines.append("Blackboard")
+            for key, value in sorted(self.blackboard(tick).items()):
+                lines.append("    {}: {}".format(key, value))
+        return "\n".join(lines)
+
+##############################################################################
+# Main
+##############################################################################
+
+
+def command_line_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="query recorded tick logs",
+        epilog="And his noodly appendage reached forth to tickle the blessed...\n"
+    )
+    parser.add_argument('directory', help='directory holding the tick log segments')
+    parser.add_argument('-r', '--run', type=int, default=-1, help='run to load (default: the latest)')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('summary', help='ticks, span and behaviours in the log (default)')
+    status_parser = subparsers.add_parser('status', help='ticks after which a behaviour had a status')
+    status_parser.add_argument('name', help='name of the behaviour')
+    status_parser.add_argument('status', choices=[status.name for status in py_trees.common.Status], help='the status')
+    activations_parser = subparsers.add_parser('activations', help='each time a behaviour ran, and for how long')
+    activations_parser.add_argument('name', help='name of the behaviour')
+    show_parser = subparsers.add_parser('show', help='render the tree after a tick')
+    group = show_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-t', '--tick', type=int, help='tick count')
+    group.add_argument('-s', '--stamp', type=float, help='wall clock time (s), the latest tick at or before it is shown')
+    show_parser.add_argument('-b', '--blackboard', action='store_true', default=False, help='show the blackboard too')
+    return parser
+
+
+def main():
+    """
+    Entry point for the tick log query tool.
+    """
+    args = command_line_argument_parser().parse_args()
+    try:
+        log = TickLog(args.directory, run=args.run)
+    except (OSError, ValueError) as e:
+        console.logerror(str(e))
+        sys.exit(1)
+    try:
+        if args.command == 'status':
+            intervals = log.intervals(args.name, py_trees.common.Status[args.status])
+            for interval in intervals:
+                print("ticks {}-{} ({} ticks, {:.3f}s)".format(
+                    interval.start, interval.end, interval.end - interval.start + 1,
+                    interval.end_stamp - interval.start_stamp
+                ))
+            print("{} intervals, {} ticks".format(
+                len(intervals), sum(interval.end - interval.start + 1 for interval in intervals)
+            ))
+        elif args.command == 'activations':
+            activations = log.activations(args.name)
+            for activation in activations:
+                print("ticks {}-{} {:.3f}s {}".format(
+                    activation.start,
+                    activation.end if activation.end is not None else "...",
+                    activation.duration,
+                    activation.outcome.name if activation.outcome is not None else "(still running)"
+                ))
+            durations = [activation.duration for activation in activations if activation.outcome is not None]
+            if durations:
+                print("{} activations, mean {:.3f}s, max {:.3f}s".format(
+                    len(activations), sum(durations) / len(durations), max(durations)
+                ))
+        elif args.command == 'show':
+            tick = args.tick if args.tick is not None else log.tick_at(args.stamp)
+            print(log.render(tick, show_blackboard=args.blackboard))
+        else:
+            print("runs      : {}".format(len(log.runs)))
+            print("segments  : {}".format(len(log.segments)))
+            print("ticks     : {}-{} ({})".format(log.ticks[0], log.ticks[-1], len(log.ticks)))
+            print("span      : {:.3f}s".format(log.stamps[-1] - log.stamps[0]))
+            print("behaviours: {}".format(", ".join(log.names.keys())))
+    except KeyError as e:
+        console.logerror(e.args[0])
+        sys.exit(1)
+    finally:
+        log.close()
@@ -168,16 +168,20 @@ Running
 import operator
 import sys
 
-import launch
-import launch_ros
 import py_trees
 import py_trees_ros.trees
 import py_trees.console as console
 import py_trees_ros_interfaces.action as py_trees_actions  # noqa
 import rclpy
+import rclpy.executors
 
+from . import battery
 from . import behaviours
+from . import composites
+from . import decorators
+from . import trees
 from . import mock
+from . import subscribers
 
 ##############################################################################
 # Launcher
@@ -191,6 +195,9 @@ def generate_launch_description():
     Returns:
         the launch description
     """
+    import launch
+    import launch_ros
+
     return launch.LaunchDescription(
         mock.launch.generate_launch_nodes() +
         [
@@ -224,20 +231,20 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         )
     )
 
-    topics2bb = py_trees.composites.Sequence(name="Topics2BB", memory=True)
-    scan2bb = py_trees_ros.subscribers.EventToBlackboard(
+    topics2bb = composites.DataGathering(name="Topics2BB")
+    scan2bb = subscribers.EventQueueToBlackboard(
         name="Scan2BB",
         topic_name="/dashboard/scan",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
         variable_name="event_scan_button"
     )
-    cancel2bb = py_trees_ros.subscribers.EventToBlackboard(
+    cancel2bb = subscribers.EventQueueToBlackboard(
         name="Cancel2BB",
         topic_name="/dashboard/cancel",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
         variable_name="event_cancel_button"
     )
-    battery2bb = py_trees_ros.battery.ToBlackboard(
+    battery2bb = battery.ToBlackboard(
         name="Battery2BB",
         topic_name="/battery/state",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
@@ -253,7 +260,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     def check_battery_low_on_blackboard(blackboard: py_trees.blackboard.Blackboard) -> bool:
         return blackboard.battery_low_warning
 
-    battery_emergency = py_trees.decorators.EternalGuard(
+    battery_emergency = decorators.EternalGuard(
         name="Battery Low?",
         condition=check_battery_low_on_blackboard,
         blackboard_keys={"battery_low_warning"},
@@ -261,7 +268,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     )
     # Worker Tasks
     scan = py_trees.composites.Sequence(name="Scan", memory=True)
-    is_scan_requested = py_trees.behaviours.CheckBlackboardVariableValue(
+    is_scan_requested = behaviours.CheckBlackboardVariableValue(
         name="Scan?",
         check=py_trees.common.ComparisonExpression(
             variable="event_scan_button",
@@ -276,7 +283,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
     failed_flash_green = behaviours.FlashLedStrip(name="Flash Red", colour="red")
-    failed_pause = py_trees.timers.Timer("Pause", duration=3.0)
+    failed_pause = behaviours.Timer("Pause", duration=3.0)
     result_failed_to_bb = py_trees.behaviours.SetBlackboardVariable(
         name="Result2BB\n'failed'",
         variable_name='scan_result',
@@ -284,7 +291,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         overwrite=True
     )
     ere_we_go = py_trees.composites.Sequence(name="Ere we Go", memory=True)
-    undock = py_trees_ros.actions.ActionClient(
+    undock = behaviours.ActionClient(
         name="UnDock",
         action_type=py_trees_actions.Dock,
         action_name="dock",
@@ -293,7 +300,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     )
     scan_or_be_cancelled = py_trees.composites.Selector(name="Scan or Be Cancelled", memory=False)
     cancelling = py_trees.composites.Sequence(name="Cancelling?", memory=True)
-    is_cancel_requested = py_trees.behaviours.CheckBlackboardVariableValue(
+    is_cancel_requested = behaviours.CheckBlackboardVariableValue(
         name="Cancel?",
         check=py_trees.common.ComparisonExpression(
             variable="event_cancel_button",
@@ -301,7 +308,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
             operator=operator.eq
         )
     )
-    move_home_after_cancel = py_trees_ros.actions.ActionClient(
+    move_home_after_cancel = behaviours.ActionClient(
         name="Move Home",
         action_type=py_trees_actions.MoveBase,
         action_name="move_base",
@@ -315,7 +322,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         overwrite=True
     )
     move_out_and_scan = py_trees.composites.Sequence(name="Move Out and Scan", memory=True)
-    move_base = py_trees_ros.actions.ActionClient(
+    move_base = behaviours.ActionClient(
         name="Move Out",
         action_type=py_trees_actions.MoveBase,
         action_name="move_base",
@@ -327,7 +334,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
     scan_context_switch = behaviours.ScanContext("Context Switch")
-    scan_rotate = py_trees_ros.actions.ActionClient(
+    scan_rotate = behaviours.ActionClient(
         name="Rotate",
         action_type=py_trees_actions.Rotate,
         action_name="rotate",
@@ -335,7 +342,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         generate_feedback_message=lambda msg: "{:.2f}%%".format(msg.feedback.percentage_completed)
     )
     scan_flash_blue = behaviours.FlashLedStrip(name="Flash Blue", colour="blue")
-    move_home_after_scan = py_trees_ros.actions.ActionClient(
+    move_home_after_scan = behaviours.ActionClient(
         name="Move Home",
         action_type=py_trees_actions.MoveBase,
         action_name="move_base",
@@ -353,8 +360,8 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         policy=py_trees.common.ParallelPolicy.SuccessOnOne()
     )
     celebrate_flash_green = behaviours.FlashLedStrip(name="Flash Green", colour="green")
-    celebrate_pause = py_trees.timers.Timer("Pause", duration=3.0)
-    dock = py_trees_ros.actions.ActionClient(
+    celebrate_pause = behaviours.Timer("Pause", duration=3.0)
+    dock = behaviours.ActionClient(
         name="Dock",
         action_type=py_trees_actions.Dock,
         action_name="dock",
@@ -407,9 +414,11 @@ def tutorial_main():
     """
     rclpy.init(args=None)
     root = tutorial_create_root()
-    tree = py_trees_ros.trees.BehaviourTree(
+    tree = trees.BehaviourTree(
         root=root,
-        unicode_tree_debug=True
+        unicode_tree_debug=True,
+        concurrent_setup=True,  # wait on the dock, move base, rotate and context servers together
+        compiled=True
     )
     try:
         tree.setup(timeout=15)
@@ -427,10 +436,14 @@ def tutorial_main():
 
     tree.tick_tock(period_ms=1000.0)
 
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    executor.add_node(tree.node)
+
     try:
-        rclpy.spin(tree.node)
+        executor.spin()
     except (KeyboardInterrupt, rclpy.executors.ExternalShutdownException):
         pass
     finally:
         tree.shutdown()
+        executor.shutdown()
         rclpy.try_shutdown()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Delta encoded tree snapshots.
+
+Full snapshots grow with the tree, whether or not anything in it changed.
+Here, a full snapshot (keyframe) is only sent periodically, or whenever
+the tree's shape has changed. Otherwise, only behaviours whose status,
+feedback message, tip or activity changed since the last snapshot are sent
+(a delta, empty if nothing changed). Bandwidth and serialisation then scale
+with the rate of change rather than the size of the tree.
+
+Both are :class:`py_trees_ros_interfaces.msg.BehaviourTree` messages,
+published on separate topics, one per tick. The tick count in the statistics
+orders them, so a lost delta shows up as a gap in the count. On the
+receiving end, a :class:`Reconstructor` applies deltas to the last keyframe
+to recover full snapshots, e.g. via the relay:
+
+.. code-block:: bash
+
+   $ hugr-snapshot-relay --tree /tree
+   $ ros2 topic echo /snapshot_relay/snapshots
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import argparse
+import collections
+import sys
+import typing
+
+import py_trees
+import py_trees.console as console
+import py_trees_ros
+import py_trees_ros_interfaces.msg as py_trees_msgs  # noqa
+import rclpy
+import rclpy.executors
+import rclpy.node
+import rclpy.utilities
+
+##############################################################################
+# Encoding
+##############################################################################
+
+
+class DeltaEncoder(object):
+    """
+    Decides, after each tick, which behaviours need to be sent.
+
+    Args:
+        keyframe_period: maximum time (s) between keyframes
+    """
+    def __init__(self, keyframe_period: float=5.0):
+        self.keyframe_period = keyframe_period
+        self.visitor = py_trees.visitors.SnapshotVisitor()
+        self.shape = None
+        self.last_keyframe = None
+        self.states = {}
+
+    def encode(
+            self,
+            root: py_trees.behaviour.Behaviour,
+            now: float
+    ) -> typing.Tuple[bool, typing.List[py_trees.behaviour.Behaviour]]:
+        """
+        Find the behaviours that changed since the last call. The encoder's
+        visitor must have been run over the tree for this tick.
+
+        Args:
+            root: root of the tree
+            now: current time (s)
+
+        Returns:
+            whether this is a keyframe, and the behaviours to send
+        """
+        behaviours = list(root.iterate())
+        shape = [behaviour.id for behaviour in behaviours]
+        keyframe = (
+            shape != self.shape or
+            self.last_keyframe is None or
+            now - self.last_keyframe >= self.keyframe_period
+        )
+        states = {behaviour.id: self._state(behaviour) for behaviour in behaviours}
+        if keyframe:
+            self.shape = shape
+            self.last_keyframe = now
+            changed = behaviours
+        else:
+            changed = [behaviour for behaviour in behaviours if states[behaviour.id] != self.states[behaviour.id]]
+        self.states = states
+        return keyframe, changed
+
+    def _state(self, behaviour: py_trees.behaviour.Behaviour) -> typing.Tuple[typing.Any, ...]:
+        tip = behaviour.tip()
+        return (
+            behaviour.status,
+            behaviour.feedback_message,
+            tip.id if tip is not None else None,
+            behaviour.id in self.visitor.visited,
+        )
+
+    def to_msg(self, behaviour: py_trees.behaviour.Behaviour) -> py_trees_msgs.Behaviour:
+        """
+        Convert a behaviour to a message, flagging it if it was visited this tick.
+
+        Args:
+            behaviour: the behaviour to convert
+
+        Returns:
+            the behaviour message
+        """
+        msg = py_trees_ros.conversions.behaviour_to_msg(behaviour)
+        msg.is_active = behaviour.id in self.visitor.visited
+        return msg
+
+    def to_tree_msg(
+            self,
+            behaviours: typing.List[py_trees.behaviour.Behaviour],
+            count: int
+    ) -> py_trees_msgs.BehaviourTree:
+        """
+        Convert behaviours to a keyframe or delta message.
+
+        Args:
+            behaviours: the behaviours to send
+            count: the tree's tick count
+
+        Returns:
+            the snapshot message (unstamped)
+        """
+        msg = py_trees_msgs.BehaviourTree()
+        msg.behaviours = [self.to_msg(behaviour) for behaviour in behaviours]
+        msg.changed = True
+        msg.statistics.count = count
+        return msg
+
+
+class DeltaSnapshotStream(object):
+    """
+    Publishes keyframes and deltas of a tree after each tick. Add its
+    :attr:`visitor` to the tree's visitors and call :meth:`publish` from a
+    post tick handler.
+
+    Publishers:
+        * **~/snapshots/keyframe** (:class:`py_trees_ros_interfaces.msg.BehaviourTree`)
+
+          * every behaviour, periodically or when the tree's shape changes
+
+        * **~/snapshots/delta** (:class:`py_trees_ros_interfaces.msg.BehaviourTree`)
+
+          * behaviours that changed since the last snapshot (empty if none did), on every other tick
+
+    Args:
+        node: node to publish from
+        keyframe_period: maximum time (s) between keyframes
+    """
+    def __init__(self, node: rclpy.node.Node, keyframe_period: float=5.0):
+        self.node = node
+        self.encoder = DeltaEncoder(keyframe_period=keyframe_period)
+        self.visitor = self.encoder.visitor
+        self.keyframe_publisher = node.create_publisher(
+            msg_type=py_trees_msgs.BehaviourTree,
+            topic="~/snapshots/keyframe",
+            qos_profile=py_trees_ros.utilities.qos_profile_latched()
+        )
+        self.delta_publisher = node.create_publisher(
+            msg_type=py_trees_msgs.BehaviourTree,
+            topic="~/snapshots/delta",
+            qos_profile=10
+        )
+
+    def publish(self, root: py_trees.behaviour.Behaviour, count: int):
+        """
+        Publish a keyframe or delta. Deltas are published even if nothing
+        changed, so that receivers can detect lost deltas.
+
+        Args:
+            root: root of the tree
+            count: the tree's tick count
+        """
+        now = self.node.get_clock().now()
+        keyframe, changed = self.encoder.encode(root, now.nanoseconds / 1e9)
+        msg = self.encoder.to_tree_msg(changed, count)
+        msg.statistics.stamp = now.to_msg()
+        if keyframe:
+            self.keyframe_publisher.publish(msg)
+        else:
+            self.delta_publisher.publish(msg)
+
+    def shutdown(self):
+        """
+        Cleanup the publishers.
+        """
+        for publisher in [self.keyframe_publisher, self.delta_publisher]:
+            self.node.destroy_publisher(publisher)
+
+##############################################################################
+# Decoding
+##############################################################################
+
+
+def _key(msg: py_trees_msgs.Behaviour) -> bytes:
+    return bytes(msg.own_id.uuid)
+
+
+class Reconstructor(object):
+    """
+    Recovers full snapshots from keyframes and deltas. Deltas that aren't
+    for the tick immediately after the last applied snapshot's (i.e. one
+    was lost), or that refer to behaviours missing from the last keyframe,
+    are rejected. So are all deltas after them, until the next keyframe
+    resynchronises.
+    """
+    def __init__(self):
+        self.behaviours = collections.OrderedDict()
+        self.count = None
+        self.synchronised = False
+        self.rejected = 0
+
+    def apply(self, msg: py_trees_msgs.BehaviourTree, keyframe: bool) -> bool:
+        """
+        Apply a keyframe or delta.
+
+        Args:
+            msg: the keyframe or delta
+            keyframe: whether it's a keyframe
+
+        Returns:
+            whether it was applied
+        """
+        if keyframe:
+            self.behaviours = collections.OrderedDict((_key(behaviour), behaviour) for behaviour in msg.behaviours)
+            self.count = msg.statistics.count
+            self.synchronised = True
+            return True
+        if (
+            not self.synchronised or
+            msg.statistics.count != self.count + 1 or
+            any(_key(behaviour) not in self.behaviours for behaviour in msg.behaviours)
+        ):
+            self.synchronised = False
+            self.rejected += 1
+            return False
+        for behaviour in msg.behaviours:
+            self.behaviours[_key(behaviour)] = behaviour
+        self.count = msg.statistics.count
+        return True
+
+    def snapshot(self) -> typing.Optional[py_trees_msgs.BehaviourTree]:
+        """
+        The full snapshot, as of the last applied keyframe or delta.
+
+        Returns:
+            the snapshot, or None if no keyframe has arrived yet
+        """
+        if self.count is None:
+            return None
+        msg = py_trees_msgs.BehaviourTree()
+        msg.behaviours = list(self.behaviours.values())
+        msg.changed = True
+        msg.statistics.count = self.count
+        return msg
+
+##############################################################################
+# Relay
+##############################################################################
+
+
+def command_line_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Reconstruct full tree snapshots from keyframes and deltas and republish them",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--tree', default="/tree", help="fully qualified name of the tree's node")
+    return parser
+
+
+def relay_main():
+    """
+    Entry point for the snapshot relay.
+    """
+    args = command_line_argument_parser().parse_args(rclpy.utilities.remove_ros_args(args=sys.argv)[1:])
+    rclpy.init()  # picks up sys.argv automagically internally
+    node = rclpy.create_node("snapshot_relay")
+    reconstructor = Reconstructor()
+    publisher = node.create_publisher(
+        msg_type=py_trees_msgs.BehaviourTree,
+        topic="~/snapshots",
+        qos_profile=py_trees_ros.utilities.qos_profile_latched()
+    )
+
+    def callback(msg, keyframe):
+        synchronised = reconstructor.synchronised
+        if reconstructor.apply(msg, keyframe=keyframe):
+            publisher.publish(reconstructor.snapshot())
+        elif synchronised:
+            node.get_logger().warning("lost a delta at tick {}, waiting on the next keyframe".format(msg.statistics.count))
+
+    for name, keyframe in [("keyframe", True), ("delta", False)]:
+        node.create_subscription(
+            msg_type=py_trees_msgs.BehaviourTree,
+            topic=args.tree + "/snapshots/" + name,
+            callback=lambda msg, keyframe=keyframe: callback(msg, keyframe),
+            qos_profile=py_trees_ros.utilities.qos_profile_latched() if keyframe else 10
+        )
+    try:
+        rclpy.spin(node)
+    except (KeyboardInterrupt, rclpy.executors.ExternalShutdownException):
+        pass
+    finally:
+        if reconstructor.rejected:
+            console.logwarn("rejected {} deltas while waiting on keyframes".format(reconstructor.rejected))
+        node.destroy_node()
+        rclpy.try_shutdown()
@@ -0,0 +1,143 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Subscriber behaviours for the tutorials.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import collections
+import itertools
+import typing
+
+import py_trees
+import py_trees_ros
+import rclpy.qos
+import std_msgs.msg as std_msgs
+
+##############################################################################
+# Events
+##############################################################################
+
+# shared by all event queues, so events on different topics can be ordered
+_sequence = itertools.count(1)
+
+
+class EventQueueToBlackboard(py_trees_ros.subscribers.Handler):
+    """
+    An alternative to :class:`py_trees_ros.subscribers.EventToBlackboard`
+    that doesn't collapse a burst of events arriving between ticks into a
+    single flag. Events are queued (oldest first) as they arrive and consumed
+    a few at a time on each tick.
+
+    Each event is stamped with a sequence number, drawn from a counter
+    shared by all event queues, and its arrival time. When several topics
+    have events consumed on the same tick, comparing sequence numbers
+    recovers the order in which they arrived.
+
+    Blackboard Variables:
+        * <variable_name> (:obj:`bool`)[w]: whether any events were consumed this tick
+        * <variable_name>_sequence (:obj:`int`)[w]: sequence number of the last consumed event (zero until there is one)
+        * <variable_name>_queue (:obj:`tuple`)[w]: (sequence, arrival time (s)) of events still queued, oldest first
+        * <variable_name>_dropped (:obj:`int`)[w]: number of events dropped so far, because the queue was full
+
+    Variables are only written when they change, so guards and checks
+    watching them stay quiet while the topic is (refer to :mod:`hugr.blackboard`).
+
+    Args:
+        name: name of the behaviour
+        topic_name: name of the topic to connect to
+        qos_profile: qos profile for the subscriber
+        variable_name: name of the blackboard variable and prefix for the others
+        maxlen: maximum number of queued events, the oldest are dropped beyond this
+        events_per_tick: number of events to consume each tick (None to consume all)
+
+    Raises:
+        ValueError: if maxlen or events_per_tick aren't positive
+    """
+    def __init__(self,
+                 name: str,
+                 topic_name: str,
+                 qos_profile: rclpy.qos.QoSProfile,
+                 variable_name: str,
+                 maxlen: int=10,
+                 events_per_tick: typing.Optional[int]=1
+                 ):
+        if maxlen < 1:
+            raise ValueError("maxlen must be positive [{}]".format(maxlen))
+        if events_per_tick is not None and events_per_tick < 1:
+            raise ValueError("events_per_tick must be positive or None [{}]".format(events_per_tick))
+        super().__init__(
+            name=name,
+            topic_name=topic_name,
+            topic_type=std_msgs.Empty,
+            qos_profile=qos_profile,
+            clearing_policy=py_trees.common.ClearingPolicy.NEVER
+        )
+        self.variable_name = variable_name
+        self.maxlen = maxlen
+        self.events_per_tick = events_per_tick
+        self.events = collections.deque()
+        self.dropped = 0
+        self.consumed = ()
+        self.keys = {
+            'event': variable_name,
+            'sequence': variable_name + "_sequence",
+            'queue': variable_name + "_queue",
+            'dropped': variable_name + "_dropped",
+        }
+        self.blackboard = self.attach_blackboard_client(name=self.name)
+        for key in self.keys.values():
+            self.blackboard.register_key(key=key, access=py_trees.common.Access.WRITE)
+        self.written = {}
+
+    def _callback(self, msg: std_msgs.Empty):
+        """
+        Queue the event, dropping the oldest if the queue is full.
+
+        Args:
+            msg: the incoming event
+        """
+        stamp = self.node.get_clock().now().nanoseconds / 1e9
+        with self.data_guard:
+            if len(self.events) >= self.maxlen:
+                self.events.popleft()
+                self.dropped += 1
+            self.events.append((next(_sequence), stamp))
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Consume the oldest events and write the results to the blackboard.
+
+        Returns:
+            :data:`~py_trees.common.Status.SUCCESS`
+        """
+        self.logger.debug("%s.update()" % self.__class__.__name__)
+        with self.data_guard:
+            count = len(self.events) if self.events_per_tick is None else min(self.events_per_tick, len(self.events))
+            self.consumed = tuple(self.events.popleft() for unused_i in range(count))
+            queue = tuple(self.events)
+            dropped = self.dropped
+        self._write('event', bool(self.consumed))
+        if self.consumed:
+            self._write('sequence', self.consumed[-1][0])
+        elif 'sequence' not in self.written:
+            self._write('sequence', 0)
+        self._write('queue', queue)
+        self._write('dropped', dropped)
+        self.feedback_message = "consumed {}, {} queued".format(len(self.consumed), len(queue))
+        return py_trees.common.Status.SUCCESS
+
+    def _write(self, key: str, value: typing.Any):
+        if key in self.written and self.written[key] == value:
+            return
+        self.blackboard.set(self.keys[key], value)
+        self.written[key] = value
@@ -0,0 +1,349 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Span tracing of behaviour activations and action goals, exported in the
+Chrome trace event format (load in ``chrome://tracing`` or https://ui.perfetto.dev).
+
+* **Behaviour activations** (category ``behaviour``): one span per behaviour
+  (each on its own track, in tree order) from the start of the tick in which
+  it was first ticked, to the end of the tick in which it finished
+  or was interrupted. Recorded by an :class:`ActivationTracer`.
+* **Ticks** (category ``tick``): one span per tick, on the first track.
+* **Action goals** (category ``action``): async spans from when the goal
+  was sent until its result arrived, marked with when it was accepted (or
+  rejected) and when feedback arrived. Recorded by
+  :class:`hugr.behaviours.ActionClient`.
+
+Tracing is off until the shared :class:`Tracer` is enabled, e.g. by a
+:class:`hugr.trees.BehaviourTree` with a trace file (``HUGR_TRACE_FILE``).
+Until then, recording costs a single check.
+
+.. code-block:: bash
+
+   $ HUGR_TRACE_FILE=/tmp/scan.json tree-dynamic-application-loading
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import collections
+import itertools
+import json
+import os
+import threading
+import time
+import typing
+
+import py_trees
+
+##############################################################################
+# Tracer
+##############################################################################
+
+
+class Tracer(object):
+    """
+    Collects trace events, safe to use from any thread. The oldest events
+    are discarded beyond a limit, so it can be left on for long runs.
+
+    Args:
+        max_events: events kept, beyond which the oldest are discarded
+        now: wall clock time source (s)
+    """
+    def __init__(self, max_events: int=1000000, now: typing.Callable[[], float]=time.time):
+        self.now = now
+        self.enabled = False
+        self.pid = os.getpid()
+        self.events = collections.deque(maxlen=max_events)
+        self.metadata = []  # track names, kept as long as their tracks
+        self.tracks = {}  # key: track id
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def enable(self):
+        """
+        Start recording.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop recording, events recorded so far are kept.
+        """
+        self.enabled = False
+
+    def clear(self):
+        """
+        Discard all events and tracks.
+        """
+        with self.lock:
+            self.events.clear()
+            self.metadata = []
+            self.tracks = {}
+
+    def track(self, key: typing.Hashable, name: str) -> int:
+        """
+        The track (a thread, in the trace format) for a key, created on first use.
+        Tracks are displayed in the order they were created.
+
+        Args:
+            key: identifies the track, e.g. a behaviour's path in the tree
+            name: name to display for the track (only used on creation)
+
+        Returns:
+            the track id
+        """
+        with self.lock:
+            tid = self.tracks.get(key, None)
+            if tid is None:
+                tid = self.tracks[key] = len(self.tracks) + 1
+                self.metadata.append({'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid, 'args': {'name': name}})
+                self.metadata.append({'ph': 'M', 'name': 'thread_sort_index', 'pid': self.pid, 'tid': tid, 'args': {'sort_index': tid}})
+        return tid
+
+    def next_id(self) -> int:
+        """
+        A unique id, e.g. to tie the events of an async span together.
+        """
+        return next(self.ids)
+
+    def complete(
+            self,
+            name: str,
+            category: str,
+            start: float,
+            end: float,
+            tid: int,
+            args: typing.Dict[str, typing.Any]=None
+    ):
+        """
+        Record a span on a track.
+
+        Args:
+            name: name of the span
+            category: category of the span
+            start: start time (s)
+            end: end time (s)
+            tid: the track (refer to :meth:`track`)
+            args: details displayed with the span
+        """
+        if not self.enabled:
+            return
+        self.events.append({
+            'ph': 'X', 'name': name, 'cat': category, 'pid': self.pid, 'tid': tid,
+            'ts': start * 1e6, 'dur': max(0.0, end - start) * 1e6, 'args': args or {}
+        })
+
+    def async_event(
+            self,
+            phase: str,
+            name: str,
+            category: str,
+            span_id: int,
+            stamp: float=None,
+            args: typing.Dict[str, typing.Any]=None
+    ):
+        """
+        Record the beginning ('b'), end ('e') or a mark ('n') of an async span,
+        i.e. one that may begin and end on different threads.
+
+        Args:
+            phase: one of 'b', 'e' or 'n'
+            name: name of the span (or mark)
+            category: category of the span, with the id, ties its events together
+            span_id: ties the span's events together (refer to :meth:`next_id`)
+            stamp: time (s) of the event (default: now)
+            args: details displayed with the event
+        """
+        if not self.enabled:
+            return
+        self.events.append({
+            'ph': phase, 'name': name, 'cat': category, 'pid': self.pid, 'tid': 0, 'id': span_id,
+            'ts': (stamp if stamp is not None else self.now()) * 1e6, 'args': args or {}
+        })
+
+    def trace(self) -> typing.Dict[str, typing.Any]:
+        """
+        The trace, in the Chrome trace event format.
+
+        Returns:
+            the trace, ready to serialise to json
+        """
+        with self.lock:
+            events = self.metadata + list(self.events)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path: str):
+        """
+        Write the trace to a json file.
+
+        Args:
+            path: the file
+        """
+        with open(path, "w") as file:
+            json.dump(self.trace(), file)
+
+
+_tracer = Tracer()
+
+
+def tracer() -> Tracer:
+    """
+    The tracer shared by the trees and behaviours in this process.
+
+    Returns:
+        the tracer
+    """
+    return _tracer
+
+
+def load(path: str) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Load the events of a saved trace.
+
+    Args:
+        path: the file
+
+    Returns:
+        the events (including metadata)
+    """
+    with open(path, "r") as file:
+        trace = json.load(file)
+    return trace['traceEvents'] if isinstance(trace, dict) else trace
+
+##############################################################################
+# Activations
+##############################################################################
+
+
+class _Activation(object):
+    __slots__ = ('start', 'start_tick', 'tid', 'sequence')
+
+    def __init__(self, start, start_tick, tid, sequence):
+        self.start = start
+        self.start_tick = start_tick
+        self.tid = tid
+        self.sequence = sequence
+
+
+class ActivationTracer(py_trees.visitors.VisitorBase):
+    """
+    Records behaviour activations and ticks as spans. Add it to a tree's
+    visitors, it notes which behaviours were ticked, then closes the
+    activations of those that finished (or were interrupted) as the
+    tick finalises.
+
+    Behaviours get a track per path (names from the root) in the tree, so
+    subtrees inserted time and again (e.g. jobs) reuse their tracks rather
+    than adding new ones. Siblings of the same name share a track.
+
+    Each span's arguments carry the behaviour's id, its parent's id,
+    the outcome, the ticks it started and ended in and a sequence number
+    that orders activations started within the same tick.
+
+    Args:
+        tracer: record with this tracer (default: the shared tracer)
+        ticks: also record a span for every tick
+    """
+    def __init__(self, tracer: Tracer=None, ticks: bool=True):
+        super().__init__(full=False)
+        self.tracer = tracer if tracer is not None else _tracer
+        self.ticks = ticks
+        self.count = 0
+        self.tick_start = None
+        self.ticked = []
+        self.active = {}  # behaviour: _Activation
+        self.sequence = itertools.count()
+
+    def initialise(self):
+        """
+        Note the start of a tick, closing activations of behaviours that were
+        stopped in between ticks (e.g. by a tick handler pruning their subtree).
+        """
+        self.tick_start = self.tracer.now()
+        self.ticked = []
+        for behaviour, activation in list(self.active.items()):
+            if behaviour.status != py_trees.common.Status.RUNNING:
+                self._close(behaviour, activation, self.tick_start, self.count - 1)
+
+    def run(self, behaviour: py_trees.behaviour.Behaviour):
+        """
+        Note that the behaviour was ticked.
+
+        Args:
+            behaviour: behaviour that was ticked
+        """
+        self.ticked.append(behaviour)
+
+    def finalise(self):
+        """
+        Open activations for behaviours ticked for the first time since they
+        last finished, close those that finished or were interrupted.
+        """
+        if not self.tracer.enabled:
+            self.active = {}
+            self.count += 1
+            return
+        end = self.tracer.now()
+        if self.ticks:
+            self.tracer.complete(
+                "tick {}".format(self.count), "tick", self.tick_start, end,
+                tid=self.tracer.track("ticks", "Ticks"), args={'tick': self.count}
+            )
+        for behaviour in self.ticked:
+            if behaviour not in self.active:
+                self.active[behaviour] = _Activation(
+                    self.tick_start, self.count, self.tracer.track(self._track_key(behaviour), self._track_name(behaviour)),
+                    next(self.sequence)
+                )
+        for behaviour, activation in list(self.active.items()):
+            # running, even if not ticked (e.g. a skipped branch), is still active
+            if behaviour.status != py_trees.common.Status.RUNNING:
+                self._close(behaviour, activation, end, self.count)
+        self.count += 1
+
+    def close(self):
+        """
+        Close all open activations, e.g. before saving the trace.
+        """
+        end = self.tracer.now()
+        for behaviour, activation in list(self.active.items()):
+            self._close(behaviour, activation, end, self.count - 1)
+
+    def _close(self, behaviour: py_trees.behaviour.Behaviour, activation: _Activation, end: float, end_tick: int):
+        del self.active[behaviour]
+        self.tracer.complete(
+            behaviour.name, "behaviour", activation.start, end, tid=activation.tid,
+            args={
+                'id': str(behaviour.id),
+                'parent': str(behaviour.parent.id) if behaviour.parent is not None else None,
+                'class': type(behaviour).__name__,
+                'outcome': behaviour.status.value,
+                'start_tick': activation.start_tick,
+                'end_tick': end_tick,
+                'sequence': activation.sequence,
+                'feedback': behaviour.feedback_message,
+            }
+        )
+
+    def _track_key(self, behaviour: py_trees.behaviour.Behaviour) -> typing.Tuple[str, ...]:
+        names = []
+        while behaviour is not None:
+            names.append(behaviour.name)
+            behaviour = behaviour.parent
+        return ('behaviour',) + tuple(reversed(names))
+
+    def _track_name(self, behaviour: py_trees.behaviour.Behaviour) -> str:
+        depth = 0
+        parent = behaviour.parent
+        while parent is not None:
+            depth += 1
+            parent = parent.parent
+        return "  " * depth + behaviour.name.replace("\n", " ")
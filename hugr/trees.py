@@ -0,0 +1,554 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Behaviour tree managers for the tutorials.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import functools
+import math
+import os
+import threading
+import time
+import typing
+
+import diagnostic_msgs.msg as diagnostic_msgs
+import py_trees
+import py_trees_ros
+import rclpy.callback_groups
+import rclpy.qos
+import std_srvs.srv as std_srvs
+
+from . import compiler
+from . import display
+from . import metrics
+from . import recorder
+from . import snapshots
+from . import tracing
+from . import watchdog
+
+##############################################################################
+# Setup
+##############################################################################
+
+
+def setup_concurrently(
+        root: py_trees.behaviour.Behaviour,
+        timeout: typing.Union[float, py_trees.common.Duration]=py_trees.common.Duration.INFINITE,
+        visitor: py_trees.visitors.VisitorBase=None,
+        **kwargs
+) -> typing.List[typing.Tuple[str, float]]:
+    """
+    Concurrent alternative to :func:`py_trees.trees.setup`. Every behaviour's
+    :meth:`~py_trees.behaviour.Behaviour.setup` runs in its own thread, so
+    behaviours that block on discovery (e.g. action clients waiting for their
+    servers) wait together and setup costs the slowest endpoint rather than
+    the sum of them all.
+
+    Behaviours that were still setting up when the timeout expired are listed
+    in the raised exception. Their threads are abandoned (they are daemonic),
+    which is no worse than a sequential setup that was interrupted.
+
+    Visitors are run over the behaviours, in tree order, after they have
+    all been setup.
+
+    Args:
+        root: unmanaged (sub)tree root behaviour
+        timeout: time (s) to wait for all behaviours (use common.Duration.INFINITE to block indefinitely)
+        visitor: runnable entities on each node after it's setup
+        **kwargs: dictionary of arguments to distribute to all behaviours in the (sub) tree
+
+    Returns:
+        (qualified name, time (s)) each behaviour took to setup, slowest first
+
+    Raises:
+        Exception: the first exception raised by a behaviour's setup, if any
+        :class:`py_trees_ros.exceptions.TimedOutError`: if the timeout expired
+    """
+    if isinstance(timeout, py_trees.common.Duration):
+        timeout = timeout.value
+    behaviours = list(root.iterate())
+    durations = {}
+    errors = []
+    lock = threading.Lock()
+
+    def setup(behaviour):
+        start_time = time.monotonic()
+        try:
+            behaviour.setup(**kwargs)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        with lock:
+            durations[behaviour] = time.monotonic() - start_time
+
+    threads = [
+        threading.Thread(target=setup, args=(behaviour,), name="setup " + behaviour.name, daemon=True)
+        for behaviour in behaviours
+    ]
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=None if math.isinf(timeout) else max(0.0, deadline - time.monotonic()))
+    with lock:
+        if errors:
+            raise errors[0]
+        pending = [b for b in behaviours if b not in durations]
+        if pending:
+            raise py_trees_ros.exceptions.TimedOutError(
+                "tree setup timed out [still waiting on {}]".format(
+                    ", ".join(b.qualified_name for b in pending)
+                )
+            )
+    if visitor is not None:
+        visitor.initialise()
+        for behaviour in behaviours:
+            behaviour.visit(visitor)
+        visitor.finalise()
+    return [
+        (behaviour.qualified_name, duration)
+        for behaviour, duration in sorted(durations.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+##############################################################################
+# Trees
+##############################################################################
+
+
+class _ConcurrentSetup(py_trees.trees.BehaviourTree):
+    """
+    Sits between :class:`py_trees_ros.trees.BehaviourTree` and
+    :class:`py_trees.trees.BehaviourTree` in the method resolution order,
+    so the ros tree's setup (node, publishers, services) proceeds as usual
+    until it hands over to its base to setup the behaviours.
+    """
+    def setup(self, timeout=py_trees.common.Duration.INFINITE, visitor=None, **kwargs):
+        if not self.concurrent_setup:
+            self.setup_durations = []
+            return super().setup(timeout=timeout, visitor=visitor, **kwargs)
+        self.setup_durations = setup_concurrently(
+            root=self.root, timeout=timeout, visitor=visitor, **kwargs
+        )
+
+
+class BehaviourTree(py_trees_ros.trees.BehaviourTree, _ConcurrentSetup):
+    """
+    The ROS behaviour tree manager, with the option (off by default) of setting
+    up its behaviours concurrently (refer to :func:`setup_concurrently`).
+    After setup, the slowest behaviours are logged and all setup
+    times are available in :attr:`setup_durations`.
+
+    It is intended to be spun by a multi-threaded executor. Callbacks on
+    the tree's node are assigned to callback groups by role:
+
+    * **tick**: the tick timer and anything else that writes to the blackboard
+      or modifies the tree (default: the node's own mutually exclusive group, which
+      is also where the behaviours' subscribers land)
+    * **services**: service requests, e.g. status reports (default: reentrant)
+    * **reporting**: introspection and diagnostics publishing (default: reentrant)
+
+    Slow service traffic then runs alongside, rather than in front of, the tick.
+    Anything in the tick group still runs exclusively with the tick, so
+    callbacks there need no locks.
+
+    Optionally, the tree can be ticked by a flat, compiled program rather
+    than by the behaviours' generators (refer to :mod:`hugr.compiler`). The
+    program is recompiled whenever the tree's shape has changed since the last tick.
+
+    After each tick, keyframes and deltas of the tree are published for
+    introspection (refer to :mod:`hugr.snapshots`).
+
+    Ticks can also be recorded to a binary tick log for offline analysis
+    (refer to :mod:`hugr.recorder`), e.g. by setting ``HUGR_TICK_LOG_DIR``.
+
+    With unicode tree debugging enabled, only the behaviours whose status
+    changed are printed, from a background thread and at most once a display
+    period (refer to :class:`hugr.display.DifferentialDisplay`). The full
+    tree is printed on request.
+
+    When tick-tocking, a :class:`hugr.watchdog.TickWatchdog` accounts for tick
+    deadlines. Lateness is measured on the node's clock (as the tick timer
+    runs on it), durations on a monotonic clock. Overruns are logged, along with the behaviour that consumed the
+    budget, and the watchdog's counters are published as diagnostics.
+
+    Behaviour activations and action goals can be traced to a Chrome trace
+    file (refer to :mod:`hugr.tracing`), e.g. by setting ``HUGR_TRACE_FILE``.
+    The trace is written when the tree shuts down.
+
+    Tick counts and, when tick-tocking, the watchdog's statistics are also
+    registered as metrics (refer to :mod:`hugr.metrics`) and served on the
+    metrics port, if one is set (e.g. via ``HUGR_METRICS_PORT``).
+
+    Publishers:
+        * **/diagnostics** (:class:`diagnostic_msgs.msg.DiagnosticArray`)
+
+          * tick watchdog counters, duration and lateness statistics (while tick-tocking)
+
+        * **~/snapshots/keyframe**, **~/snapshots/delta** (:class:`py_trees_ros_interfaces.msg.BehaviourTree`)
+
+          * delta encoded snapshots, if enabled (refer to :class:`hugr.snapshots.DeltaSnapshotStream`)
+
+    Services:
+        * **~/display_tree** (:class:`std_srvs.srv.Trigger`)
+
+          * print the full tree and return it in the response message (with the differential display)
+
+    Args:
+        root: root node of the tree
+        unicode_tree_debug: print to console the tree (or changes to it, c.f. differential_display)
+        concurrent_setup: setup behaviours concurrently, rather than one at a time (opt-in)
+        slow_setup_threshold: behaviours taking longer (s) than this to setup are reported
+        callback_groups: override the callback groups for any of the roles above
+        tick_deadline: ticks taking longer (s) than this are overruns (default: the tick period)
+        diagnostics_period: time (s) between diagnostics publications
+        compiled: tick with a compiled program
+        delta_snapshots: publish delta encoded snapshots (opt-in)
+        keyframe_period: maximum time (s) between snapshot keyframes
+        record_directory: record ticks to a tick log in this directory (default: ``$HUGR_TICK_LOG_DIR``, if set)
+        differential_display: print only changes, rather than the visited tree after every tick
+        display_period: minimum time (s) between prints of the differential display
+        metrics_port: serve metrics on this local port (default: ``$HUGR_METRICS_PORT``, if set)
+        trace_file: trace to this file, written on shutdown (default: ``$HUGR_TRACE_FILE``, if set)
+
+    Raises:
+        ValueError: if a callback group is provided for an unknown role
+    """
+    def __init__(
+            self,
+            root: py_trees.behaviour.Behaviour,
+            unicode_tree_debug: bool=False,
+            concurrent_setup: bool=False,
+            slow_setup_threshold: float=0.5,
+            callback_groups: typing.Dict[str, rclpy.callback_groups.CallbackGroup]=None,
+            tick_deadline: float=None,
+            diagnostics_period: float=1.0,
+            compiled: bool=False,
+            delta_snapshots: bool=False,
+            keyframe_period: float=5.0,
+            record_directory: str=None,
+            differential_display: bool=True,
+            display_period: float=1.0,
+            metrics_port: int=None,
+            trace_file: str=None
+    ):
+        super().__init__(root=root, unicode_tree_debug=unicode_tree_debug and not differential_display)
+        self.concurrent_setup = concurrent_setup
+        self.slow_setup_threshold = slow_setup_threshold
+        self.setup_durations = []
+        self.callback_groups = {
+            'tick': None,  # the node's default group, it doesn't exist until setup
+            'services': rclpy.callback_groups.ReentrantCallbackGroup(),
+            'reporting': rclpy.callback_groups.ReentrantCallbackGroup(),
+        }
+        for role, group in (callback_groups or {}).items():
+            if role not in self.callback_groups:
+                raise ValueError("unknown callback group role '{}', expected one of {}".format(
+                    role, sorted(self.callback_groups.keys())))
+            self.callback_groups[role] = group
+        self.tick_deadline = tick_deadline
+        self.diagnostics_period = diagnostics_period
+        self.watchdog = None
+        self.diagnostics_publisher = None
+        self.diagnostics_timer = None
+        self._reported_overruns = 0
+        self.compiled = compiled
+        self.program = None
+        self.delta_snapshots = delta_snapshots
+        self.keyframe_period = keyframe_period
+        self.snapshot_stream = None
+        self.record_directory = record_directory if record_directory is not None else os.environ.get("HUGR_TICK_LOG_DIR", None)
+        self.tick_recorder = None
+        self.display = display.DifferentialDisplay(period=display_period) if unicode_tree_debug and differential_display else None
+        self.display_service = None
+        if metrics_port is None and os.environ.get("HUGR_METRICS_PORT", None):
+            metrics_port = int(os.environ["HUGR_METRICS_PORT"])
+        self.metrics_port = metrics_port
+        self.metrics_server = None
+        self.metrics = []  # registered with the shared registry
+        self.trace_file = trace_file if trace_file is not None else os.environ.get("HUGR_TRACE_FILE", None)
+        self.activation_tracer = None
+
+    def callback_group(self, role: str) -> rclpy.callback_groups.CallbackGroup:
+        """
+        The callback group for a role (only valid after setup).
+
+        Args:
+            role: one of 'tick', 'services', 'reporting'
+
+        Returns:
+            the callback group
+        """
+        group = self.callback_groups[role]
+        return group if group is not None else self.node.default_callback_group
+
+    def setup(
+            self,
+            timeout: typing.Union[float, py_trees.common.Duration]=py_trees.common.Duration.INFINITE,
+            visitor: py_trees.visitors.VisitorBase=None
+    ):
+        """
+        Setup the ROS infrastructure and then the behaviours.
+
+        Args:
+            timeout: time (s) to wait (use common.Duration.INFINITE to block indefinitely)
+            visitor: runnable entities on each node after it's setup
+
+        Raises:
+            Exception: be ready to catch if any of the behaviours raise an exception
+            :class:`py_trees_ros.exceptions.TimedOutError`: if setup timed out
+        """
+        start_time = time.monotonic()
+        super().setup(timeout=timeout, visitor=visitor)
+        if self.delta_snapshots:
+            self.snapshot_stream = snapshots.DeltaSnapshotStream(
+                node=self.node,
+                keyframe_period=self.keyframe_period
+            )
+            self.visitors.append(self.snapshot_stream.visitor)
+            self.add_post_tick_handler(self._publish_delta_snapshot)
+        if self.record_directory:
+            self.tick_recorder = recorder.TickRecorder(directory=self.record_directory)
+            self.add_post_tick_handler(self.tick_recorder.record)
+        if self.trace_file:
+            tracing.tracer().enable()
+            self.activation_tracer = tracing.ActivationTracer()
+            self.visitors.append(self.activation_tracer)
+        if self.display is not None:
+            self.add_post_tick_handler(self.display.record)
+            self.display_service = self.node.create_service(
+                srv_type=std_srvs.Trigger,
+                srv_name="~/display_tree",
+                callback=self._display_tree,
+                qos_profile=rclpy.qos.qos_profile_services_default,
+                callback_group=self.callback_group('tick')  # a consistent snapshot, exclusive with the tick
+            )
+            self.display.start()
+        self.register_metric(metrics.Counter(
+            name="hugr_tree_ticks_total", help="ticks of the tree", function=lambda: self.count
+        ))
+        if self.metrics_port is not None:
+            self.metrics_server = metrics.MetricsServer(port=self.metrics_port)
+        if self.compiled and not compiler.supported():
+            self.node.get_logger().warning(
+                "tree compilation doesn't support py_trees {}, ticking with generators".format(
+                    py_trees.version.__version__)
+            )
+        slow = ["{} ({:.2f}s)".format(name, duration)
+                for name, duration in self.setup_durations
+                if duration > self.slow_setup_threshold]
+        self.node.get_logger().info(
+            "tree setup in {:.2f}s{}".format(
+                time.monotonic() - start_time,
+                " [slow: {}]".format(", ".join(slow)) if slow else ""
+            )
+        )
+
+    def tick(
+            self,
+            pre_tick_handler: typing.Callable[[py_trees.trees.BehaviourTree], None]=None,
+            post_tick_handler: typing.Callable[[py_trees.trees.BehaviourTree], None]=None
+    ):
+        """
+        Tick the tree just once and run any handlers before and after the tick,
+        with the compiled program if so configured.
+
+        Args:
+            pre_tick_handler: function to execute before ticking
+            post_tick_handler: function to execute after ticking
+        """
+        if not self.compiled or not compiler.supported():
+            return super().tick(pre_tick_handler=pre_tick_handler, post_tick_handler=post_tick_handler)
+        if pre_tick_handler is not None:
+            pre_tick_handler(self)
+        for handler in self.pre_tick_handlers:
+            handler(self)
+        for visitor in self.visitors:
+            visitor.initialise()
+        # handlers may have inserted or pruned subtrees
+        if self.program is None or self.program.root is not self.root or not self.program.valid():
+            self.program = compiler.compile_tree(self.root)
+        self.program.tick(visitors=[visitor for visitor in self.visitors if not visitor.full])
+        full_visitors = [visitor for visitor in self.visitors if visitor.full]
+        if full_visitors:
+            for node in self.root.iterate():
+                for visitor in full_visitors:
+                    node.visit(visitor)
+        for visitor in self.visitors:
+            visitor.finalise()
+        for handler in self.post_tick_handlers:
+            handler(self)
+        if post_tick_handler is not None:
+            post_tick_handler(self)
+        self.count += 1
+
+    def tick_tock(
+            self,
+            period_ms: float,
+            number_of_iterations: int=py_trees.trees.CONTINUOUS_TICK_TOCK,
+            pre_tick_handler: typing.Callable[[py_trees.trees.BehaviourTree], None]=None,
+            post_tick_handler: typing.Callable[[py_trees.trees.BehaviourTree], None]=None
+    ):
+        """
+        Tick continuously at the specified period, from a timer in the tick callback group.
+
+        Args:
+            period_ms: sleep this much between ticks (milliseconds)
+            number_of_iterations: number of iterations to tick-tock
+            pre_tick_handler: function to execute before ticking
+            post_tick_handler: function to execute after ticking
+        """
+        if self.watchdog is None:
+            self.watchdog = watchdog.TickWatchdog(
+                period=period_ms / 1000.0,
+                deadline=self.tick_deadline,
+                # schedule on the tick timer's clock (simulated time, if the node uses it),
+                # durations stay on the (default) monotonic clock
+                timer_now=lambda: self.node.get_clock().now().nanoseconds * 1e-9
+            )
+            self.visitors.append(self.watchdog)
+            self.register_metric(self.watchdog.durations, name="hugr_tree_tick_duration_seconds")
+            self.register_metric(self.watchdog.lateness, name="hugr_tree_tick_lateness_seconds")
+            for counter in ['overruns', 'late', 'missed']:
+                self.register_metric(metrics.Counter(
+                    name="hugr_tree_ticks_{}_total".format(counter),
+                    help="ticks {} (c.f. the tick watchdog)".format(counter),
+                    function=functools.partial(lambda counter: self.watchdog.counters[counter], counter)
+                ))
+        else:
+            # tick-tocking again, keep the statistics but follow the new timer
+            self.watchdog.period = period_ms / 1000.0
+            self.watchdog.deadline = self.tick_deadline if self.tick_deadline is not None else self.watchdog.period
+            self.watchdog.late_tolerance = 0.1 * self.watchdog.period
+            self.watchdog.phase = None
+            self.watchdog.last_scheduled = None
+        self.timer = self.node.create_timer(
+            period_ms / 1000.0,  # unit 'seconds'
+            functools.partial(
+                self._watched_tick_tock_timer_callback,
+                number_of_iterations=number_of_iterations,
+                pre_tick_handler=pre_tick_handler,
+                post_tick_handler=post_tick_handler
+            ),
+            callback_group=self.callback_group('tick')
+        )
+        self.tick_tock_count = 0
+        if self.diagnostics_publisher is None:
+            self.diagnostics_publisher = self.node.create_publisher(
+                msg_type=diagnostic_msgs.DiagnosticArray,
+                topic="/diagnostics",
+                qos_profile=10
+            )
+        if self.diagnostics_timer is None:
+            self.diagnostics_timer = self.node.create_timer(
+                self.diagnostics_period,
+                self.publish_diagnostics,
+                callback_group=self.callback_group('reporting')
+            )
+
+    def _watched_tick_tock_timer_callback(self, **kwargs):
+        self.watchdog.tick_started()
+        self._tick_tock_timer_callback(**kwargs)
+        overrun = self.watchdog.tick_finished()
+        if overrun is not None:
+            self.node.get_logger().warning(
+                "tick {tick} overran its deadline [{duration:.3f}s > {deadline:.3f}s, "
+                "'{behaviour}' took {self_time:.3f}s]".format(deadline=self.watchdog.deadline, **overrun)
+            )
+
+    def register_metric(self, metric: metrics.Metric, name: str=None, labels: typing.Dict[str, str]=None) -> metrics.Metric:
+        """
+        Register a metric with the shared registry, labelled with this tree's
+        node. It is unregistered when the tree shuts down.
+
+        Args:
+            metric: the metric
+            name: name to expose it under (default: the metric's name)
+            labels: additional labels
+
+        Returns:
+            the metric
+        """
+        labels = dict(labels or {}, tree=self.node.get_fully_qualified_name())
+        metrics.registry().register(metric, name=name, labels=labels)
+        self.metrics.append(metric)
+        return metric
+
+    def _display_tree(
+            self,
+            unused_request: std_srvs.Trigger.Request,
+            response: std_srvs.Trigger.Response
+    ) -> std_srvs.Trigger.Response:
+        response.message = self.display.full_tree(self.root)
+        response.success = True
+        self.display.printer(response.message)
+        return response
+
+    def _publish_delta_snapshot(self, tree: py_trees.trees.BehaviourTree):
+        self.snapshot_stream.publish(root=self.root, count=self.count)
+
+    def publish_diagnostics(self):
+        """
+        Publish the tick watchdog's statistics. The status is a warning if
+        there were overruns since the last publication.
+        """
+        statistics = self.watchdog.statistics()
+        counters = statistics['counters']
+        overruns = counters['overruns'] - self._reported_overruns
+        self._reported_overruns = counters['overruns']
+        values = [('period', statistics['period']), ('deadline', statistics['deadline'])]
+        values += list(counters.items())
+        for name in ['duration', 'lateness']:
+            for key in ['mean', 'p99', 'max']:
+                values.append(("{}_{}".format(name, key), statistics[name][key]))
+        if statistics['last_overrun'] is not None:
+            values.append(('last_overrun_behaviour', statistics['last_overrun']['behaviour']))
+        status = diagnostic_msgs.DiagnosticStatus(
+            level=diagnostic_msgs.DiagnosticStatus.WARN if overruns else diagnostic_msgs.DiagnosticStatus.OK,
+            name="{}: tick watchdog".format(self.node.get_fully_qualified_name()),
+            message="{} overruns".format(overruns) if overruns else "ok",
+            values=[diagnostic_msgs.KeyValue(key=key, value=str(value)) for key, value in values]
+        )
+        diagnostics = diagnostic_msgs.DiagnosticArray(status=[status])
+        diagnostics.header.stamp = self.node.get_clock().now().to_msg()
+        self.diagnostics_publisher.publish(diagnostics)
+
+    def shutdown(self):
+        """
+        Cleanup the diagnostics timer, snapshot stream, tick recorder, display and metrics,
+        write the trace, then shutdown the tree.
+        """
+        if self.diagnostics_timer is not None:
+            self.node.destroy_timer(self.diagnostics_timer)
+            self.diagnostics_timer = None
+        if self.snapshot_stream is not None:
+            self.snapshot_stream.shutdown()
+            self.snapshot_stream = None
+        if self.tick_recorder is not None:
+            self.tick_recorder.close()
+        if self.display is not None:
+            self.display.stop()
+        if self.display_service is not None:
+            self.node.destroy_service(self.display_service)
+            self.display_service = None
+        for metric in self.metrics:
+            metrics.registry().unregister(metric)
+        self.metrics = []
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
+        if self.activation_tracer is not None:
+            self.activation_tracer.close()
+            tracing.tracer().save(self.trace_file)
+            tracing.tracer().disable()
+            self.activation_tracer = None
+        super().shutdown()
@@ -78,16 +78,18 @@ branching in the tree.
 # Imports
 ##############################################################################
 
-import launch
-import launch_ros
 import py_trees
 import py_trees_ros.trees
 import py_trees.console as console
 import rclpy
 import sys
 
+from . import battery
 from . import behaviours
+from . import composites
+from . import decorators
 from . import mock
+from . import trees
 
 ##############################################################################
 # Launcher
@@ -101,6 +103,9 @@ def generate_launch_description():
     Returns:
         the launch description
     """
+    import launch
+    import launch_ros
+
     return launch.LaunchDescription(
         mock.launch.generate_launch_nodes() +
         [
@@ -134,8 +139,8 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
         )
     )
 
-    topics2bb = py_trees.composites.Sequence(name="Topics2BB", memory=True)
-    battery2bb = py_trees_ros.battery.ToBlackboard(
+    topics2bb = composites.DataGathering(name="Topics2BB")
+    battery2bb = battery.ToBlackboard(
         name="Battery2BB",
         topic_name="/battery/state",
         qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
@@ -150,7 +155,7 @@ def tutorial_create_root() -> py_trees.behaviour.Behaviour:
     def check_battery_low_on_blackboard(blackboard: py_trees.blackboard.Blackboard) -> bool:
         return blackboard.battery_low_warning
 
-    battery_emergency = py_trees.decorators.EternalGuard(
+    battery_emergency = decorators.EternalGuard(
         name="Battery Low?",
         condition=check_battery_low_on_blackboard,
         blackboard_keys={"battery_low_warning"},
@@ -171,7 +176,7 @@ def tutorial_main():
     """
     rclpy.init(args=None)
     root = tutorial_create_root()
-    tree = py_trees_ros.trees.BehaviourTree(
+    tree = trees.BehaviourTree(
         root=root,
         unicode_tree_debug=True
     )
@@ -0,0 +1,165 @@
+#
+# License: BSD
+#   https://github.com/splintered-reality/hugr/raw/devel/LICENSE
+#
+##############################################################################
+# Documentation
+##############################################################################
+
+"""
+Tick deadline accounting for trees that tick-tock on a timer.
+"""
+
+##############################################################################
+# Imports
+##############################################################################
+
+import math
+import threading
+import time
+import typing
+
+import py_trees
+
+from . import metrics
+
+##############################################################################
+# Watchdog
+##############################################################################
+
+
+class TickWatchdog(py_trees.visitors.VisitorBase):
+    """
+    Records when each tick started relative to when it was scheduled, how
+    long it took and whether it overran its deadline. When it does, the
+    behaviour that consumed the most of the tick's budget is identified.
+
+    Ticks are bracketed by :meth:`tick_started` and :meth:`tick_finished`
+    (called by the tree's timer callback, so that tick handlers count towards
+    the tick). Run as a visitor in between, it attributes the time between
+    successive visits to the behaviour being visited. Since behaviours are
+    visited as they finish ticking, composites are charged only for
+    their own work, not that of their children (i.e. self time).
+
+    The tick timer is assumed to run at a fixed period in phase with the
+    first tick, skipping periods that are missed entirely (as ROS timers do).
+    Tick starts are scheduled on the timer's clock (e.g. simulated time),
+    while durations and self times are measured on a monotonic clock, since
+    a simulated clock stands still while the tick runs.
+
+    Args:
+        period: the tick period (s)
+        deadline: tick durations (s) beyond this are overruns (default: the period)
+        late_tolerance: ticks starting later (s) than this past their scheduled time are late (default: 10% of the period)
+        now: monotonic time source (s) for tick durations and self times
+        timer_now: time source (s) of the tick timer, for lateness and missed ticks (default: now)
+    """
+    def __init__(
+            self,
+            period: float,
+            deadline: float=None,
+            late_tolerance: float=None,
+            now: typing.Callable[[], float]=time.monotonic,
+            timer_now: typing.Callable[[], float]=None
+    ):
+        super().__init__(full=False)
+        self.period = period
+        self.deadline = deadline if deadline is not None else period
+        self.late_tolerance = late_tolerance if late_tolerance is not None else 0.1 * period
+        self.now = now
+        self.timer_now = timer_now if timer_now is not None else now
+        self.lock = threading.Lock()
+        self.durations = metrics.Histogram(name="tick_duration")
+        self.lateness = metrics.Histogram(name="tick_lateness")
+        self.phase = None
+        self.last_scheduled = None
+        self.counters = {'ticks': 0, 'overruns': 0, 'late': 0, 'missed': 0}
+        self.last_overrun = None
+        self.start_time = None
+        self.last_visit = None
+        self.self_times = {}  # behaviour id -> [name, time (s)]
+
+    def tick_started(self):
+        """
+        Mark the start of a tick, before any tick handlers run.
+        """
+        self.start_time = self.now()
+        self.last_visit = self.start_time
+        self.self_times = {}
+        started = self.timer_now()
+        if self.phase is None:
+            self.phase = started
+        # nudge, so a tick right on schedule isn't floored into the previous period
+        periods = math.floor((started - self.phase) / self.period + 1e-6)
+        scheduled = self.phase + periods * self.period
+        lateness = started - scheduled
+        self.lateness.observe(lateness)
+        with self.lock:
+            if self.last_scheduled is not None:
+                self.counters['missed'] += max(0, periods - self.last_scheduled - 1)
+            self.last_scheduled = periods
+            if lateness > self.late_tolerance:
+                self.counters['late'] += 1
+
+    def initialise(self):
+        """
+        Start attributing time from here, the tree's pre-tick handlers
+        (e.g. subtree insertions) are not charged to the first behaviour.
+        """
+        self.last_visit = self.now()
+
+    def run(self, behaviour: py_trees.behaviour.Behaviour):
+        """
+        Charge the time since the last visit to this behaviour.
+
+        Args:
+            behaviour: behaviour that just finished ticking
+        """
+        now = self.now()
+        entry = self.self_times.setdefault(behaviour.id, [behaviour.name, 0.0])
+        entry[1] += now - self.last_visit
+        self.last_visit = now
+
+    def tick_finished(self) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Mark the end of a tick, after all tick handlers have run.
+
+        Returns:
+            details of the overrun (duration, the behaviour that consumed the
+            most of it and its self time), or None if the tick met its deadline
+        """
+        duration = self.now() - self.start_time
+        self.durations.observe(duration)
+        overrun = None
+        with self.lock:
+            self.counters['ticks'] += 1
+            if duration > self.deadline:
+                self.counters['overruns'] += 1
+                name, self_time = max(self.self_times.values(), key=lambda entry: entry[1], default=("-", 0.0))
+                overrun = {
+                    'tick': self.counters['ticks'],
+                    'duration': duration,
+                    'behaviour': name,
+                    'self_time': self_time,
+                }
+                self.last_overrun = overrun
+        return overrun
+
+    def statistics(self) -> typing.Dict[str, typing.Any]:
+        """
+        Counters and latency summaries, suitable for publishing.
+
+        Returns:
+            tick, overrun, late and missed tick counters, duration and lateness summaries (s), the last overrun
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            last_overrun = self.last_overrun
+        return {
+            'period': self.period,
+            'deadline': self.deadline,
+            'counters': counters,
+            'duration': self.durations.summary(),
+            'lateness': self.lateness.summary(),
+            'last_overrun': last_overrun,
+        }
@@ -120,6 +120,13 @@ setup(
             'mock-dock-client = hugr.mock.actions:dock_client',
             'mock-move-base-client = hugr.mock.actions:move_base_client',
             'mock-rotate-client = hugr.mock.actions:rotate_client',
+            'mock-load-generator = hugr.mock.load_generator:main',
+            # Tools
+            'hugr-bringup-profiler = hugr.mock.bringup_profiler:main',
+            'hugr-import-times = hugr.import_times:main',
+            'hugr-critical-path = hugr.critical_path:main',
+            'hugr-replay = hugr.replay:main',
+            'hugr-snapshot-relay = hugr.snapshots:relay_main',
             # Tutorial Nodes
             'tree-data-gathering = hugr.one_data_gathering:tutorial_main',
             'tree-battery-check = hugr.two_battery_check:tutorial_main',
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import os
+
+import pytest
+
+##############################################################################
+# Fixtures
+##############################################################################
+
+# Domain ids that ROS 2 guarantees are free of port collisions on every
+# platform (higher ids can collide with the ephemeral port range on Linux).
+FIRST_DOMAIN_ID = 1
+LAST_DOMAIN_ID = 101
+
+
+@pytest.fixture(scope="session")
+def ros_domain():
+    """
+    Keep parallel workers (pytest -n <workers>) apart on their own ROS
+    domains. The mocks and trees use fixed node names and all publish or
+    subscribe to /clock, so workers sharing a domain would crosstalk.
+
+    Use it in every module that initialises rclpy. Being session scoped, it
+    is set up before the module's own setup_module (and so, rclpy.init()).
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", None)
+    if worker is None:
+        yield os.environ.get("ROS_DOMAIN_ID", None)
+        return
+    domain_id = FIRST_DOMAIN_ID + int(worker.lstrip("gw"))
+    if domain_id > LAST_DOMAIN_ID:
+        pytest.exit("too many workers for a ROS domain each, run with at most {}".format(
+            LAST_DOMAIN_ID - FIRST_DOMAIN_ID + 1), returncode=pytest.ExitCode.USAGE_ERROR)
+    previous = os.environ.get("ROS_DOMAIN_ID", None)
+    os.environ["ROS_DOMAIN_ID"] = str(domain_id)
+    yield str(domain_id)
+    if previous is None:
+        del os.environ["ROS_DOMAIN_ID"]
+    else:
+        os.environ["ROS_DOMAIN_ID"] = previous
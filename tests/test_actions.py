@@ -9,12 +9,13 @@
 # Imports
 ##############################################################################
 
+import pytest
+
 import action_msgs.msg as action_msgs  # GoalStatus
 import py_trees
 import py_trees.console as console
 import rclpy
 import rclpy.executors
-import time
 
 import hugr.mock as mock
 
@@ -35,6 +36,9 @@ def assert_details(text, expected, result):
           console.reset)
 
 
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
 def setup_module(module):
     console.banner("ROS Init")
     rclpy.init()
@@ -46,6 +50,7 @@ def teardown_module(module):
 
 
 def timeout():
+    # simulated seconds
     return 3.0
 
 
@@ -65,17 +70,14 @@ def generic_success_test(
     console.banner(title)
 
     executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
-    executor.add_node(server.node)
-    executor.add_node(client.node)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
 
     # Send goal and await future
     client.setup()
     goal_future = client.send_goal()
-    start_time = time.monotonic()
-    while (time.monotonic() - start_time) < timeout():
-        executor.spin_once(timeout_sec=0.1)
-        if goal_future.result() is not None:
-            break
+    clock.spin_until(lambda: goal_future.result() is not None, timeout=timeout())
     assert_banner()
     assert_details("goal_future.result()", "!None", goal_future.result())
     assert(goal_future.result() is not None)
@@ -87,11 +89,7 @@ def generic_success_test(
 
     # Await goal result future
     result_future = goal_handle.get_result_async()
-    start_time = time.monotonic()
-    while (time.monotonic() - start_time) < timeout():
-        executor.spin_once(timeout_sec=0.1)
-        if result_future.done():
-            break
+    clock.spin_until(result_future.done, timeout=timeout())
 
     assert_banner()
     assert_details("result_future.done()", "True", result_future.done())
@@ -103,6 +101,7 @@ def generic_success_test(
     )
     assert(result_future.result().status ==
         action_msgs.GoalStatus.STATUS_SUCCEEDED)  # noqa
+    clock.shutdown()
     executor.shutdown()
     server.shutdown()
     client.shutdown()
@@ -141,17 +140,14 @@ def generic_preemption_test(
     console.banner(title)
 
     executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
-    executor.add_node(server.node)
-    executor.add_node(client.node)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
 
     # Send goal and await future
     client.setup()
     goal_future = client.send_goal()
-    start_time = time.monotonic()
-    while (time.monotonic() - start_time) < timeout():
-        executor.spin_once(timeout_sec=0.1)
-        if goal_future.result() is not None:
-            break
+    clock.spin_until(lambda: goal_future.result() is not None, timeout=timeout())
     assert_banner()
     assert_details("goal_future.result()", "!None", goal_future.result())
     assert(goal_future.result() is not None)
@@ -168,11 +164,7 @@ def generic_preemption_test(
 
     # Await preempted goal result future
     result_future = goal_handle.get_result_async()
-    start_time = time.monotonic()
-    while (time.monotonic() - start_time) < timeout():
-        executor.spin_once(timeout_sec=0.1)
-        if result_future.done():
-            break
+    clock.spin_until(result_future.done, timeout=timeout())
 
     assert_banner()
     assert_details("result_future.done()", "True", result_future.done())
@@ -194,6 +186,7 @@ def generic_preemption_test(
     # - if executor.shutdown() is first, why doesn't it wait?
     # - why does the action server itself hang around till the
     #   execute() task is done/aborted instead of crashing?
+    clock.shutdown()
     executor.shutdown()
     server.shutdown()
     client.shutdown()
@@ -218,17 +211,14 @@ def generic_cancel_test(
     console.banner(title)
 
     executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
-    executor.add_node(server.node)
-    executor.add_node(client.node)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
 
     # Send goal and await future
     client.setup()
     goal_future = client.send_goal()
-    start_time = time.monotonic()
-    while (time.monotonic() - start_time) < timeout():
-        executor.spin_once(timeout_sec=0.1)
-        if goal_future.result() is not None:
-            break
+    clock.spin_until(lambda: goal_future.result() is not None, timeout=timeout())
     assert_banner()
     assert_details("goal_future.result()", "!None", goal_future.result())
     assert(goal_future.result() is not None)
@@ -245,13 +235,9 @@ def generic_cancel_test(
     # Note: it's going to spam cancel requests, but that's ok
     #       even desirable to make sure it doesn't flake out
     result_future = goal_handle.get_result_async()
-    start_time = time.monotonic()
-    while (time.monotonic() - start_time) < timeout():
-        executor.spin_once(timeout_sec=0.1)
-        if result_future.done():
-            _timer.cancel()
-            client.node.destroy_timer(_timer)
-            break
+    clock.spin_until(result_future.done, timeout=timeout())
+    _timer.cancel()
+    client.node.destroy_timer(_timer)
 
     assert_banner()
     assert_details("result_future.done()", "True", result_future.done())
@@ -264,6 +250,7 @@ def generic_cancel_test(
     assert(result_future.result().status ==
                     action_msgs.GoalStatus.STATUS_CANCELED)  # noqa
 
+    clock.shutdown()
     executor.shutdown()
     server.shutdown()
     client.shutdown()
@@ -274,3 +261,148 @@ def test_dock_cancel():
         title="Dock Cancel",
         server=mock.dock.Dock(duration=0.5),
         client=mock.actions.DockClient())
+
+##############################################################################
+# Concurrent Goals
+##############################################################################
+
+
+def generic_concurrent_test(
+        title,
+        server,
+        client,
+        number_of_goals,
+        expected_statuses
+):
+    console.banner(title)
+
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=number_of_goals + 4)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
+
+    # Send all goals and await their futures
+    client.setup()
+    goal_futures = [
+        client.action_client.send_goal_async(client.action_type.Goal())
+        for unused_i in range(number_of_goals)
+    ]
+    clock.spin_until(lambda: all(future.result() is not None for future in goal_futures), timeout=timeout())
+    assert_banner()
+    accepted = [future.result() is not None and future.result().accepted for future in goal_futures]
+    assert_details("accepted", "{}".format([s is not None for s in expected_statuses]), accepted)
+    assert(accepted == [s is not None for s in expected_statuses])
+
+    # Await all result futures
+    result_futures = [future.result().get_result_async() for future in goal_futures if future.result().accepted]
+    clock.spin_until(lambda: all(future.done() for future in result_futures), timeout=2 * timeout())
+
+    statuses = [client.status_strings[future.result().status] for future in result_futures if future.done()]
+    expected = [client.status_strings[s] for s in expected_statuses if s is not None]
+    assert_details("statuses", expected, statuses)
+    assert(statuses == expected)
+
+    clock.shutdown()
+    executor.shutdown()
+    server.shutdown()
+    client.shutdown()
+
+
+def test_dock_concurrent_goals():
+    generic_concurrent_test(
+        title="Dock Concurrent Goals",
+        server=mock.dock.Dock(duration=0.5, max_concurrent_goals=2, policy="reject"),
+        client=mock.actions.DockClient(),
+        number_of_goals=3,
+        expected_statuses=[
+            action_msgs.GoalStatus.STATUS_SUCCEEDED,
+            action_msgs.GoalStatus.STATUS_SUCCEEDED,
+            None  # rejected
+        ]
+    )
+
+
+def test_dock_queued_goals():
+    generic_concurrent_test(
+        title="Dock Queued Goals",
+        server=mock.dock.Dock(duration=0.5, max_concurrent_goals=1, policy="queue"),
+        client=mock.actions.DockClient(),
+        number_of_goals=2,
+        expected_statuses=[
+            action_msgs.GoalStatus.STATUS_SUCCEEDED,
+            action_msgs.GoalStatus.STATUS_SUCCEEDED
+        ]
+    )
+
+
+def test_dock_cancel_queued_goal():
+    console.banner("Dock Cancel Queued Goal")
+    server = mock.dock.Dock(duration=5.0, max_concurrent_goals=1, policy="queue")
+    client = mock.actions.DockClient()
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=6)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
+
+    client.setup()
+    goal_futures = [client.action_client.send_goal_async(client.action_type.Goal()) for unused_i in range(2)]
+    clock.spin_until(lambda: all(future.result() is not None for future in goal_futures), timeout=timeout())
+    executing, queued = [future.result() for future in goal_futures]
+    executing_result = executing.get_result_async()
+    queued_result = queued.get_result_async()
+    queued.cancel_goal_async()
+    # released from the queue, not held until the executing goal finishes
+    clock.spin_until(queued_result.done, timeout=1.0)
+
+    assert_banner()
+    assert_details("queued goal result", "STATUS_CANCELED",
+                   client.status_strings[queued_result.result().status] if queued_result.done() else None)
+    assert(queued_result.done())
+    assert(queued_result.result().status == action_msgs.GoalStatus.STATUS_CANCELED)  # noqa
+    assert_details("executing goal", "still executing", "finished" if executing_result.done() else "still executing")
+    assert(not executing_result.done())
+
+    clock.spin_until(executing_result.done, timeout=2 * server.duration)
+    assert_details("executing goal result", "STATUS_SUCCEEDED", client.status_strings[executing_result.result().status])
+    assert(executing_result.result().status == action_msgs.GoalStatus.STATUS_SUCCEEDED)  # noqa
+
+    clock.shutdown()
+    executor.shutdown()
+    server.shutdown()
+    client.shutdown()
+
+
+def test_dock_cancel_queued_goal_while_failing():
+    console.banner("Dock Cancel Queued Goal While Failing")
+    server = mock.dock.Dock(duration=5.0, max_concurrent_goals=1, policy="queue")
+    client = mock.actions.DockClient()
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=6)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
+
+    client.setup()
+    goal_futures = [client.action_client.send_goal_async(client.action_type.Goal()) for unused_i in range(2)]
+    clock.spin_until(lambda: all(future.result() is not None for future in goal_futures), timeout=timeout())
+    executing, queued = [future.result() for future in goal_futures]
+    executing_result = executing.get_result_async()
+    queued_result = queued.get_result_async()
+    # a released goal never executes, so it must not abort (an invalid transition from accepted)
+    server.failing = True
+    queued.cancel_goal_async()
+    clock.spin_until(lambda: queued_result.done() and executing_result.done(), timeout=timeout())
+
+    assert_banner()
+    assert_details("queued goal result", "STATUS_CANCELED",
+                   client.status_strings[queued_result.result().status] if queued_result.done() else None)
+    assert(queued_result.done())
+    assert(queued_result.result().status == action_msgs.GoalStatus.STATUS_CANCELED)  # noqa
+    assert_details("executing goal result", "STATUS_ABORTED",
+                   client.status_strings[executing_result.result().status] if executing_result.done() else None)
+    assert(executing_result.done())
+    assert(executing_result.result().status == action_msgs.GoalStatus.STATUS_ABORTED)  # noqa
+
+    clock.shutdown()
+    executor.shutdown()
+    server.shutdown()
+    client.shutdown()
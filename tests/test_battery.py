@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import pytest
+
+import py_trees
+import py_trees.console as console
+import py_trees_ros
+import hugr
+import rclpy
+import rclpy.executors
+import sensor_msgs.msg as sensor_msgs
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
+def setup_module(module):
+    console.banner("ROS Init")
+    rclpy.init()
+
+
+def teardown_module(module):
+    console.banner("ROS Shutdown")
+    rclpy.shutdown()
+
+
+def timeout():
+    # simulated seconds
+    return 3.0
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_battery_hysteresis():
+    console.banner("Battery - Hysteresis")
+
+    py_trees.blackboard.Blackboard.clear()
+    tree_node = rclpy.create_node("tree")
+    battery_node = rclpy.create_node("battery")
+    battery2bb = hugr.battery.ToBlackboard(
+        name="Battery2BB",
+        topic_name="/battery/state",
+        qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
+        threshold=30.0,
+        hysteresis=5.0,
+        period=0.0
+    )
+    battery2bb.setup(node=tree_node)
+    publisher = battery_node.create_publisher(
+        msg_type=sensor_msgs.BatteryState,
+        topic="/battery/state",
+        qos_profile=py_trees_ros.utilities.qos_profile_unlatched()
+    )
+    blackboard = py_trees.blackboard.Client(name="Reader")
+    blackboard.register_key(key="battery_low_warning", access=py_trees.common.Access.READ)
+
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    clock = hugr.mock.clock.SimulatedClock(executor)
+    clock.add_node(tree_node)
+    clock.add_node(battery_node)
+    clock.spin_until(lambda: publisher.get_subscription_count() > 0, timeout=timeout())
+
+    storage = hugr.blackboard.install()
+    warnings = []
+    versions = []
+    for percentage in [50.0, 29.0, 28.5, 32.0, 36.0]:
+        publisher.publish(sensor_msgs.BatteryState(percentage=percentage))
+        clock.spin_until(lambda: battery2bb.msg is not None, timeout=timeout())
+        battery2bb.tick_once()
+        warnings.append(blackboard.battery_low_warning)
+        versions.append(storage.version("/battery"))
+
+    assert_banner()
+    assert_details("warnings", [False, True, True, True, False], warnings)
+    assert(warnings == [False, True, True, True, False])
+    assert_details("insignificant change not written", versions[1], versions[2])
+    assert(versions[1] == versions[2])
+
+    clock.shutdown()
+    executor.shutdown()
+    tree_node.destroy_node()
+    battery_node.destroy_node()
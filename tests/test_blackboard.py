@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import operator
+import threading
+
+import py_trees
+import py_trees.console as console
+
+import hugr.behaviours
+import hugr.blackboard
+import hugr.decorators
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+def is_low(blackboard):
+    return blackboard.battery_low_warning
+
+
+def create_tree():
+    py_trees.blackboard.Blackboard.clear()
+    writer = py_trees.blackboard.Client(name="Writer")
+    writer.register_key(key="battery_low_warning", access=py_trees.common.Access.WRITE)
+    writer.battery_low_warning = False
+    guard = hugr.decorators.EternalGuard(
+        name="Low?",
+        condition=is_low,
+        blackboard_keys={"battery_low_warning"},
+        child=py_trees.behaviours.Running(name="Flash")
+    )
+    return writer, guard
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_versioned_storage():
+    console.banner("Versioned Storage")
+    storage = hugr.blackboard.VersionedStorage({"/foo": 1})
+    first = storage.version("/foo")
+    storage["/foo"] = 1
+    second = storage.version("/foo")
+    del storage["/foo"]
+    third = storage.version("/foo")
+    assert_banner()
+    assert_details("unwritten key", 0, storage.version("/bar"))
+    assert(storage.version("/bar") == 0)
+    assert_details("versions increase", True, first < second < third)
+    assert(first < second < third)
+
+
+def test_batches_per_thread():
+    console.banner("Batches per Thread")
+    storage = hugr.blackboard.VersionedStorage()
+    opened = threading.Barrier(2)
+    seen = {}
+
+    def gather(key):
+        storage.open_batch()  # doesn't collide with the other thread's batch
+        storage[key] = 1
+        opened.wait()
+        seen[key] = (storage.get("/first", None), storage.get("/second", None))
+        opened.wait()
+        storage.commit_batch()
+
+    threads = [threading.Thread(target=gather, args=(key,)) for key in ["/first", "/second"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_banner()
+    assert_details("held back", {"/first": (None, None), "/second": (None, None)}, seen)
+    assert(seen == {"/first": (None, None), "/second": (None, None)})
+    assert_details("committed", {"/first": 1, "/second": 1}, dict(storage))
+    assert(dict(storage) == {"/first": 1, "/second": 1})
+
+
+def test_guard_caches_until_written():
+    console.banner("Eternal Guard - Cached Until Written")
+    writer, guard = create_tree()
+    for unused_i in range(5):
+        guard.tick_once()
+    idle_evaluations = guard.evaluations
+    idle_status = guard.status
+    writer.battery_low_warning = True
+    guard.tick_once()
+    assert_banner()
+    assert_details("evaluations while idle", 1, idle_evaluations)
+    assert(idle_evaluations == 1)
+    assert_details("status while idle", py_trees.common.Status.FAILURE, idle_status)
+    assert(idle_status == py_trees.common.Status.FAILURE)
+    assert_details("evaluations after write", 2, guard.evaluations)
+    assert(guard.evaluations == 2)
+    assert_details("status after write", py_trees.common.Status.RUNNING, guard.status)
+    assert(guard.status == py_trees.common.Status.RUNNING)
+
+
+def test_guard_does_not_cache_mutable_values():
+    console.banner("Eternal Guard - Mutable Values")
+    writer, guard = create_tree()
+    writer.battery_low_warning = [False]
+    guard.uncached_condition = lambda: False
+    for unused_i in range(3):
+        guard.tick_once()
+    assert_banner()
+    assert_details("evaluations", 3, guard.evaluations)
+    assert(guard.evaluations == 3)
+
+
+def test_check_caches_until_written():
+    console.banner("Check Blackboard Variable Value - Cached Until Written")
+    py_trees.blackboard.Blackboard.clear()
+    writer = py_trees.blackboard.Client(name="Writer")
+    writer.register_key(key="event_scan_button", access=py_trees.common.Access.WRITE)
+    writer.event_scan_button = False
+    check = hugr.behaviours.CheckBlackboardVariableValue(
+        name="Scan?",
+        check=py_trees.common.ComparisonExpression(
+            variable="event_scan_button",
+            value=True,
+            operator=operator.eq
+        )
+    )
+    for unused_i in range(5):
+        check.tick_once()
+    idle_evaluations = check.evaluations
+    idle_status = check.status
+    writer.event_scan_button = True
+    check.tick_once()
+    assert_banner()
+    assert_details("evaluations while idle", 1, idle_evaluations)
+    assert(idle_evaluations == 1)
+    assert_details("status while idle", py_trees.common.Status.FAILURE, idle_status)
+    assert(idle_status == py_trees.common.Status.FAILURE)
+    assert_details("status after write", py_trees.common.Status.SUCCESS, check.status)
+    assert(check.status == py_trees.common.Status.SUCCESS)
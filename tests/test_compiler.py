@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import random
+
+import pytest
+
+import py_trees
+import py_trees.console as console
+
+import hugr.compiler
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+class Scripted(py_trees.behaviour.Behaviour):
+    """Returns a pre-generated sequence of statuses, logging its calls."""
+    def __init__(self, name, statuses, log):
+        super().__init__(name=name)
+        self.statuses = statuses
+        self.log = log
+        self.count = 0
+
+    def initialise(self):
+        self.log.append((self.name, "initialise"))
+
+    def update(self):
+        status = self.statuses[self.count % len(self.statuses)]
+        self.count += 1
+        return status
+
+    def terminate(self, new_status):
+        self.log.append((self.name, "terminate", new_status))
+
+
+class Recorder(py_trees.visitors.VisitorBase):
+    def __init__(self, log):
+        super().__init__(full=False)
+        self.log = log
+
+    def run(self, behaviour):
+        self.log.append((behaviour.name, "visit", behaviour.status))
+
+
+def create_tree(seed, log):
+    rng = random.Random(seed)
+    statuses = [py_trees.common.Status.SUCCESS, py_trees.common.Status.FAILURE, py_trees.common.Status.RUNNING]
+    counter = [0]
+
+    def name():
+        counter[0] += 1
+        return "B{}".format(counter[0])
+
+    def create(depth):
+        if depth == 0 or rng.random() < 0.3:
+            return Scripted(name(), [rng.choice(statuses) for unused_i in range(5)], log)
+        children = [create(depth - 1) for unused_i in range(rng.randint(1, 3))]
+        kind = rng.randrange(5)
+        if kind == 0:
+            return py_trees.composites.Sequence(name=name(), memory=rng.random() < 0.5, children=children)
+        elif kind == 1:
+            return py_trees.composites.Selector(name=name(), memory=rng.random() < 0.5, children=children)
+        elif kind == 2:
+            policy = rng.choice([
+                py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=rng.random() < 0.5),
+                py_trees.common.ParallelPolicy.SuccessOnOne(),
+            ])
+            return py_trees.composites.Parallel(name=name(), policy=policy, children=children)
+        elif kind == 3:
+            return py_trees.decorators.Inverter(name=name(), child=children[0])
+        return py_trees.decorators.SuccessIsRunning(name=name(), child=children[0])
+
+    return py_trees.composites.Sequence(name="Root", memory=False, children=[create(4) for unused_i in range(3)])
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_compiled_tick_matches_generators():
+    console.banner("Compiled Tick Matches Generators")
+    if not hugr.compiler.supported():
+        pytest.skip("py_trees {} isn't supported by the compiler".format(py_trees.version.__version__))
+    mismatches = []
+    for seed in range(50):
+        expected = []
+        root = create_tree(seed, expected)
+        for unused_i in range(10):
+            for node in root.tick():
+                node.visit(Recorder(expected))
+        result = []
+        root = create_tree(seed, result)
+        program = hugr.compiler.compile_tree(root)
+        for unused_i in range(10):
+            program.tick(visitors=[Recorder(result)])
+        if result != expected:
+            mismatches.append(seed)
+    assert_banner()
+    assert_details("mismatched seeds", [], mismatches)
+    assert(mismatches == [])
+
+
+def test_supported_versions():
+    console.banner("Supported Versions")
+    assert_banner()
+    for version, expected in [("2.2.3", True), ("2.2.0", True), ("2.1.6", False), ("2.3.0", False)]:
+        assert_details(version, expected, hugr.compiler.supported(version))
+        assert(hugr.compiler.supported(version) == expected)
+
+
+def test_compiled_program_validity():
+    console.banner("Compiled Program Validity")
+    root = py_trees.composites.Selector(name="Root", memory=False, children=[py_trees.behaviours.Success(name="Idle")])
+    program = hugr.compiler.Program(root)
+    valid_before = program.valid()
+    root.add_child(py_trees.behaviours.Running(name="Job"))
+    assert_banner()
+    assert_details("valid before", True, valid_before)
+    assert(valid_before)
+    assert_details("valid after insertion", False, program.valid())
+    assert(not program.valid())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.composites
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+class Peek(py_trees.behaviour.Behaviour):
+    """Records what's on the blackboard when it ticks."""
+    def __init__(self, name, key):
+        super().__init__(name=name)
+        self.key = key
+        self.seen = []
+
+    def update(self):
+        self.seen.append(py_trees.blackboard.Blackboard.storage.get(self.key, None))
+        return py_trees.common.Status.SUCCESS
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_data_gathering():
+    console.banner("Data Gathering")
+    py_trees.blackboard.Blackboard.clear()
+    waiting = py_trees.behaviours.Running(name="Waiting")
+    counter = py_trees.behaviours.SetBlackboardVariable(
+        name="Counter", variable_name="count", variable_value=1, overwrite=True
+    )
+    peek = Peek(name="Peek", key="/count")
+    gathering = hugr.composites.DataGathering(children=[waiting, counter, peek])
+    root = py_trees.composites.Sequence(name="Root", memory=False, children=[gathering])
+    tree = py_trees.trees.BehaviourTree(root=root)
+    tree.tick()
+    tree.tick()
+    statistics = gathering.statistics()
+
+    assert_banner()
+    assert_details("status", py_trees.common.Status.RUNNING, gathering.status)
+    assert(gathering.status == py_trees.common.Status.RUNNING)
+    assert_details("not held up", py_trees.common.Status.SUCCESS, counter.status)
+    assert(counter.status == py_trees.common.Status.SUCCESS)
+    assert_details("batched (seen by peek)", [None, 1], peek.seen)
+    assert(peek.seen == [None, 1])
+    assert_details("committed", 1, py_trees.blackboard.Blackboard.storage["/count"])
+    assert(py_trees.blackboard.Blackboard.storage["/count"] == 1)
+    assert_details("costs", 2, statistics["Counter"]["count"])
+    assert(statistics["Counter"]["count"] == 2)
+
+
+class PeekVisitor(py_trees.visitors.VisitorBase):
+    """Records what's on the blackboard as it visits."""
+    def __init__(self, key):
+        super().__init__(full=False)
+        self.key = key
+        self.seen = {}
+
+    def run(self, behaviour):
+        self.seen[behaviour.name] = py_trees.blackboard.Blackboard.storage.get(self.key, None)
+
+
+def test_data_gathering_visitors_run_in_the_batch():
+    console.banner("Data Gathering - Visitors")
+    py_trees.blackboard.Blackboard.clear()
+    counter = py_trees.behaviours.SetBlackboardVariable(
+        name="Counter", variable_name="count", variable_value=1, overwrite=True
+    )
+    gathering = hugr.composites.DataGathering(children=[counter])
+    root = py_trees.composites.Sequence(name="Root", memory=False, children=[gathering])
+    tree = py_trees.trees.BehaviourTree(root=root)
+    visitor = PeekVisitor(key="/count")
+    tree.visitors.append(visitor)
+    tree.tick()
+
+    assert_banner()
+    assert_details("gatherer visited in the batch", None, visitor.seen["Counter"])
+    assert(visitor.seen["Counter"] is None)
+    assert_details("composite visited after commit", 1, visitor.seen["Topics2BB"])
+    assert(visitor.seen["Topics2BB"] == 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.critical_path
+import hugr.tracing
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+def running_then(name, ticks, status=py_trees.common.Status.SUCCESS):
+    return py_trees.behaviours.StatusQueue(
+        name=name, queue=[py_trees.common.Status.RUNNING] * ticks + [status], eventually=None
+    )
+
+
+def trace_scan():
+    """
+    Ticks once a second (instantly): UnDock ticks 0-2 (its goal's result
+    arrives at 1.3s), Move Out 2-5, Scanning 5-7 (Rotate finishes, Flash
+    Blue is stopped), then Dock 7-8.
+    """
+    clock = {'time': 0.0}
+    tracer = hugr.tracing.Tracer(now=lambda: clock['time'])
+    tracer.enable()
+    scanning = py_trees.composites.Parallel(
+        name="Scanning",
+        policy=py_trees.common.ParallelPolicy.SuccessOnOne(),
+        children=[running_then("Rotate", 2), py_trees.behaviours.Running(name="Flash Blue")]
+    )
+    root = py_trees.composites.Sequence(
+        name="Scan", memory=True,
+        children=[running_then("UnDock", 2), running_then("Move Out", 3), scanning, running_then("Dock", 1)]
+    )
+    tree = py_trees.trees.BehaviourTree(root=root)
+    activation_tracer = hugr.tracing.ActivationTracer(tracer=tracer)
+    tree.visitors.append(activation_tracer)
+    goal_id = tracer.next_id()
+    tracer.async_event('b', "dock", "action", goal_id, stamp=0.0, args={'behaviour': "UnDock"})
+    tracer.async_event('n', "accepted", "action", goal_id, stamp=0.1)
+    tracer.async_event('e', "dock", "action", goal_id, stamp=1.3, args={'outcome': "STATUS_SUCCEEDED"})
+    for tick in range(9):
+        clock['time'] = float(tick)
+        tree.tick()
+    return tracer.trace()['traceEvents']
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_critical_path():
+    console.banner("Critical Path")
+    timeline = hugr.critical_path.Timeline(trace_scan())
+    jobs = timeline.jobs("Scan")
+    steps = [(step.name, step.depth, step.duration) for step in jobs[0].steps]
+
+    assert_banner()
+    assert_details("jobs", 1, len(jobs))
+    assert(len(jobs) == 1)
+    assert_details("duration", 8.0, jobs[0].duration)
+    assert(jobs[0].duration == 8.0)
+    assert_details("period", 1.0, timeline.period)
+    assert(timeline.period == 1.0)
+    expected = [("UnDock", 0, 2.0), ("Move Out", 0, 3.0), ("Scanning", 0, 2.0), ("Rotate", 1, 2.0), ("Dock", 0, 1.0)]
+    assert_details("steps", expected, steps)
+    assert(steps == expected)
+    assert_details("latency", 0.7, round(jobs[0].steps[0].latency, 6))
+    assert(round(jobs[0].steps[0].latency, 6) == 0.7)
+    assert_details("waiting", 0.7, round(hugr.critical_path.waiting(jobs[0]), 6))
+    assert(round(hugr.critical_path.waiting(jobs[0]), 6) == 0.7)
+
+
+def test_suggestions():
+    console.banner("Suggestions")
+    timeline = hugr.critical_path.Timeline(trace_scan())
+    job = timeline.jobs("Scan")[0]
+    results = hugr.critical_path.suggestions(job, timeline.period, target_period=0.5, top=2)
+    savings = [round(suggestion.saving, 6) for suggestion in results]
+    descriptions = [suggestion.description for suggestion in results]
+
+    assert_banner()
+    assert_details("savings", [2.0, 2.0, 0.35], savings)
+    assert(savings == [2.0, 2.0, 0.35])
+    assert_details("overlap", True, "overlap 'UnDock' with 'Move Out' (under 'Scan')" in descriptions)
+    assert("overlap 'UnDock' with 'Move Out' (under 'Scan')" in descriptions)
+    assert_details("faster ticking", True, descriptions[-1].startswith("tick every 0.500s"))
+    assert(descriptions[-1].startswith("tick every 0.500s"))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.display
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+def create_tree():
+    counter = py_trees.behaviours.StatusQueue(
+        name="Counter",
+        queue=[py_trees.common.Status.RUNNING] * 2 + [py_trees.common.Status.SUCCESS],
+        eventually=None
+    )
+    idle = py_trees.behaviours.Success(name="Idle")
+    root = py_trees.composites.Sequence(name="Root", memory=True, children=[counter, idle])
+    return py_trees.trees.BehaviourTree(root=root)
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_differential_display():
+    console.banner("Differential Display")
+    tree = create_tree()
+    display = hugr.display.DifferentialDisplay(unicode=False)
+    tree.add_post_tick_handler(display.record)
+    tree.tick()
+    first = display.flush()
+    tree.tick()
+    unchanged = display.flush()
+    tree.tick()
+    tree.tick()
+    folded = display.flush()
+    tree.prune_subtree(tree.root.children[-1].id)
+    tree.tick()
+    pruned = display.flush()
+
+    assert_banner()
+    assert_details("first: everything", 3, len(first))
+    assert(len(first) == 3)
+    assert_details("first: new", True, all("(new) -> " in line for line in first))
+    assert(all("(new) -> " in line for line in first))
+    assert_details("unchanged", [], unchanged)
+    assert(unchanged == [])
+    assert_details("folded", 3, len(folded))
+    assert(len(folded) == 3)
+    assert_details("counter (flickered)", True, "Counter: RUNNING -> RUNNING (2 changes)" in folded[0])
+    assert("Counter: RUNNING -> RUNNING (2 changes)" in folded[0])
+    assert_details("pruned", True, any("Idle: INVALID -> (pruned)" in line for line in pruned))
+    assert(any("Idle: INVALID -> (pruned)" in line for line in pruned))
+
+
+def test_rate_limit():
+    console.banner("Rate Limit")
+    tree = create_tree()
+    printed = []
+    display = hugr.display.DifferentialDisplay(period=60.0, max_lines=2, printer=printed.append)
+    tree.add_post_tick_handler(display.record)
+    display.start()
+    for unused_i in range(5):
+        tree.tick()
+    nothing_yet = list(printed)
+    display.stop()
+    lines = printed[0].splitlines() if printed else []
+
+    assert_banner()
+    assert_details("nothing within the period", [], nothing_yet)
+    assert(nothing_yet == [])
+    assert_details("printed on stop", 1, len(printed))
+    assert(len(printed) == 1)
+    assert_details("lines", 3, len(lines))
+    assert(len(lines) == 3)
+    assert_details("truncated", "... and 1 more", lines[-1])
+    assert(lines[-1] == "... and 1 more")
@@ -9,6 +9,8 @@
 # Imports
 ##############################################################################
 
+import pytest
+
 import py_trees
 import py_trees.console as console
 import hugr
@@ -32,6 +34,9 @@ def assert_details(text, expected, result):
           console.reset)
 
 
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
 def setup_module(module):
     console.banner("ROS Init")
     rclpy.init()
@@ -43,12 +48,9 @@ def teardown_module(module):
 
 
 def timeout():
+    # simulated seconds
     return 3.0
 
-
-def number_of_iterations():
-    return 40
-
 ##############################################################################
 # Tests
 ##############################################################################
@@ -63,31 +65,30 @@ def test_led_strip():
     flash_led_strip.setup(node=tree_node)
 
     executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
-    executor.add_node(mock_led_strip.node)
-    executor.add_node(tree_node)
+    clock = hugr.mock.clock.SimulatedClock(executor)
+    clock.add_node(mock_led_strip.node)
+    clock.add_node(tree_node)
 
     assert_banner()
 
     # send flashing led
-    spin_iterations = 0
-    while spin_iterations < number_of_iterations() and flash_led_strip.colour not in mock_led_strip.last_text:
+    def flashing():
         flash_led_strip.tick_once()
-        executor.spin_once(timeout_sec=0.05)
-        spin_iterations += 1
+        return flash_led_strip.colour in mock_led_strip.last_text
+
+    clock.spin_until(flashing, timeout=timeout())
 
     assert_details("flashing", flash_led_strip.colour, flash_led_strip.colour if flash_led_strip.colour in mock_led_strip.last_text else mock_led_strip.last_text)
     assert(flash_led_strip.colour in mock_led_strip.last_text)
 
     # cancel
     flash_led_strip.stop(new_status=py_trees.common.Status.INVALID)
-    spin_iterations = 0
-    while spin_iterations < number_of_iterations() and mock_led_strip.last_text:
-        executor.spin_once(timeout_sec=0.05)
-        spin_iterations += 1
+    clock.spin_until(lambda: not mock_led_strip.last_text, timeout=timeout())
 
     assert_details("cancelled", "", mock_led_strip.last_text)
     assert("" == mock_led_strip.last_text)
 
+    clock.shutdown()
     executor.shutdown()
     tree_node.destroy_node()
     mock_led_strip.node.destroy_node()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import json
+
+import pytest
+
+import py_trees.console as console
+import rclpy
+import rclpy.executors
+
+import hugr.mock as mock
+import hugr.mock.load_generator as load_generator
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
+def setup_module(module):
+    console.banner("ROS Init")
+    rclpy.init()
+
+
+def teardown_module(module):
+    console.banner("ROS Shutdown")
+    rclpy.shutdown()
+
+
+def timeout():
+    # simulated seconds
+    return 10.0
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_empty_summary():
+    console.banner("Empty Summary")
+    # statistics are shared via the metrics registry, keep clear of other tests' labels
+    summary = {'dock': load_generator.Statistics("unloaded").summary()}
+    load_generator.print_summary(summary)
+    serialised = json.loads(load_generator.to_json(summary))
+
+    assert_banner()
+    assert_details("count", 0, serialised['dock']['latencies']['result']['count'])
+    assert(serialised['dock']['latencies']['result']['count'] == 0)
+    assert_details("undefined mean", None, serialised['dock']['latencies']['result']['mean'])
+    assert(serialised['dock']['latencies']['result']['mean'] is None)
+
+
+def test_cancelled_load():
+    console.banner("Cancelled Load")
+    server = mock.dock.Dock(duration=5.0, max_concurrent_goals=1, policy="queue")
+    statistics = load_generator.Statistics("dock")
+    client = load_generator.LoadClient(
+        node_name="dock_load_client",
+        action_name="dock",
+        rate=4.0,
+        statistics=statistics,
+        cancel_probability=1.0,
+        cancel_after=0.0,
+        seed=0
+    )
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=8)
+    clock = mock.clock.SimulatedClock(executor)
+    clock.add_node(server.node)
+    clock.add_node(client.node)
+    clock.spin_until(client.action_client.server_is_ready, timeout=timeout())
+
+    client.start()
+    clock.advance(1.0)
+    client.stop()
+    drained = clock.spin_until(lambda: client.in_flight() == 0, timeout=timeout())
+    summary = statistics.summary()
+
+    assert_banner()
+    assert_details("drained", True, drained)
+    assert(drained)
+    assert_details("accepted", ">0", summary['latencies']['accept']['count'])
+    assert(summary['latencies']['accept']['count'] > 0)
+    # every goal is cancelled long before the executing one could finish,
+    # including those still waiting in the server's queue
+    assert_details("outcomes", {'canceled': summary['latencies']['accept']['count']}, summary['outcomes'])
+    assert(summary['outcomes'] == {'canceled': summary['latencies']['accept']['count']})
+    assert_details("results", summary['latencies']['accept']['count'], summary['latencies']['result']['count'])
+    assert(summary['latencies']['result']['count'] == summary['latencies']['accept']['count'])
+
+    clock.shutdown()
+    executor.shutdown()
+    server.shutdown()
+    client.shutdown()
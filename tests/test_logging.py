@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import threading
+
+import py_trees.console as console
+
+import hugr.logging
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_lazy_formatting():
+    console.banner("Lazy Formatting")
+    records = []
+    threads = []
+    logger = hugr.logging.get_logger("test", sink=records.append)
+
+    def expensive():
+        threads.append(threading.current_thread())
+        return "formatted"
+
+    logger.info("feedback: {}", expensive, goal=3)
+    hugr.logging.dispatcher().flush()
+
+    assert_banner()
+    assert_details("message", "feedback: formatted", records[0].message)
+    assert(records[0].message == "feedback: formatted")
+    assert_details("fields", {'goal': 3}, records[0].fields)
+    assert(records[0].fields == {'goal': 3})
+    assert_details("text", "feedback: formatted [goal=3]", hugr.logging.text(records[0]))
+    assert(hugr.logging.text(records[0]) == "feedback: formatted [goal=3]")
+    assert_details("formatted off the caller", True, threads[0] is not threading.current_thread())
+    assert(threads[0] is not threading.current_thread())
+
+
+def test_mutable_arguments():
+    console.banner("Mutable Arguments")
+    records = []
+    logger = hugr.logging.get_logger("test", sink=records.append)
+    colours = ["red"]
+    logger.info("colours: {}, brightness: {:.1f}", colours, 0.25)
+    colours.append("blue")
+    hugr.logging.dispatcher().flush()
+
+    assert_banner()
+    assert_details("message", "colours: ['red'], brightness: 0.2", records[0].message)
+    assert(records[0].message == "colours: ['red'], brightness: 0.2")
+
+
+def test_rate_limit():
+    console.banner("Rate Limit")
+    records = []
+    logger = hugr.logging.get_logger("test", sink=records.append)
+    for i in range(5):
+        logger.info("colour '{}'", i, period=60.0)
+    logger.last_emitted["colour '{}'"] -= 60.0
+    logger.info("colour '{}'", 5, period=60.0)
+    hugr.logging.dispatcher().flush()
+    messages = [record.message for record in records]
+
+    assert_banner()
+    assert_details("emitted", ["colour '0'", "colour '5' [4 similar suppressed]"], messages)
+    assert(messages == ["colour '0'", "colour '5' [4 similar suppressed]"])
+
+
+def test_binary_sink(tmp_path):
+    console.banner("Binary Sink")
+    path = str(tmp_path / "log.bin")
+    hugr.logging.configure(binary_path=path)
+    logger = hugr.logging.get_logger("led_strip", sink=lambda record: None)
+    logger.warning("unsupported colour '{}'", "pink", colour="pink")
+    logger.info("{}", "ok")
+    logger.info("{} {}", "missing an argument")  # doesn't stop the dispatcher
+    logger.info("done")
+    hugr.logging.dispatcher().stop()
+    records = list(hugr.logging.read_binary(path))
+    errors = hugr.logging.dispatcher().errors
+    hugr.logging.configure()
+
+    assert_banner()
+    assert_details("records", 3, len(records))
+    assert(len(records) == 3)
+    assert_details("level", hugr.logging.WARNING, records[0].level)
+    assert(records[0].level == hugr.logging.WARNING)
+    assert_details("name", "led_strip", records[0].name)
+    assert(records[0].name == "led_strip")
+    assert_details("message", "unsupported colour 'pink'", records[0].message)
+    assert(records[0].message == "unsupported colour 'pink'")
+    assert_details("fields", {'colour': 'pink'}, records[0].fields)
+    assert(records[0].fields == {'colour': 'pink'})
+    assert_details("errors", 1, errors)
+    assert(errors == 1)
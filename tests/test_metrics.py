@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import urllib.request
+
+import py_trees.console as console
+
+import hugr.metrics
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_exposition():
+    console.banner("Exposition")
+    registry = hugr.metrics.Registry()
+    registry.counter("hugr_jobs_total", help="jobs, by outcome", labels={'outcome': 'accepted'}).inc(2)
+    registry.counter("hugr_jobs_total", labels={'outcome': 'accepted'}).inc()
+    registry.gauge("hugr_goals_queued", labels={'action': 'say "hi"\n'}, function=lambda: 3)
+    histogram = registry.histogram("hugr_latency_seconds", buckets=[0.1, 1.0])
+    for value in [0.05, 0.5, 5.0]:
+        histogram.observe(value)
+    lines = registry.exposition().splitlines()
+
+    assert_banner()
+    for line in [
+        '# HELP hugr_jobs_total jobs, by outcome',
+        '# TYPE hugr_jobs_total counter',
+        'hugr_jobs_total{outcome="accepted"} 3.0',
+        'hugr_goals_queued{action="say \\"hi\\"\\n"} 3.0',
+        'hugr_latency_seconds_bucket{le="0.1"} 1',
+        'hugr_latency_seconds_bucket{le="1.0"} 2',
+        'hugr_latency_seconds_bucket{le="+Inf"} 3',
+        'hugr_latency_seconds_sum 5.55',
+        'hugr_latency_seconds_count 3',
+    ]:
+        assert_details(line, True, line in lines)
+        assert(line in lines)
+
+
+def test_registration():
+    console.banner("Registration")
+    registry = hugr.metrics.Registry()
+    counter = registry.register(hugr.metrics.Counter("ticks"), name="hugr_tree_ticks_total", labels={'tree': '/a'})
+    try:
+        registry.register(hugr.metrics.Gauge("hugr_tree_ticks_total"))
+        conflict = None
+    except ValueError as e:
+        conflict = e
+    registry.unregister(counter)
+    registry.register(hugr.metrics.Gauge("hugr_tree_ticks_total"))  # free again
+
+    assert_banner()
+    assert_details("type conflict", "ValueError", type(conflict).__name__)
+    assert(isinstance(conflict, ValueError))
+    assert_details("unregistered", True, "tree=" not in registry.exposition())
+    assert("tree=" not in registry.exposition())
+
+
+def test_server():
+    console.banner("Server")
+    registry = hugr.metrics.Registry()
+    registry.counter("hugr_messages_published_total", labels={'topic': 'state'}).inc()
+    server = hugr.metrics.MetricsServer(port=0, registry=registry)
+    try:
+        with urllib.request.urlopen("http://127.0.0.1:{}/metrics".format(server.port)) as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+
+    assert_banner()
+    assert_details("content type", "text/plain", content_type.split(";")[0])
+    assert(content_type.split(";")[0] == "text/plain")
+    assert_details("scraped", True, 'hugr_messages_published_total{topic="state"} 1.0' in body)
+    assert('hugr_messages_published_total{topic="state"} 1.0' in body)
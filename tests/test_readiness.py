@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import pytest
+
+import py_trees.console as console
+import hugr
+import rclpy
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
+def setup_module(module):
+    console.banner("ROS Init")
+    rclpy.init()
+
+
+def teardown_module(module):
+    console.banner("ROS Shutdown")
+    rclpy.shutdown()
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_readiness_barrier():
+    console.banner("Readiness Barrier")
+
+    battery = hugr.mock.battery.Battery()
+    docking = hugr.mock.dock.Dock()
+    # latched, so reports from nodes that came up before the wait began still arrive
+    reports = hugr.mock.readiness.wait_until_ready(
+        node_names=["battery", "docking_controller", "led_strip"],
+        timeout=2.0
+    )
+    for line in hugr.mock.bringup_profiler.waterfall(reports):
+        print(line)
+
+    assert_banner()
+    assert_details("reports", "['battery', 'docking_controller']", sorted(reports.keys()))
+    assert(sorted(reports.keys()) == ["battery", "docking_controller"])
+    for name, report in reports.items():
+        stamps = report['stamps']
+        assert_details(name + " node < endpoints", True, stamps['node_created'] <= stamps['endpoints_ready'])
+        assert(stamps['node_created'] <= stamps['endpoints_ready'])
+    battery.shutdown()
+    docking.shutdown()
+
+
+def test_namespaced_readiness_barrier():
+    console.banner("Namespaced Readiness Barrier")
+
+    node = rclpy.create_node("battery", namespace="robot")
+    readiness = hugr.mock.readiness.Readiness(node)
+    readiness.ready()
+    elsewhere = hugr.mock.readiness.wait_until_ready(node_names=["battery"], timeout=0.5)
+    reports = hugr.mock.readiness.wait_until_ready(node_names=["battery"], timeout=2.0, namespace="robot")
+
+    assert_banner()
+    assert_details("outside the namespace", "[]", sorted(elsewhere.keys()))
+    assert(sorted(elsewhere.keys()) == [])
+    assert_details("reports", "['battery']", sorted(reports.keys()))
+    assert(sorted(reports.keys()) == ["battery"])
+    assert_details("node", "/robot/battery", reports["battery"]['node'])
+    assert(reports["battery"]['node'] == "/robot/battery")
+    node.destroy_node()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import os
+
+import py_trees
+import py_trees.console as console
+
+import hugr.recorder
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+def create_tree():
+    counter = py_trees.behaviours.StatusQueue(
+        name="Counter",
+        queue=[py_trees.common.Status.RUNNING] * 2 + [py_trees.common.Status.SUCCESS],
+        eventually=None
+    )
+    setter = py_trees.behaviours.SetBlackboardVariable(
+        name="Setter", variable_name="flag", variable_value=True, overwrite=True
+    )
+    idle = py_trees.behaviours.Success(name="Idle")
+    root = py_trees.composites.Sequence(name="Root", memory=True, children=[counter, setter, idle])
+    return py_trees.trees.BehaviourTree(root=root)
+
+
+def read(directory):
+    records = []
+    for path in hugr.recorder.segment_paths(directory):
+        segment = hugr.recorder.Segment(path)
+        records.extend(segment.ticks())
+        segment.close()
+    return records
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_deltas(tmp_path):
+    console.banner("Deltas")
+    py_trees.blackboard.Blackboard.clear()
+    directory = str(tmp_path)
+    tree = create_tree()
+    tick_recorder = hugr.recorder.TickRecorder(directory=directory, now=lambda: 42.0)
+    tree.add_post_tick_handler(tick_recorder.record)
+    for unused_i in range(4):
+        tree.tick()
+    tick_recorder.close()
+    segment = hugr.recorder.Segment(hugr.recorder.segment_paths(directory)[0])
+    names = [behaviour['name'] for behaviour in segment.behaviours]
+    records = list(segment.ticks())
+    segment.close()
+    first = {names[index]: status for index, status, unused_message in records[0].behaviours}
+    changed = [{names[index] for index, unused_status, unused_message in record.behaviours} for record in records]
+
+    assert_banner()
+    assert_details("behaviours", ["Counter", "Setter", "Idle", "Root"], names)
+    assert(names == ["Counter", "Setter", "Idle", "Root"])
+    assert_details("parent", 3, segment.behaviours[0]['parent'])
+    assert(segment.behaviours[0]['parent'] == 3)
+    assert_details("ticks", [0, 1, 2, 3], [record.tick for record in records])
+    assert([record.tick for record in records] == [0, 1, 2, 3])
+    assert_details("stamp", 42.0, records[0].stamp)
+    assert(records[0].stamp == 42.0)
+    assert_details("first tick: everything", 4, len(first))
+    assert(len(first) == 4)
+    assert_details("first tick: counter", py_trees.common.Status.RUNNING, first["Counter"])
+    assert(first["Counter"] == py_trees.common.Status.RUNNING)
+    assert_details("second tick: unchanged", set(), changed[1])
+    assert(changed[1] == set())
+    assert_details("third tick: changed", {"Counter", "Setter", "Idle", "Root"}, changed[2])
+    assert(changed[2] == {"Counter", "Setter", "Idle", "Root"})
+    assert_details("blackboard (third tick)", [("/flag", "True")], records[2].blackboard)
+    assert(records[2].blackboard == [("/flag", "True")])
+    assert_details("blackboard (fourth tick)", [], records[3].blackboard)
+    assert(records[3].blackboard == [])
+
+
+def test_rotation(tmp_path):
+    console.banner("Rotation")
+    py_trees.blackboard.Blackboard.clear()
+    directory = str(tmp_path)
+    tree = create_tree()
+    tick_recorder = hugr.recorder.TickRecorder(directory=directory, segment_size=64 * 1024, max_segments=2)
+    tree.add_post_tick_handler(tick_recorder.record)
+    for i in range(5000):
+        tree.root.children[2].feedback_message = "tick {}".format(i)
+        tree.tick()
+    tick_recorder.close()
+    paths = hugr.recorder.segment_paths(directory)
+    records = read(directory)
+    ticks = [record.tick for record in records]
+
+    assert_banner()
+    assert_details("segments", 2, len(paths))
+    assert(len(paths) == 2)
+    assert_details("oldest deleted", True, not paths[0].endswith("000000.hugrlog"))
+    assert(not paths[0].endswith("000000.hugrlog"))
+    assert_details("truncated", True, os.path.getsize(paths[-1]) < 64 * 1024)
+    assert(os.path.getsize(paths[-1]) < 64 * 1024)
+    assert_details("last tick", 4999, ticks[-1])
+    assert(ticks[-1] == 4999)
+    assert_details("contiguous", True, ticks == list(range(ticks[0], 5000)))
+    assert(ticks == list(range(ticks[0], 5000)))
+
+
+def test_shape_change(tmp_path):
+    console.banner("Shape Change")
+    py_trees.blackboard.Blackboard.clear()
+    directory = str(tmp_path)
+    tree = create_tree()
+    tick_recorder = hugr.recorder.TickRecorder(directory=directory)
+    tree.add_post_tick_handler(tick_recorder.record)
+    tree.tick()
+    tree.insert_subtree(py_trees.behaviours.Success(name="Inserted"), tree.root.id, 0)
+    tree.tick()
+    tick_recorder.close()
+    paths = hugr.recorder.segment_paths(directory)
+    segment = hugr.recorder.Segment(paths[-1])
+    names = [behaviour['name'] for behaviour in segment.behaviours]
+    records = list(segment.ticks())
+    segment.close()
+
+    assert_banner()
+    assert_details("segments", 2, len(paths))
+    assert(len(paths) == 2)
+    assert_details("inserted", True, "Inserted" in names)
+    assert("Inserted" in names)
+    assert_details("keyframe", len(names), len(records[0].behaviours))
+    assert(len(records[0].behaviours) == len(names))
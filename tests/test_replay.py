@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.recorder
+import hugr.replay
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+def record(directory, ticks, segment_size=16 * 1024 * 1024):
+    """
+    Rotate runs for three ticks then succeeds, Battery Low? alternates
+    between running and succeeding every four ticks. Ticks are half a second apart.
+    """
+    py_trees.blackboard.Blackboard.clear()
+    battery_low = py_trees.behaviours.StatusQueue(
+        name="Battery Low?",
+        queue=[py_trees.common.Status.RUNNING] * 4 + [py_trees.common.Status.SUCCESS] * 4,
+        eventually=None
+    )
+    rotate = py_trees.behaviours.StatusQueue(
+        name="Rotate",
+        queue=[py_trees.common.Status.RUNNING] * 3 + [py_trees.common.Status.SUCCESS],
+        eventually=None
+    )
+    counter = py_trees.behaviours.SetBlackboardVariable(
+        name="Flag", variable_name="flag", variable_value=True, overwrite=True
+    )
+    root = py_trees.composites.Parallel(
+        name="Root",
+        policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False),
+        children=[battery_low, rotate, counter, py_trees.behaviours.Running(name="Idle")]
+    )
+    tree = py_trees.trees.BehaviourTree(root=root)
+    tick_recorder = hugr.recorder.TickRecorder(
+        directory=directory, segment_size=segment_size, now=lambda: 0.5 * tree.count
+    )
+    tree.add_post_tick_handler(tick_recorder.record)
+    for unused_i in range(ticks):
+        tree.tick()
+    tick_recorder.close()
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_queries(tmp_path):
+    console.banner("Queries")
+    record(str(tmp_path), ticks=16)
+    log = hugr.replay.TickLog(str(tmp_path))
+    intervals = log.intervals("Battery Low?", py_trees.common.Status.RUNNING)
+    activations = log.activations("Rotate")
+    rendering = log.render(2, show_blackboard=True)
+    log.close()
+
+    assert_banner()
+    assert_details("ticks", list(range(16)), list(log.ticks))
+    assert(list(log.ticks) == list(range(16)))
+    assert_details("running intervals", [(0, 3), (8, 11)], [(i.start, i.end) for i in intervals])
+    assert([(i.start, i.end) for i in intervals] == [(0, 3), (8, 11)])
+    assert_details("interval stamps", (0.0, 1.5), (intervals[0].start_stamp, intervals[0].end_stamp))
+    assert((intervals[0].start_stamp, intervals[0].end_stamp) == (0.0, 1.5))
+    assert_details("activations", [(0, 3), (4, 7), (8, 11), (12, 15)], [(a.start, a.end) for a in activations])
+    assert([(a.start, a.end) for a in activations] == [(0, 3), (4, 7), (8, 11), (12, 15)])
+    assert_details("activation duration", 1.5, activations[0].duration)
+    assert(activations[0].duration == 1.5)
+    assert_details("activation outcome", py_trees.common.Status.SUCCESS, activations[0].outcome)
+    assert(activations[0].outcome == py_trees.common.Status.SUCCESS)
+    assert_details("rendered", True, "Rotate [*]" in rendering)
+    assert("Rotate [*]" in rendering)
+    assert_details("rendered blackboard", True, "/flag: True" in rendering)
+    assert("/flag: True" in rendering)
+
+
+def test_segments(tmp_path):
+    console.banner("Across Segments")
+    record(str(tmp_path), ticks=6000, segment_size=64 * 1024)
+    log = hugr.replay.TickLog(str(tmp_path))
+    intervals = log.intervals("Battery Low?", py_trees.common.Status.RUNNING)
+    activations = log.activations("Rotate")
+    state = {state.name: state.status for state in log.state(5999)}
+    tick = log.tick_at(1000.2)
+    segments = len(log.segments)
+    log.close()
+
+    assert_banner()
+    assert_details("segments", ">1", segments)
+    assert(segments > 1)
+    assert_details("running intervals", 750, len(intervals))
+    assert(len(intervals) == 750)
+    assert_details("all four ticks", True, all(i.end - i.start == 3 for i in intervals))
+    assert(all(i.end - i.start == 3 for i in intervals))
+    assert_details("activations", 1500, len(activations))
+    assert(len(activations) == 1500)
+    assert_details("state", py_trees.common.Status.SUCCESS, state["Battery Low?"])
+    assert(state["Battery Low?"] == py_trees.common.Status.SUCCESS)
+    assert_details("tick at", 2000, tick)
+    assert(tick == 2000)
+
+
+def test_runs(tmp_path):
+    console.banner("Runs")
+    record(str(tmp_path), ticks=10)
+    record(str(tmp_path), ticks=5)
+    latest = hugr.replay.TickLog(str(tmp_path))
+    first = hugr.replay.TickLog(str(tmp_path), run=0)
+    runs = len(latest.runs)
+    ticks = (len(first.ticks), len(latest.ticks))
+    first.close()
+    latest.close()
+
+    assert_banner()
+    assert_details("runs", 2, runs)
+    assert(runs == 2)
+    assert_details("ticks", (10, 5), ticks)
+    assert(ticks == (10, 5))
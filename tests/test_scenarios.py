@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import pytest
+
+import py_trees.console as console
+import rclpy
+
+import hugr.eight_dynamic_application_loading as eight
+import hugr.mock as mock
+import hugr.seven_docking_cancelling_failing as seven
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
+def setup_module(module):
+    console.banner("ROS Init")
+    rclpy.init()
+
+
+def teardown_module(module):
+    console.banner("ROS Shutdown")
+    rclpy.shutdown()
+
+
+def timeout():
+    # simulated seconds
+    return 60.0
+
+
+def scan_result(scenario):
+    return scenario.blackboard("scan_result")
+
+
+def safety_sensors_enabled(scenario):
+    return scenario.robot.safety_sensors.node.get_parameter("enabled").value
+
+
+def print_history(scenario):
+    for time, name in scenario.history:
+        print(console.cyan + "  {:6.2f}s ".format(time) + console.yellow + name + console.reset)
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_seven_scan_succeeds():
+    console.banner("Seven - Scan Succeeds")
+    scenario = mock.robot.Scenario(root=seven.tutorial_create_root())
+    scenario.setup()
+    scenario.at(1.0, scenario.robot.press_scan)
+    done = scenario.run(until=lambda: scan_result(scenario) is not None, timeout=timeout())
+    print_history(scenario)
+
+    assert_banner()
+    assert_details("finished", True, done)
+    assert(done)
+    assert_details("scan_result", "succeeded", scan_result(scenario))
+    assert(scan_result(scenario) == "succeeded")
+    # scan (1s) + undock (2s) + move out (5s) + rotate (4s) + move home (5s),
+    # plus up to a tick's worth of quantisation per step
+    assert_details("duration", "[17, 30]", scenario.elapsed)
+    assert(17.0 <= scenario.elapsed <= 30.0)
+    scenario.shutdown()
+
+
+def test_seven_scan_cancelled():
+    console.banner("Seven - Scan Cancelled")
+    scenario = mock.robot.Scenario(root=seven.tutorial_create_root())
+    scenario.setup()
+    scenario.at(1.0, scenario.robot.press_scan)
+    scenario.at(6.0, scenario.robot.press_cancel)  # moving out
+    done = scenario.run(until=lambda: scan_result(scenario) is not None, timeout=timeout())
+    print_history(scenario)
+
+    assert_banner()
+    assert_details("finished", True, done)
+    assert(done)
+    assert_details("scan_result", "cancelled", scan_result(scenario))
+    assert(scan_result(scenario) == "cancelled")
+    scenario.shutdown()
+
+
+def test_seven_action_failure():
+    console.banner("Seven - Action Failure")
+    scenario = mock.robot.Scenario(root=seven.tutorial_create_root())
+    scenario.setup()
+    scenario.at(0.0, lambda: scenario.robot.fail("rotate"), name="fail rotate")
+    scenario.at(1.0, scenario.robot.press_scan)
+    done = scenario.run(until=lambda: scan_result(scenario) is not None, timeout=timeout())
+    print_history(scenario)
+
+    assert_banner()
+    assert_details("finished", True, done)
+    assert(done)
+    assert_details("scan_result", "failed", scan_result(scenario))
+    assert(scan_result(scenario) == "failed")
+    scenario.shutdown()
+
+
+def test_seven_battery_low():
+    console.banner("Seven - Battery Low")
+    scenario = mock.robot.Scenario(root=seven.tutorial_create_root())
+    scenario.setup()
+    scenario.at(1.0, lambda: scenario.robot.set_battery(10.0), name="battery drop")
+
+    def flashing_red():
+        return (
+            scenario.blackboard("battery_low_warning") and
+            "red" in scenario.robot.led_strip.last_text
+        )
+    done = scenario.run(until=flashing_red, timeout=10.0)
+    print_history(scenario)
+
+    assert_banner()
+    assert_details("flashing red", True, done)
+    assert(done)
+    scenario.shutdown()
+
+
+def test_eight_prefetched_context_switch():
+    console.banner("Eight - Prefetched Context Switch")
+    scenario = mock.robot.Scenario(tree=eight.DynamicApplicationTree(unicode_tree_debug=False, prefetch_context=True))
+    scenario.setup()
+    scenario.at(1.0, scenario.robot.press_scan)
+    switched = scenario.run(until=lambda: safety_sensors_enabled(scenario), timeout=timeout())
+    done = scenario.run(until=lambda: scan_result(scenario) is not None and not scenario.tree.busy(), timeout=timeout())
+    print_history(scenario)
+
+    assert_banner()
+    assert_details("switched", True, switched)
+    assert(switched)
+    assert_details("finished", True, done)
+    assert(done)
+    assert_details("scan_result", "succeeded", scan_result(scenario))
+    assert(scan_result(scenario) == "succeeded")
+    assert_details("rolled back", False, safety_sensors_enabled(scenario))
+    assert(not safety_sensors_enabled(scenario))
+    scenario.shutdown()
+
+
+def test_eight_prefetched_context_cancelled():
+    console.banner("Eight - Prefetched Context, Cancelled")
+    scenario = mock.robot.Scenario(tree=eight.DynamicApplicationTree(unicode_tree_debug=False, prefetch_context=True))
+    scenario.setup()
+    scenario.at(1.0, scenario.robot.press_scan)
+    scenario.at(6.0, scenario.robot.press_cancel)  # moving out, prefetched
+    enabled = []
+
+    def finished():
+        enabled.append(safety_sensors_enabled(scenario))
+        return scan_result(scenario) is not None and not scenario.tree.busy()
+    done = scenario.run(until=finished, timeout=timeout())
+    print_history(scenario)
+
+    assert_banner()
+    assert_details("finished", True, done)
+    assert(done)
+    assert_details("scan_result", "cancelled", scan_result(scenario))
+    assert(scan_result(scenario) == "cancelled")
+    assert_details("never switched", False, any(enabled))
+    assert(not any(enabled))
+    scenario.shutdown()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.snapshots
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+def summary(msg):
+    return sorted((bytes(b.own_id.uuid), b.status, b.message, b.is_active) for b in msg.behaviours)
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_delta_snapshots():
+    console.banner("Delta Snapshots")
+    tasks = py_trees.composites.Selector(name="Tasks", memory=False, children=[
+        py_trees.behaviours.SuccessEveryN(name="Every 3", n=3),
+        py_trees.behaviours.Running(name="Idle"),
+    ])
+    root = py_trees.composites.Parallel(
+        name="Root",
+        policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False),
+        children=[tasks, py_trees.behaviours.Running(name="Static")]
+    )
+    encoder = hugr.snapshots.DeltaEncoder(keyframe_period=10.0)
+    tree = py_trees.trees.BehaviourTree(root=root)
+    tree.visitors.append(encoder.visitor)
+    reconstructor = hugr.snapshots.Reconstructor()
+    sizes = []
+    mismatches = []
+    for count in range(12):
+        tree.tick()
+        keyframe, changed = encoder.encode(root, now=float(count))
+        reconstructor.apply(encoder.to_tree_msg(changed, count), keyframe=keyframe)
+        sizes.append((keyframe, len(changed)))
+        full = encoder.to_tree_msg(list(root.iterate()), count)
+        if summary(reconstructor.snapshot()) != summary(full):
+            mismatches.append(count)
+    tasks.add_child(py_trees.behaviours.Running(name="Job"))
+    tree.tick()
+    keyframe_after_insertion, unused_changed = encoder.encode(root, now=12.0)
+
+    assert_banner()
+    assert_details("first is a keyframe", (True, 5), sizes[0])
+    assert(sizes[0] == (True, 5))
+    assert_details("keyframes", 2, len([size for size in sizes if size[0]]))
+    assert(len([size for size in sizes if size[0]]) == 2)
+    assert_details("deltas are partial", True, all(size[1] <= 3 for size in sizes if not size[0]))
+    assert(all(size[1] <= 3 for size in sizes if not size[0]))
+    assert_details("reconstruction mismatches", [], mismatches)
+    assert(mismatches == [])
+    assert_details("keyframe after insertion", True, keyframe_after_insertion)
+    assert(keyframe_after_insertion)
+
+
+def test_lost_deltas():
+    console.banner("Lost Deltas")
+    root = py_trees.composites.Selector(name="Root", memory=False, children=[
+        py_trees.behaviours.SuccessEveryN(name="Every 2", n=2),
+        py_trees.behaviours.Running(name="Idle"),
+    ])
+    encoder = hugr.snapshots.DeltaEncoder(keyframe_period=10.0)
+    tree = py_trees.trees.BehaviourTree(root=root)
+    tree.visitors.append(encoder.visitor)
+    reconstructor = hugr.snapshots.Reconstructor()
+    applied = []
+    for count in range(6):
+        tree.tick()
+        keyframe, changed = encoder.encode(root, now=float(count))
+        if count == 2:
+            continue  # lost in transit
+        applied.append(reconstructor.apply(encoder.to_tree_msg(changed, count), keyframe=keyframe))
+    tree.tick()
+    keyframe, changed = encoder.encode(root, now=11.0)
+    applied.append(reconstructor.apply(encoder.to_tree_msg(changed, 6), keyframe=keyframe))
+
+    assert_banner()
+    assert_details("applied", [True, True, False, False, False, True], applied)
+    assert(applied == [True, True, False, False, False, True])
+    assert_details("rejected", 3, reconstructor.rejected)
+    assert(reconstructor.rejected == 3)
+    assert_details("resynchronised", True, reconstructor.synchronised)
+    assert(reconstructor.synchronised)
+    assert_details("count", 6, reconstructor.snapshot().statistics.count)
+    assert(reconstructor.snapshot().statistics.count == 6)
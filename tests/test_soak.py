@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+# Soak the dynamic application tree with scan jobs and watch for leaks.
+# Handles, objects, the blackboard and traced memory are sampled every few
+# cycles and must not trend upwards. A short soak runs by default, for a
+# long one (robots run for weeks):
+#
+#   HUGR_SOAK_CYCLES=5000 pytest -s tests/test_soak.py
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import gc
+import os
+import resource
+import tracemalloc
+
+import pytest
+
+import py_trees
+import py_trees.console as console
+import rclpy
+
+import hugr.eight_dynamic_application_loading as eight
+import hugr.mock as mock
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
+def setup_module(module):
+    console.banner("ROS Init")
+    rclpy.init()
+
+
+def teardown_module(module):
+    console.banner("ROS Shutdown")
+    rclpy.shutdown()
+
+
+def cycles():
+    return int(os.environ.get("HUGR_SOAK_CYCLES", 200))
+
+
+def warmup_cycles():
+    # caches, interned strings, lazily created rclpy machinery...
+    return 10
+
+
+def sample_period():
+    # cycles between samples
+    return int(os.environ.get("HUGR_SOAK_SAMPLE_PERIOD", 10))
+
+
+def objects_per_cycle_slack():
+    return float(os.environ.get("HUGR_SOAK_OBJECTS_PER_CYCLE_SLACK", 5.0))
+
+
+def traced_bytes_per_cycle_slack():
+    return float(os.environ.get("HUGR_SOAK_TRACED_BYTES_PER_CYCLE_SLACK", 512.0))
+
+
+def rss_slack_kb():
+    return int(os.environ.get("HUGR_SOAK_RSS_SLACK_KB", 4096))
+
+
+def tracemalloc_slack_kb():
+    return int(os.environ.get("HUGR_SOAK_TRACEMALLOC_SLACK_KB", 512))
+
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * resource.getpagesize() // 1024
+
+
+def handle_counts(node):
+    return {
+        'publishers': len(list(node.publishers)),
+        'subscriptions': len(list(node.subscriptions)),
+        'clients': len(list(node.clients)),
+        'services': len(list(node.services)),
+        'timers': len(list(node.timers)),
+        'waitables': len(list(node.waitables)),  # action clients
+        'guards': len(list(node.guards)),
+        'blackboard clients': len(py_trees.blackboard.Blackboard.clients),
+        'blackboard variables': len(py_trees.blackboard.Blackboard.storage),
+    }
+
+
+def slope(xs, ys):
+    """Least squares growth of ys per unit of xs."""
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / variance if variance else 0.0
+
+
+def run_job(scenario, timeout):
+    """Press scan, wait for the job subtree to be inserted and then pruned."""
+    scenario.robot.press_scan()
+    if not scenario.run(until=scenario.tree.busy, timeout=scenario.elapsed + timeout):
+        return False
+    return scenario.run(until=lambda: not scenario.tree.busy(), timeout=scenario.elapsed + timeout)
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_eight_job_soak():
+    console.banner("Eight - Job Soak [{} cycles]".format(cycles()))
+    robot = mock.robot.Robot(dock_duration=0.2, move_base_duration=0.5, rotation_rate=15.7)
+    scenario = mock.robot.Scenario(
+        tree=eight.DynamicApplicationTree(unicode_tree_debug=False),
+        tick_period=0.1,
+        robot=robot
+    )
+    scenario.setup()
+    tracemalloc.start(25)
+    baseline = None
+    samples = []  # (cycle, handle counts, objects, traced bytes)
+    for cycle in range(cycles()):
+        finished = run_job(scenario, timeout=30.0)
+        assert_details("cycle {}".format(cycle), "finished", finished)
+        assert(finished)
+        if cycle == warmup_cycles() - 1:
+            baseline = (handle_counts(scenario.tree.node), rss_kb(), tracemalloc.take_snapshot())
+        if cycle >= warmup_cycles() - 1 and (cycle - warmup_cycles() + 1) % sample_period() == 0:
+            gc.collect()
+            samples.append((
+                cycle, handle_counts(scenario.tree.node), len(gc.get_objects()), tracemalloc.get_traced_memory()[0]
+            ))
+            print(console.cyan + "  cycle {}: handles: {}, objects: {}, rss: {}KB, traced: {}KB".format(
+                cycle, samples[-1][1], samples[-1][2], rss_kb(), samples[-1][3] // 1024) + console.reset)
+    counts = handle_counts(scenario.tree.node)
+    rss = rss_kb()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    scenario.shutdown()
+
+    baseline_counts, baseline_rss, baseline_snapshot = baseline
+    statistics = snapshot.compare_to(baseline_snapshot, 'lineno')
+    traced_growth_kb = sum(stat.size_diff for stat in statistics) // 1024
+    print(console.green + "Top Allocation Growth" + console.reset)
+    for stat in statistics[:10]:
+        print(console.yellow + "  {}".format(stat) + console.reset)
+
+    sampled_cycles = [sample[0] for sample in samples]
+    objects_growth = slope(sampled_cycles, [sample[2] for sample in samples])
+    traced_growth = slope(sampled_cycles, [sample[3] for sample in samples])
+
+    assert_banner()
+    for name, count in counts.items():
+        assert_details(name, baseline_counts[name], count)
+    assert(counts == baseline_counts)
+    changed = [sample[0] for sample in samples if sample[1] != baseline_counts]
+    assert_details("samples with other handle counts", [], changed)
+    assert(changed == [])
+    assert_details("samples", ">= 3", len(samples))
+    assert(len(samples) >= 3)
+    assert_details("objects / cycle", "<= {}".format(objects_per_cycle_slack()), objects_growth)
+    assert(objects_growth <= objects_per_cycle_slack())
+    assert_details("traced bytes / cycle", "<= {}".format(traced_bytes_per_cycle_slack()), traced_growth)
+    assert(traced_growth <= traced_bytes_per_cycle_slack())
+    assert_details("rss growth (KB)", "<= {}".format(rss_slack_kb()), rss - baseline_rss)
+    assert(rss - baseline_rss <= rss_slack_kb())
+    assert_details("traced growth (KB)", "<= {}".format(tracemalloc_slack_kb()), traced_growth_kb)
+    assert(traced_growth_kb <= tracemalloc_slack_kb())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import pytest
+
+import py_trees
+import py_trees.console as console
+import py_trees_ros
+import hugr
+import rclpy
+import rclpy.executors
+import std_msgs.msg as std_msgs
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+pytestmark = pytest.mark.usefixtures("ros_domain")
+
+
+def setup_module(module):
+    console.banner("ROS Init")
+    rclpy.init()
+
+
+def teardown_module(module):
+    console.banner("ROS Shutdown")
+    rclpy.shutdown()
+
+
+def timeout():
+    # simulated seconds
+    return 3.0
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_event_queue_bursts():
+    console.banner("Event Queue - Bursts")
+
+    py_trees.blackboard.Blackboard.clear()
+    tree_node = rclpy.create_node("tree")
+    dashboard_node = rclpy.create_node("dashboard")
+    scan2bb = hugr.subscribers.EventQueueToBlackboard(
+        name="Scan2BB",
+        topic_name="/dashboard/scan",
+        qos_profile=py_trees_ros.utilities.qos_profile_unlatched(),
+        variable_name="event_scan_button",
+        maxlen=3
+    )
+    scan2bb.setup(node=tree_node)
+    publisher = dashboard_node.create_publisher(
+        msg_type=std_msgs.Empty,
+        topic="/dashboard/scan",
+        qos_profile=py_trees_ros.utilities.qos_profile_unlatched()
+    )
+    blackboard = py_trees.blackboard.Client(name="Reader")
+    for suffix in ["", "_sequence", "_queue", "_dropped"]:
+        blackboard.register_key(key="event_scan_button" + suffix, access=py_trees.common.Access.READ)
+
+    executor = rclpy.executors.MultiThreadedExecutor(num_threads=4)
+    clock = hugr.mock.clock.SimulatedClock(executor)
+    clock.add_node(tree_node)
+    clock.add_node(dashboard_node)
+
+    # a burst of four between ticks, the oldest is dropped
+    clock.spin_until(lambda: publisher.get_subscription_count() > 0, timeout=timeout())
+    for unused_i in range(4):
+        publisher.publish(std_msgs.Empty())
+    clock.spin_until(lambda: len(scan2bb.events) + scan2bb.dropped == 4, timeout=timeout())
+
+    events = []
+    sequences = []
+    for unused_i in range(4):
+        scan2bb.tick_once()
+        events.append(blackboard.event_scan_button)
+        sequences.append(blackboard.event_scan_button_sequence)
+
+    assert_banner()
+    assert_details("events", [True, True, True, False], events)
+    assert(events == [True, True, True, False])
+    assert_details("in order", True, sequences[0] < sequences[1] < sequences[2] == sequences[3])
+    assert(sequences[0] < sequences[1] < sequences[2] == sequences[3])
+    assert_details("queued", (), blackboard.event_scan_button_queue)
+    assert(blackboard.event_scan_button_queue == ())
+    assert_details("dropped", 1, blackboard.event_scan_button_dropped)
+    assert(blackboard.event_scan_button_dropped == 1)
+
+    clock.shutdown()
+    executor.shutdown()
+    tree_node.destroy_node()
+    dashboard_node.destroy_node()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.tracing
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+class Clock(object):
+    """
+    Advances a tenth of a second every time it is read.
+    """
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        self.time += 0.1
+        return self.time
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_activations(tmp_path):
+    console.banner("Activations")
+    tracer = hugr.tracing.Tracer(now=Clock())
+    tracer.enable()
+    undock = py_trees.behaviours.StatusQueue(
+        name="UnDock", queue=[py_trees.common.Status.RUNNING, py_trees.common.Status.SUCCESS], eventually=None
+    )
+    move_out = py_trees.behaviours.StatusQueue(
+        name="Move Out", queue=[py_trees.common.Status.RUNNING] * 2 + [py_trees.common.Status.SUCCESS], eventually=None
+    )
+    root = py_trees.composites.Sequence(name="Scan", memory=True, children=[undock, move_out])
+    tree = py_trees.trees.BehaviourTree(root=root)
+    activation_tracer = hugr.tracing.ActivationTracer(tracer=tracer)
+    tree.visitors.append(activation_tracer)
+    for unused_i in range(4):
+        tree.tick()
+    activation_tracer.close()
+    path = str(tmp_path / "trace.json")
+    tracer.save(path)
+    events = hugr.tracing.load(path)
+    spans = {e['name']: e for e in events if e['ph'] == 'X' and e['cat'] == 'behaviour'}
+    ticks = [e for e in events if e['ph'] == 'X' and e['cat'] == 'tick']
+    names = [e['args']['name'] for e in events if e['ph'] == 'M' and e['name'] == 'thread_name']
+
+    assert_banner()
+    assert_details("ticks", 4, len(ticks))
+    assert(len(ticks) == 4)
+    assert_details("undock ticks", (0, 1), (spans["UnDock"]['args']['start_tick'], spans["UnDock"]['args']['end_tick']))
+    assert((spans["UnDock"]['args']['start_tick'], spans["UnDock"]['args']['end_tick']) == (0, 1))
+    assert_details("move out ticks", (1, 3), (spans["Move Out"]['args']['start_tick'], spans["Move Out"]['args']['end_tick']))
+    assert((spans["Move Out"]['args']['start_tick'], spans["Move Out"]['args']['end_tick']) == (1, 3))
+    assert_details("outcome", "SUCCESS", spans["Move Out"]['args']['outcome'])
+    assert(spans["Move Out"]['args']['outcome'] == "SUCCESS")
+    assert_details("parent", spans["Scan"]['args']['id'], spans["UnDock"]['args']['parent'])
+    assert(spans["UnDock"]['args']['parent'] == spans["Scan"]['args']['id'])
+    assert_details("nested", True, spans["Scan"]['ts'] <= spans["UnDock"]['ts'] and spans["Scan"]['dur'] >= spans["UnDock"]['dur'])
+    assert(spans["Scan"]['ts'] <= spans["UnDock"]['ts'] and spans["Scan"]['dur'] >= spans["UnDock"]['dur'])
+    assert_details("tracks", ["Ticks", "  UnDock", "Scan", "  Move Out"], names)
+    assert(names == ["Ticks", "  UnDock", "Scan", "  Move Out"])
+
+
+def test_interruption():
+    console.banner("Interruption")
+    tracer = hugr.tracing.Tracer(now=Clock())
+    tracer.enable()
+    rotate = py_trees.behaviours.Running(name="Rotate")
+    root = py_trees.composites.Sequence(name="Scan", memory=True, children=[rotate])
+    tree = py_trees.trees.BehaviourTree(root=root)
+    activation_tracer = hugr.tracing.ActivationTracer(tracer=tracer, ticks=False)
+    tree.visitors.append(activation_tracer)
+    tree.tick()
+    tree.tick()
+    root.stop(py_trees.common.Status.INVALID)  # e.g. pruned by a tick handler
+    tree.tick()
+    activation_tracer.close()
+    spans = [e for e in tracer.trace()['traceEvents'] if e['ph'] == 'X' and e['name'] == "Rotate"]
+
+    assert_banner()
+    assert_details("activations", 2, len(spans))
+    assert(len(spans) == 2)
+    assert_details("interrupted", "INVALID", spans[0]['args']['outcome'])
+    assert(spans[0]['args']['outcome'] == "INVALID")
+    assert_details("reactivated", 2, spans[1]['args']['start_tick'])
+    assert(spans[1]['args']['start_tick'] == 2)
+
+
+def test_reinserted_subtrees_reuse_tracks():
+    console.banner("Reinserted Subtrees")
+    tracer = hugr.tracing.Tracer(now=Clock())
+    tracer.enable()
+    root = py_trees.composites.Selector(name="Tasks", memory=False, children=[py_trees.behaviours.Running(name="Idle")])
+    tree = py_trees.trees.BehaviourTree(root=root)
+    tree.visitors.append(hugr.tracing.ActivationTracer(tracer=tracer))
+    tracks = []
+    for unused_i in range(3):
+        job = py_trees.composites.Sequence(
+            name="Scan", memory=True, children=[py_trees.behaviours.Success(name="Rotate")]
+        )
+        tree.insert_subtree(job, root.id, 0)
+        tree.tick()
+        tree.prune_subtree(job.id)
+        tracks.append(len(tracer.tracks))
+
+    assert_banner()
+    assert_details("tracks", [4, 4, 4], tracks)
+    assert(tracks == [4, 4, 4])
+
+
+def test_async_spans():
+    console.banner("Async Spans")
+    tracer = hugr.tracing.Tracer(now=Clock())
+    tracer.async_event('b', "dock", "action", 1)  # disabled, not recorded
+    tracer.enable()
+    span_id = tracer.next_id()
+    for phase, name in [('b', "dock"), ('n', "accepted"), ('n', "feedback"), ('e', "dock")]:
+        tracer.async_event(phase, name, "action", span_id)
+    events = tracer.trace()['traceEvents']
+
+    assert_banner()
+    assert_details("events", ['b', 'n', 'n', 'e'], [e['ph'] for e in events])
+    assert([e['ph'] for e in events] == ['b', 'n', 'n', 'e'])
+    assert_details("ids", {span_id}, {e['id'] for e in events})
+    assert({e['id'] for e in events} == {span_id})
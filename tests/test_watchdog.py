@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# License: BSD
+#   https://raw.githubusercontent.com/splintered-reality/py_trees/devel/LICENSE
+#
+
+##############################################################################
+# Imports
+##############################################################################
+
+import py_trees
+import py_trees.console as console
+
+import hugr.watchdog
+
+##############################################################################
+# Helpers
+##############################################################################
+
+
+def assert_banner():
+    print(console.green + "----- Asserts -----" + console.reset)
+
+
+def assert_details(text, expected, result):
+    print(console.green + text +
+          "." * (40 - len(text)) +
+          console.cyan + "{}".format(expected) +
+          console.yellow + " [{}]".format(result) +
+          console.reset)
+
+
+class Clock(object):
+    def __init__(self):
+        self.time = 100.0
+
+    def __call__(self):
+        return self.time
+
+
+class Busy(py_trees.behaviour.Behaviour):
+    """Advances the fake clock, as if it took that long to update."""
+    def __init__(self, name, clock, duration):
+        super().__init__(name=name)
+        self.clock = clock
+        self.duration = duration
+
+    def update(self):
+        self.clock.time += self.duration
+        return py_trees.common.Status.SUCCESS
+
+
+def tick(tree, watchdog, clock, start):
+    clock.time = start
+    watchdog.tick_started()
+    tree.tick()
+    return watchdog.tick_finished()
+
+##############################################################################
+# Tests
+##############################################################################
+
+
+def test_tick_watchdog():
+    console.banner("Tick Watchdog")
+    clock = Clock()
+    light = Busy(name="Light", clock=clock, duration=0.01)
+    heavy = Busy(name="Heavy", clock=clock, duration=0.02)
+    root = py_trees.composites.Sequence(name="Root", memory=False, children=[light, heavy])
+    tree = py_trees.trees.BehaviourTree(root=root)
+    watchdog = hugr.watchdog.TickWatchdog(period=0.1, now=clock)
+    tree.visitors.append(watchdog)
+
+    tick(tree, watchdog, clock, start=100.0)
+    tick(tree, watchdog, clock, start=100.1)
+    heavy.duration = 0.2
+    overrun = tick(tree, watchdog, clock, start=100.25)  # late and overruns
+    heavy.duration = 0.02
+    tick(tree, watchdog, clock, start=100.5)  # missed 100.3, 100.4
+    statistics = watchdog.statistics()
+    counters = statistics['counters']
+
+    assert_banner()
+    assert_details("ticks", 4, counters['ticks'])
+    assert(counters['ticks'] == 4)
+    assert_details("overruns", 1, counters['overruns'])
+    assert(counters['overruns'] == 1)
+    assert_details("late", 1, counters['late'])
+    assert(counters['late'] == 1)
+    assert_details("missed", 2, counters['missed'])
+    assert(counters['missed'] == 2)
+    assert_details("culprit", "Heavy", overrun['behaviour'])
+    assert(overrun['behaviour'] == "Heavy")
+    assert_details("culprit self time", 0.2, round(overrun['self_time'], 6))
+    assert(abs(overrun['self_time'] - 0.2) < 1e-6)
+    assert_details("lateness max", 0.05, round(statistics['lateness']['max'], 6))
+    assert(abs(statistics['lateness']['max'] - 0.05) < 1e-6)
+
+
+def test_tick_watchdog_simulated_time():
+    console.banner("Tick Watchdog - Simulated Time")
+    wall_clock = Clock()
+    simulated_clock = Clock()  # stands still while ticking
+    heavy = Busy(name="Heavy", clock=wall_clock, duration=0.2)
+    tree = py_trees.trees.BehaviourTree(root=heavy)
+    watchdog = hugr.watchdog.TickWatchdog(period=0.1, now=wall_clock, timer_now=simulated_clock)
+    tree.visitors.append(watchdog)
+
+    overruns = []
+    for start in [10.0, 10.1, 10.2]:
+        overruns.append(tick(tree, watchdog, simulated_clock, start=start))
+    counters = watchdog.statistics()['counters']
+
+    assert_banner()
+    assert_details("overruns", 3, counters['overruns'])
+    assert(counters['overruns'] == 3)
+    assert_details("culprit", "Heavy", overruns[-1]['behaviour'])
+    assert(overruns[-1]['behaviour'] == "Heavy")
+    assert_details("late", 0, counters['late'])
+    assert(counters['late'] == 0)
+    assert_details("missed", 0, counters['missed'])
+    assert(counters['missed'] == 0)